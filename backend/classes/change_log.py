@@ -4,12 +4,34 @@ Docstring for change_log
 TODO:
 '''
 
-from database import fetch_all, fetch_one, execute
+from database import fetch_all, fetch_one, execute, execute_many, transaction, current_transaction, outside_transaction
 from mysql.connector import Error
-import json
-from datetime import datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import weakref
+from datetime import date, datetime
+from utils import change_log_codec, keyset
+
+# Entries logged inside ChangeLog.buffered() wait here until the block exits.
+_pending = ContextVar("change_log_pending", default=None)
+# Entries logged inside a transaction() while buffering, held until it commits.
+_held = weakref.WeakKeyDictionary()
 
 class ChangeLog:
+
+    # Flush a buffer early once it gets this big, so long jobs stay bounded.
+    FLUSH_THRESHOLD = int(os.getenv("CHANGE_LOG_FLUSH_THRESHOLD", "500"))
+
+    # Newest first; ID breaks ties between rows logged in the same second.
+    SEARCH_ORDER = [("cl.ChangedAt", "DESC"), ("cl.ID", "DESC")]
+    PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+
+    # Whole months older than this move to ChangeLogArchive when archive() runs.
+    RETENTION_MONTHS = int(os.getenv("CHANGE_LOG_RETENTION_MONTHS", "6"))
+    ARCHIVE_BATCH = 1000
+
     def __init__(
         self,id=None,
         changed_table=None,
@@ -50,6 +72,7 @@ class ChangeLog:
     def from_db_row(cls, row):
         if not row:
             return None
+        before_data, after_data = change_log_codec.decode(row.get("BeforeData"), row.get("AfterData"))
         return cls(
             id=row.get("ID"),
             changed_table=row.get("ChangedTable"),
@@ -58,31 +81,39 @@ class ChangeLog:
             changed_by=row.get("ChangedByName") or row.get("ChangedBy"),
             changed_at=row.get("ChangedAt"),
             source=row.get("Source"),
-            before_data=row.get("BeforeData"),
-            after_data=row.get("AfterData"),
+            before_data=before_data,
+            after_data=after_data,
         )
 
     @classmethod
     def find_by_identifier(cls, id):
-        """Find a Change instance from the database."""
-        row = fetch_one(
-            """
-            SELECT ID, ChangedTable, RecordPK, Operation, ChangedBy, ChangedAt,
-                   Source, BeforeData, AfterData
-            FROM ChangeLog
-            WHERE ID = %s
-            LIMIT 1
-            """,
-            (id,),
-        )
-        return cls.from_db_row(row)
+        """Find a Change instance from the database, falling back to the archive."""
+        for table in ("ChangeLog", "ChangeLogArchive"):
+            row = fetch_one(
+                f"""
+                SELECT ID, ChangedTable, RecordPK, Operation, ChangedBy, ChangedAt,
+                       Source, BeforeData, AfterData
+                FROM {table}
+                WHERE ID = %s
+                LIMIT 1
+                """,
+                (id,),
+            )
+            if row:
+                return cls.from_db_row(row)
+        return None
 
     @classmethod
     def exists(cls, id):
-        """Find a Change instance from the database."""
+        """Whether the entry exists, in the live table or the archive (as find_by_identifier looks)."""
         row = fetch_one(
-            "SELECT ID FROM ChangeLog WHERE ID = %s LIMIT 1",
-            (id,),
+            """
+            SELECT ID FROM ChangeLog WHERE ID = %s
+            UNION ALL
+            SELECT ID FROM ChangeLogArchive WHERE ID = %s
+            LIMIT 1
+            """,
+            (id, id),
         )
         return row is not None
 
@@ -170,9 +201,41 @@ class ChangeLog:
             raise e
 
     @classmethod
-    def list_all(cls):
+    def search(cls, *, changed_table=None, record_pk=None, changed_by=None, since=None, until=None,
+               archived=False, limit=PAGE_SIZE, cursor=None):
+        """
+        (entries, next cursor) newest first, filtered by table, record PK,
+        user and the half-open [since, until) window; any filter may be None.
+        archived=True reads ChangeLogArchive instead of the live table.
+        """
+        conditions = []
+        params = []
+        for column, value in (
+            ("cl.ChangedTable", changed_table),
+            ("cl.RecordPK", record_pk),
+            ("cl.ChangedBy", changed_by),
+        ):
+            if value not in (None, ""):
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        if since:
+            conditions.append("cl.ChangedAt >= %s")
+            params.append(since)
+        if until:
+            conditions.append("cl.ChangedAt < %s")
+            params.append(until)
+        if cursor:
+            predicate, after_params = keyset.after(
+                cls.SEARCH_ORDER, keyset.decode_cursor(cursor, "changedAt", cls.SEARCH_ORDER)
+            )
+            conditions.append(predicate)
+            params += after_params
+
+        limit = min(max(int(limit), 1), cls.MAX_PAGE_SIZE)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        table = "ChangeLogArchive" if archived else "ChangeLog"
         rows = fetch_all(
-            """
+            f"""
             SELECT
                 cl.ID,
                 cl.ChangedTable,
@@ -183,15 +246,67 @@ class ChangeLog:
                 cl.ChangedAt,
                 cl.Source,
                 cl.BeforeData,
-                cl.AfterData
-            FROM ChangeLog cl
+                cl.AfterData,
+                {keyset.key_select(cls.SEARCH_ORDER)}
+            FROM {table} cl
             LEFT JOIN Person p
                 ON cl.ChangedBy = p.ID
-            ORDER BY cl.ChangedAt DESC
-            """
+            {where}
+            {keyset.order_by(cls.SEARCH_ORDER)}
+            LIMIT %s
+            """,
+            params + [limit + 1],
         )
-        return [cls.from_db_row(r) for r in rows]
-    
+        rows, next_cursor = keyset.split_page(rows, limit, "changedAt", cls.SEARCH_ORDER)
+        return [cls.from_db_row(r) for r in rows], next_cursor
+
+    @classmethod
+    def archive_cutoff(cls, today=None, months=None):
+        """First day of the oldest month that stays in the live table."""
+        today = today or date.today()
+        months = cls.RETENTION_MONTHS if months is None else months
+        index = today.year * 12 + (today.month - 1) - months
+        return date(index // 12, index % 12 + 1, 1)
+
+    @classmethod
+    def archive(cls, before=None, progress=None):
+        """
+        Move every entry logged before the cutoff (default archive_cutoff())
+        into ChangeLogArchive, ARCHIVE_BATCH rows per transaction so the live
+        table is never locked for long. Returns the number of rows moved.
+        """
+        before = before or cls.archive_cutoff()
+        moved = 0
+        while True:
+            ids = [
+                r["ID"]
+                for r in fetch_all(
+                    "SELECT ID FROM ChangeLog WHERE ChangedAt < %s ORDER BY ChangedAt, ID LIMIT %s",
+                    (before, cls.ARCHIVE_BATCH),
+                ) or []
+            ]
+            if not ids:
+                return moved
+            placeholders = ", ".join(["%s"] * len(ids))
+            with transaction() as tx:
+                tx.execute(
+                    f"""
+                    INSERT INTO ChangeLogArchive (
+                        ID, ChangedTable, RecordPK, Operation, ChangedBy, ChangedAt,
+                        Source, BeforeData, AfterData
+                    )
+                    SELECT ID, ChangedTable, RecordPK, Operation, ChangedBy, ChangedAt,
+                           Source, BeforeData, AfterData
+                    FROM ChangeLog
+                    WHERE ID IN ({placeholders})
+                    """,
+                    ids,
+                )
+                tx.execute(f"DELETE FROM ChangeLog WHERE ID IN ({placeholders})", ids)
+            moved += len(ids)
+            if progress:
+                progress(moved, None, f"Archived {moved} change log entries")
+
     @classmethod
     def list_for_user(cls, person_id):
         rows = fetch_all(
@@ -220,36 +335,170 @@ class ChangeLog:
             "afterData": self.after_data,
         }
 
-    @staticmethod
-    def _json_text(obj):
-        if obj is None:
-            return None
-        try:
-            return json.dumps(obj, default=str, ensure_ascii=False)
-        except Exception:
-            return None
-
     @classmethod
     def log(cls, *, changed_table, record_pk, operation,
             changed_by, source,
             before_obj=None, after_obj=None):
         """
-        Centralized logger. Create + save ChangeLog row.
+        Centralized logger. Create + save ChangeLog row, or queue it when
+        called inside ChangeLog.buffered().
         Does not throw (so it won't break the caller).
         """
         try:
-            entry = cls(
+            row = cls._row(
                 changed_table=changed_table,
                 record_pk=record_pk,
                 operation=operation,
                 changed_by=changed_by,
                 changed_at=datetime.now(),
                 source=source,
-                before_data=cls._json_text(before_obj),
-                after_data=cls._json_text(after_obj),
+                before_obj=before_obj,
+                after_obj=after_obj,
             )
-            entry.save()
+            cls._queue([row])
             return True
         except Exception as e:
             print(f"ChangeLog.log failed: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    @classmethod
+    def log_many(cls, entries):
+        """
+        Same as log() for many rows at once: entries is a list of dicts with
+        log()'s keyword arguments. Written with one multi-row INSERT.
+        Does not throw.
+        """
+        if not entries:
+            return True
+        try:
+            now = datetime.now()
+            rows = [cls._row(**{**e, "changed_at": e.get("changed_at") or now}) for e in entries]
+            cls._queue(rows)
+            return True
+        except Exception as e:
+            print(f"ChangeLog.log_many failed: {e}")
+            return False
+
+    @classmethod
+    def _queue(cls, rows):
+        """
+        Write rows now, or buffer them when inside ChangeLog.buffered().
+        Rows logged inside a transaction() only join the buffer once it
+        commits and are dropped if it rolls back; if they pile up past
+        FLUSH_THRESHOLD first, they are written on the transaction's own
+        connection, so they still commit or roll back with it.
+        """
+        pending = _pending.get()
+        if pending is None:
+            # inside a transaction() this runs on its connection and shares its fate
+            cls._write_rows(rows)
+            return
+        tx = current_transaction()
+        if tx is None:
+            pending.extend(rows)
+            if len(pending) >= cls.FLUSH_THRESHOLD:
+                cls.flush()
+            return
+        held = _held.get(tx)
+        if held is None:
+            held = _held[tx] = []
+            tx.after_commit(lambda: cls._release(held))
+        held.extend(rows)
+        if len(held) >= cls.FLUSH_THRESHOLD:
+            cls._write_rows(held)
+            held.clear()
+
+    @classmethod
+    def _release(cls, held):
+        """after_commit hook: the transaction's entries join the buffer. Does not throw."""
+        try:
+            cls._queue(held)
+        except Exception as e:
+            print(f"ChangeLog._release failed: {e}")
+
+    @classmethod
+    @contextmanager
+    def buffered(cls):
+        """
+        Collect every log()/log_many() call made inside the block and write
+        them as one multi-row INSERT when it exits (also on error, since the
+        audited writes have already been committed). Nested blocks share the
+        outermost buffer.
+        """
+        token = cls.start_buffer()
+        try:
+            yield
+        finally:
+            cls.end_buffer(token)
+
+    @classmethod
+    def start_buffer(cls):
+        """Start buffering in this context; returns the token for end_buffer() (None if already buffering)."""
+        if _pending.get() is not None:
+            return None
+        return _pending.set([])
+
+    @classmethod
+    def end_buffer(cls, token):
+        """Flush and stop the buffer start_buffer() opened; returns how many entries were still waiting."""
+        if token is None:
+            return 0
+        left = len(_pending.get() or [])
+        cls.flush()
+        _pending.reset(token)
+        return left
+
+    @classmethod
+    def flush(cls):
+        """
+        Write out whatever the current buffer holds. Does not throw. The
+        buffer only holds entries for committed writes, so inside a
+        transaction() they are written on a connection of their own and
+        survive its rollback.
+        """
+        pending = _pending.get()
+        if not pending:
+            return True
+        rows = list(pending)
+        pending.clear()
+        try:
+            from utils.change_log_writer import get_writer
+            writer = get_writer()
+            if writer:
+                writer.submit(rows)
+            else:
+                with outside_transaction():
+                    cls._write_rows(rows)
+            return True
+        except Exception as e:
+            print(f"ChangeLog.flush failed: {e}")
+            return False
+
+    @classmethod
+    def _row(cls, *, changed_table, record_pk, operation, changed_by=None, changed_at=None,
+             source=None, before_obj=None, after_obj=None):
+        # full before snapshot, after as a field diff against it (see change_log_codec)
+        before_data, after_data = change_log_codec.encode(before_obj, after_obj)
+        return (
+            changed_table,
+            record_pk,
+            operation,
+            changed_by,
+            changed_at,
+            source,
+            before_data,
+            after_data,
+        )
+
+    @staticmethod
+    def _write_rows(rows):
+        execute_many(
+            """
+            INSERT INTO ChangeLog (
+                ChangedTable, RecordPK, Operation, ChangedBy, ChangedAt,
+                Source, BeforeData, AfterData
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            rows,
+        )
@@ -1,9 +1,12 @@
-from database import fetch_one, fetch_all, execute
+from database import fetch_one, fetch_all, execute, _chunks, _in_clause
 from mysql.connector import Error
 from datetime import datetime
 from utils.validators import (require, int_field, float_field, fk_exists, enum_field, str_field)
 from classes.meet_result import MeetResult
 from classes.race_result import RaceResult
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+from classes.dog_search_index import DogSearchIndex
+from utils.date_ranges import resolve_range
 from enum import StrEnum
 
 def _float_or_zero(value):
@@ -430,70 +433,31 @@ class Dog:
 
     @classmethod
     def search(cls, query, owner_person_id=None, page=1, limit: int | None=None, sort=None):
-        q = (query or "").strip()
-        like = f"%{q}%"
-        orderings = {
-            "nameAsc": "ORDER BY d.RegisteredName ASC",
-            "nameDesc": "ORDER BY d.RegisteredName DESC",
-            "cwaAsc": "ORDER BY d.CWANumber ASC",
-            "cwaDesc": "ORDER BY d.CWANumber DESC",
-            "birthAsc": "ORDER BY d.Birthdate ASC",
-            "birthDesc": "ORDER BY d.Birthdate DESC"
-        }
-        sql = """
-            SELECT
-                d.*,
-                GROUP_CONCAT(
-                    DISTINCT CONCAT_WS(' ', p.FirstName, p.LastName)
-                    ORDER BY p.LastName, p.FirstName
-                    SEPARATOR ', '
-                ) AS ownerName,
-                GROUP_CONCAT(
-                    DISTINCT dt.Title
-                    ORDER BY dt.Title
-                    SEPARATOR ', '
-                ) AS titles
-                FROM Dog d
-            LEFT JOIN DogOwner do ON do.CWAID = d.CWANumber
-            LEFT JOIN Person p ON p.ID = do.PersonID
-            LEFT JOIN DogTitles dt ON dt.CWANumber = d.CWANumber
-            WHERE (
-                d.CWANumber LIKE %s
-                OR d.RegisteredName LIKE %s
-                OR d.RegisteredNumber LIKE %s
-                OR d.CallName LIKE %s
-                OR do.PersonID LIKE %s
-                OR CONCAT(p.FirstName, ' ', p.LastName) LIKE %s
-                OR dt.Title LIKE %s
-            )  
-        """
-        params = [like, like, like, like, like, like, like]
+        """Dogs matching query through DogSearchIndex (prefix match per word, ranked)."""
+        rows, _ = cls.search_page(query, owner_person_id=owner_person_id, page=page, limit=limit, sort=sort)
+        return rows
 
-        if owner_person_id:
-            sql += " AND do.PersonID = %s"
-            params.append(owner_person_id)
-        
-        sql += "GROUP BY d.CWANumber " 
-        if sort in orderings:
-            sql += orderings[sort] + " "
+    @classmethod
+    def search_page(cls, query, owner_person_id=None, page=1, limit: int | None=None, sort=None, cursor=None):
+        """(rows, next cursor); a cursor from the previous page replaces the page offset."""
+        return DogSearchIndex.search(
+            query, owner_person_id=owner_person_id, page=page, limit=limit, sort=sort, cursor=cursor
+        )
 
-        if limit is not None:
-            sql += "LIMIT %s OFFSET %s"
-            params.append(limit)
-            params.append((page-1)*limit)
+    @classmethod
+    def search_count(cls, query, owner_person_id=None):
+        return DogSearchIndex.count(query, owner_person_id=owner_person_id)
 
-        rows = fetch_all(sql, params)
-        return rows
-    
     @classmethod
     def list_meets_with_results_for_dog(cls, cwa_number: str):
         cwa_number = (cwa_number or "").strip()
         if not cwa_number:
             return []
 
+        # event count via a grouped self-join instead of a subquery per meet
         meets = fetch_all(
             """
-            SELECT DISTINCT
+            SELECT
                 m.MeetNumber,
                 m.MeetDate,
                 m.ClubAbbreviation,
@@ -501,54 +465,52 @@ class Dog:
                 m.RaceSecretary,
                 m.Judge,
                 m.Completed,
-                (
-                    SELECT COUNT(*)
-                    FROM Meet grouped
-                    WHERE grouped.ClubAbbreviation = m.ClubAbbreviation
-                      AND grouped.MeetDate = m.MeetDate
-                      AND grouped.Location = m.Location
-                ) AS EventMeetCount
+                COUNT(grouped.ID) AS EventMeetCount
             FROM Meet m
-            LEFT JOIN MeetResults mr
-            ON mr.MeetNumber = m.MeetNumber AND mr.CWANumber = %s
-            LEFT JOIN RaceResults rr
-            ON rr.MeetNumber = m.MeetNumber AND rr.CWANumber = %s
-            WHERE mr.CWANumber IS NOT NULL OR rr.CWANumber IS NOT NULL
+            JOIN Meet grouped
+              ON grouped.ClubAbbreviation = m.ClubAbbreviation
+             AND grouped.MeetDate = m.MeetDate
+             AND grouped.Location = m.Location
+            WHERE m.MeetNumber IN (
+                SELECT MeetNumber FROM MeetResults WHERE CWANumber = %s
+                UNION
+                SELECT MeetNumber FROM RaceResults WHERE CWANumber = %s
+            )
+            GROUP BY m.MeetNumber, m.MeetDate, m.ClubAbbreviation, m.Location,
+                     m.RaceSecretary, m.Judge, m.Completed
             ORDER BY m.MeetDate DESC, m.MeetNumber DESC
             """,
             (cwa_number, cwa_number),
         ) or []
 
-        for m in meets:
-            meet_no = m["MeetNumber"]
-
-            meet_results_rows = fetch_all(
-                """
-                SELECT *
-                FROM MeetResults
-                WHERE MeetNumber = %s AND CWANumber = %s
-                ORDER BY MeetNumber DESC
-                """,
-                (meet_no, cwa_number),
-            ) or []
-
-            race_results_rows = fetch_all(
-                """
-                SELECT *
-                FROM RaceResults
-                WHERE MeetNumber = %s AND CWANumber = %s
-                ORDER BY Program DESC, RaceNumber DESC
-                """,
-                (meet_no, cwa_number),
-            ) or []
+        # every result for the dog in two queries, grouped by meet below
+        meet_results_by_meet = {}
+        for r in fetch_all(
+            """
+            SELECT *
+            FROM MeetResults
+            WHERE CWANumber = %s
+            """,
+            (cwa_number,),
+        ) or []:
+            meet_results_by_meet.setdefault(r["MeetNumber"], []).append(MeetResult.from_db_row(r).to_dict())
 
-            m["meetResults"] = [
-                MeetResult.from_db_row(r).to_dict() for r in meet_results_rows
-            ]
+        race_results_by_meet = {}
+        for r in fetch_all(
+            """
+            SELECT *
+            FROM RaceResults
+            WHERE CWANumber = %s
+            ORDER BY Program DESC, RaceNumber DESC
+            """,
+            (cwa_number,),
+        ) or []:
+            race_results_by_meet.setdefault(r["MeetNumber"], []).append(RaceResult.from_db_row(r).to_dict())
 
-            m["raceResults"] = [
-                RaceResult.from_db_row(r).to_dict() for r in race_results_rows
-            ]
+        for m in meets:
+            meet_no = m["MeetNumber"]
+            m["meetResults"] = meet_results_by_meet.get(meet_no, [])
+            m["raceResults"] = race_results_by_meet.get(meet_no, [])
             m["MeetDate"] = m["MeetDate"].strftime("%d-%m-%Y")
         return meets
 
@@ -758,6 +720,7 @@ class Dog:
                     self.last_edited_at,
                 ),
             )
+            DogSearchIndex.refresh([self.cwa_number])
             return True
         except Error as e:
             raise e
@@ -846,6 +809,7 @@ class Dog:
                     self.cwa_number
                 ),
             )
+            DogSearchIndex.refresh([self.cwa_number])
             return True
         except Error as e:
             raise e
@@ -861,6 +825,7 @@ class Dog:
                 """,
                 (cwa_number,),
             )
+            DogSearchIndex.refresh([cwa_number])
             return True
         except Error as e:
             raise e
@@ -951,34 +916,7 @@ class Dog:
               )
         """, (self.cwa_number,))
 
-        hc_wins_row = fetch_one("""
-            SELECT COUNT(*) as hc_wins
-            FROM MeetResults mr
-            WHERE mr.CWANumber = %s
-            AND mr.MeetPlacement IS NOT NULL
-            AND mr.ConformationPlacement IS NOT NULL
-            AND mr.MeetPlacement + mr.ConformationPlacement = (
-                SELECT MIN(inner_mr.MeetPlacement + inner_mr.ConformationPlacement)
-                FROM MeetResults inner_mr
-                WHERE inner_mr.MeetNumber = mr.MeetNumber
-                    AND inner_mr.MeetPlacement IS NOT NULL
-                    AND inner_mr.ConformationPlacement IS NOT NULL
-            )
-            AND mr.MeetPlacement = (
-                SELECT MIN(inner_mr.MeetPlacement)
-                FROM MeetResults inner_mr
-                WHERE inner_mr.MeetNumber = mr.MeetNumber
-                    AND inner_mr.MeetPlacement IS NOT NULL
-                    AND inner_mr.ConformationPlacement IS NOT NULL
-                    AND inner_mr.MeetPlacement + inner_mr.ConformationPlacement = (
-                        SELECT MIN(inner2.MeetPlacement + inner2.ConformationPlacement)
-                        FROM MeetResults inner2
-                        WHERE inner2.MeetNumber = mr.MeetNumber
-                        AND inner2.MeetPlacement IS NOT NULL
-                        AND inner2.ConformationPlacement IS NOT NULL
-                    )
-            )
-        """, (self.cwa_number,))
+        hc_wins = MeetHighCombinedWinner.count_for_dog(self.cwa_number)
 
         if stats:
             self.average            = self.compute_last_three_meet_average()
@@ -990,10 +928,189 @@ class Dog:
             self.dpc_legs           = int(stats['total_dpc_legs'] or 0)
             self.meet_appearences   = int(stats['meet_appearances'] or 0)
             self.meet_wins          = int(stats['meet_wins'] or 0)
-            self.high_combined_wins = int((hc_wins_row or {}).get('hc_wins') or 0)
+            self.high_combined_wins = hc_wins
             self.aom_earned         = int(stats['total_aom_earned'] or 0)
             self.update()
 
+    BULK_STAT_COLUMNS = (
+        ("Average", "average"),
+        ("MeetPoints", "meet_points"),
+        ("ARXPoints", "arx_points"),
+        ("NARXPoints", "narx_points"),
+        ("ShowPoints", "show_points"),
+        ("DPCPoints", "dpc_points"),
+        ("DPCLegs", "dpc_legs"),
+        ("MeetAppearences", "meet_appearences"),
+        ("MeetWins", "meet_wins"),
+        ("HighCombinedWins", "high_combined_wins"),
+        ("AOMEarned", "aom_earned"),
+    )
+
+    @classmethod
+    def recompute_stats_bulk(cls, cwa_numbers=None, batch_size=500, progress=None):
+        """
+        Set-based version of update_from_meet_results for many dogs at once.
+        Runs a fixed number of grouped queries over MeetResults and writes the
+        results back with multi-row UPDATEs. Only dogs whose stats changed are written.
+        Pass cwa_numbers to limit the recompute to those dogs.
+        progress, if given, is called as progress(processed, total, message).
+        """
+        if cwa_numbers is not None:
+            cwa_numbers = sorted({c for c in cwa_numbers if c})
+            if not cwa_numbers:
+                return {"dogs": 0, "changed": 0, "unchanged": 0, "batches": 0}
+
+        def dog_filter(column):
+            if cwa_numbers is None:
+                return "", []
+            return f" AND {column} IN ({_in_clause(cwa_numbers)})", list(cwa_numbers)
+
+        where, params = dog_filter("CWANumber")
+        current_rows = fetch_all(
+            f"""
+            SELECT CWANumber, Average, MeetPoints, ARXPoints, NARXPoints, ShowPoints,
+                   DPCPoints, DPCLegs, MeetAppearences, MeetWins, HighCombinedWins, AOMEarned
+            FROM Dog
+            WHERE 1 = 1{where}
+            """,
+            params,
+        ) or []
+
+        where, params = dog_filter("mr.CWANumber")
+        totals_rows = fetch_all(
+            f"""
+            SELECT
+                mr.CWANumber,
+                SUM(mr.MeetPoints) as total_meet_points,
+                SUM(mr.ARXEarned) as total_arx,
+                SUM(mr.NARXEarned) as total_narx,
+                SUM(mr.ShowPoints) as total_show_points,
+                SUM(mr.DPCPoints) as total_dpc_points,
+                SUM(mr.DPCLeg) as total_dpc_legs,
+                SUM(CASE WHEN mr.MeetPlacement = 1 THEN 1 ELSE 0 END) as meet_wins,
+                SUM(CASE WHEN mr.EntryType='REG' THEN 1 ELSE 0 END) as meet_appearances,
+                SUM(mr.AOMEarned) as total_aom_earned
+            FROM MeetResults mr
+            LEFT JOIN (
+                SELECT DISTINCT MeetNumber, CWANumber
+                FROM RaceResults
+                WHERE Incident IS NOT NULL
+                  AND TRIM(Incident) != ''
+            ) inc ON inc.MeetNumber = mr.MeetNumber AND inc.CWANumber = mr.CWANumber
+            WHERE inc.CWANumber IS NULL{where}
+            GROUP BY mr.CWANumber
+            """,
+            params,
+        ) or []
+
+        where, params = dog_filter("CWANumber")
+        hc_rows = fetch_all(
+            f"""
+            SELECT CWANumber, COUNT(*) AS hc_wins
+            FROM MeetHighCombinedWinner
+            WHERE Basis = %s{where}
+            GROUP BY CWANumber
+            """,
+            [MeetHighCombinedWinner.ALL_PLACED] + params,
+        ) or []
+
+        where, params = dog_filter("mr.CWANumber")
+        recent_rows = fetch_all(
+            f"""
+            SELECT recent.CWANumber, recent.MeetPoints
+            FROM (
+                SELECT
+                    mr.CWANumber,
+                    mr.MeetPoints,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY mr.CWANumber
+                        ORDER BY m.MeetDate DESC, mr.MeetNumber DESC
+                    ) AS recent_rank
+                FROM MeetResults mr
+                JOIN Meet m ON m.MeetNumber = mr.MeetNumber
+                WHERE 1 = 1{where}
+            ) recent
+            WHERE recent.recent_rank <= 3 AND recent.MeetPoints IS NOT NULL
+            """,
+            params,
+        ) or []
+
+        totals = {r["CWANumber"]: r for r in totals_rows}
+        hc_wins = {r["CWANumber"]: int(r.get("hc_wins") or 0) for r in hc_rows}
+        recent_points = {}
+        for r in recent_rows:
+            recent_points.setdefault(r["CWANumber"], []).append(float(r["MeetPoints"]))
+
+        changed = []
+        for row in current_rows:
+            cwa = row["CWANumber"]
+            stats = totals.get(cwa) or {}
+            points = recent_points.get(cwa) or []
+            average = round(sum(points) / len(points), 2) if len(points) >= 3 else row.get("Average")
+
+            new_values = {
+                "average": average,
+                "meet_points": float(stats.get("total_meet_points") or 0),
+                "arx_points": float(stats.get("total_arx") or 0),
+                "narx_points": float(stats.get("total_narx") or 0),
+                "show_points": float(stats.get("total_show_points") or 0),
+                "dpc_points": float(stats.get("total_dpc_points") or 0),
+                "dpc_legs": int(stats.get("total_dpc_legs") or 0),
+                "meet_appearences": int(stats.get("meet_appearances") or 0),
+                "meet_wins": int(stats.get("meet_wins") or 0),
+                "high_combined_wins": hc_wins.get(cwa, 0),
+                "aom_earned": int(stats.get("total_aom_earned") or 0),
+            }
+
+            is_changed = any(
+                round(_float_or_zero(row.get(column)), 2) != round(_float_or_zero(new_values[attr]), 2)
+                for column, attr in cls.BULK_STAT_COLUMNS
+            )
+            if is_changed:
+                changed.append((cwa, new_values))
+
+        if progress:
+            progress(0, len(changed), f"Writing {len(changed)} changed dogs")
+
+        batches = 0
+        written = 0
+        for batch in _chunks(changed, batch_size):
+            cls._bulk_update_stats(batch)
+            batches += 1
+            written += len(batch)
+            if progress:
+                progress(written, len(changed))
+
+        return {
+            "dogs": len(current_rows),
+            "changed": len(changed),
+            "unchanged": len(current_rows) - len(changed),
+            "batches": batches,
+        }
+
+    @classmethod
+    def _bulk_update_stats(cls, batch):
+        """Write one batch of (cwa_number, values) pairs with a single UPDATE ... JOIN."""
+        columns = [column for column, _ in cls.BULK_STAT_COLUMNS]
+        first_select = "SELECT %s AS CWANumber, " + ", ".join(f"%s AS {column}" for column in columns)
+        other_select = "SELECT " + ", ".join(["%s"] * (len(columns) + 1))
+        derived = " UNION ALL ".join([first_select] + [other_select] * (len(batch) - 1))
+        assignments = ", ".join(f"d.{column} = v.{column}" for column in columns)
+
+        params = []
+        for cwa, values in batch:
+            params.append(cwa)
+            params.extend(values[attr] for _, attr in cls.BULK_STAT_COLUMNS)
+
+        execute(
+            f"""
+            UPDATE Dog d
+            JOIN ({derived}) v ON v.CWANumber = d.CWANumber
+            SET {assignments}
+            """,
+            params,
+        )
+
     def get_owner_emails(self):
         rows = fetch_all(
             """
@@ -1084,129 +1201,48 @@ class Dog:
         return stats["COUNT(*)"]
     
     @classmethod
-    def get_ytd_show_points(cls, cwa_number: str, year: int | None = None):
-        if year is None:
+    def get_ytd_show_points(cls, cwa_number: str, year: int | None = None, start=None, end=None):
+        """Show points in a year (default this one) or an inclusive from/to season window."""
+        if year is None and not (start or end):
             year = datetime.now().year
-        
+        period = resolve_range(year, start, end)
+
         row = fetch_one("""
             SELECT 
                 SUM(ShowPoints) as ytd_show_points
             FROM MeetResults mr
             JOIN Meet m ON m.MeetNumber = mr.MeetNumber
             WHERE mr.CWANumber = %s
-              AND YEAR(m.MeetDate) = %s
-        """, (cwa_number, year)) or {}
+              AND m.MeetDate >= %s AND m.MeetDate < %s
+        """, (cwa_number, *period)) or {}
         
         return {
-            "year": year,
+            "year": None if start else year,
             "ytdShowPoints": float(row.get("ytd_show_points") or 0)
         }
     
     @classmethod
     def get_high_combined_wins(cls, cwa_number: str):
-        row = fetch_one("""
-            WITH eligible AS (
-                SELECT
-                    mr.MeetNumber,
-                    mr.CWANumber,
-                    mr.MeetPlacement,
-                    mr.ConformationPlacement,
-                    (mr.MeetPlacement + mr.ConformationPlacement) AS combined_score
-                FROM MeetResults mr
-                WHERE mr.MeetPlacement IS NOT NULL
-                AND mr.ConformationPlacement IS NOT NULL
-                AND mr.MeetPlacement < (
-                    SELECT MAX(x.MeetPlacement)
-                    FROM MeetResults x
-                    WHERE x.MeetNumber = mr.MeetNumber
-                    AND x.MeetPlacement IS NOT NULL
-                )
-                AND mr.ConformationPlacement < (
-                    SELECT MAX(y.ConformationPlacement)
-                    FROM MeetResults y
-                    WHERE y.MeetNumber = mr.MeetNumber
-                    AND y.ConformationPlacement IS NOT NULL
-                )
-            ),
-            winners AS (
-                SELECT e.*
-                FROM eligible e
-                WHERE e.combined_score = (
-                    SELECT MIN(e2.combined_score)
-                    FROM eligible e2
-                    WHERE e2.MeetNumber = e.MeetNumber
-                )
-                AND e.MeetPlacement = (
-                    SELECT MIN(e3.MeetPlacement)
-                    FROM eligible e3
-                    WHERE e3.MeetNumber = e.MeetNumber
-                    AND e3.combined_score = e.combined_score
-                )
-            )
-            SELECT COUNT(*) AS hc_wins
-            FROM winners
-            WHERE CWANumber = %s
-        """, (cwa_number,)) or {}
-
         return {
             "cwaNumber": cwa_number,
-            "highCombinedWins": int(row.get("hc_wins") or 0)
+            "highCombinedWins": MeetHighCombinedWinner.count_for_dog(
+                cwa_number, MeetHighCombinedWinner.EXCLUDING_LAST
+            )
         }
     
     @classmethod
-    def get_ytd_high_combined_wins(cls, cwa_number: str, year: int | None = None):
-        if year is None:
-            from datetime import datetime
+    def get_ytd_high_combined_wins(cls, cwa_number: str, year: int | None = None, start=None, end=None):
+        """High combined wins in a year (default this one) or an inclusive from/to season window."""
+        if year is None and not (start or end):
             year = datetime.now().year
 
-        row = fetch_one("""
-            WITH eligible AS (
-                SELECT
-                    mr.MeetNumber,
-                    mr.CWANumber,
-                    mr.MeetPlacement,
-                    mr.ConformationPlacement,
-                    (mr.MeetPlacement + mr.ConformationPlacement) AS combined_score
-                FROM MeetResults mr
-                JOIN Meet m ON m.MeetNumber = mr.MeetNumber
-                WHERE YEAR(m.MeetDate) = %s
-                AND mr.MeetPlacement IS NOT NULL
-                AND mr.ConformationPlacement IS NOT NULL
-                AND mr.MeetPlacement < (
-                    SELECT MAX(x.MeetPlacement)
-                    FROM MeetResults x
-                    WHERE x.MeetNumber = mr.MeetNumber
-                    AND x.MeetPlacement IS NOT NULL
-                )
-                AND mr.ConformationPlacement < (
-                    SELECT MAX(y.ConformationPlacement)
-                    FROM MeetResults y
-                    WHERE y.MeetNumber = mr.MeetNumber
-                    AND y.ConformationPlacement IS NOT NULL
-                )
-            ),
-            winners AS (
-                SELECT e.*
-                FROM eligible e
-                WHERE e.combined_score = (
-                    SELECT MIN(e2.combined_score)
-                    FROM eligible e2
-                    WHERE e2.MeetNumber = e.MeetNumber
-                )
-                AND e.MeetPlacement = (
-                    SELECT MIN(e3.MeetPlacement)
-                    FROM eligible e3
-                    WHERE e3.MeetNumber = e.MeetNumber
-                    AND e3.combined_score = e.combined_score
-                )
-            )
-            SELECT COUNT(*) AS ytd_hc_wins
-            FROM winners
-            WHERE CWANumber = %s
-        """, (year, cwa_number)) or {}
+        period_start, period_end = resolve_range(year, start, end)
+        hc_wins = MeetHighCombinedWinner.count_for_dog(
+            cwa_number, MeetHighCombinedWinner.EXCLUDING_LAST, start=period_start, end=period_end,
+        )
 
         return {
             "cwaNumber": cwa_number,
-            "year": year,
-            "ytdHighCombinedWins": int(row.get("ytd_hc_wins") or 0)
+            "year": None if start else year,
+            "ytdHighCombinedWins": hc_wins
         }
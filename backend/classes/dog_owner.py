@@ -1,4 +1,5 @@
 from database import fetch_all, fetch_one, execute
+from classes.dog_search_index import DogSearchIndex
 
 class DogOwner:
     def __init__(self, cwa_id, person_id, last_edited_by=None, last_edited_at=None):
@@ -109,6 +110,7 @@ class DogOwner:
             """,
             (self.cwa_id, self.person_id, self.last_edited_by, self.last_edited_at),
         )
+        DogSearchIndex.refresh([self.cwa_id])
         return True
 
     def update(self):
@@ -132,6 +134,7 @@ class DogOwner:
             """,
             (cwa_id, person_id),
         )
+        DogSearchIndex.refresh([cwa_id])
         return True
 
     @staticmethod
@@ -156,6 +159,7 @@ class DogOwner:
             """,
             (cwa_id,),
         )
+        DogSearchIndex.refresh([cwa_id])
         return True
     
     @staticmethod
@@ -0,0 +1,310 @@
+'''
+Docstring for dog_search_index
+
+Inverted index behind /api/dog/search. Each dog's searchable text (CWA and
+registered numbers, registered and call names, owners, titles) is split into
+lowercase word tokens stored in DogSearchToken with a per-field weight.
+
+A query matches a dog when every query word is a prefix of one of its
+tokens; Token LIKE 'word%' is a range scan on the primary key, unlike the
+old '%q%' predicates. Dogs rank by the summed weight of their best token per
+query word, with a bonus for whole-word matches.
+
+Rows are refreshed per dog when a dog, its owners or its titles change, and
+for all of a person's dogs when the person is renamed or deleted. Inside
+DogSearchIndex.deferred() (every request and job) those refreshes are
+collected and run once when the block exits.
+'''
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from database import fetch_all, fetch_one, execute, transaction, _in_clause
+from utils import keyset
+
+TOKEN_LENGTH = 64
+MAX_QUERY_TERMS = 8
+EXACT_BONUS = 3
+REFRESH_CHUNK = 500
+
+# field -> weight of a match in it
+WEIGHTS = {
+    "cwa": 5,
+    "regno": 4,
+    "name": 3,
+    "call": 3,
+    "owner": 2,
+    "title": 2,
+    "ownerid": 1,
+}
+
+_WORD = re.compile(r"[^\W_]+")
+
+# CWA numbers refreshed inside DogSearchIndex.deferred(), indexed when it exits.
+_dirty = ContextVar("dog_search_dirty", default=None)
+
+
+def tokenize(text):
+    """Lowercase word tokens of text, each cut to TOKEN_LENGTH characters."""
+    return [w[:TOKEN_LENGTH] for w in _WORD.findall(str(text or "").lower())]
+
+
+class DogSearchIndex:
+
+    # sort name -> keyset ordering; the last column is unique
+    ORDERINGS = {
+        "nameAsc": [("d.RegisteredName", "ASC"), ("d.CWANumber", "ASC")],
+        "nameDesc": [("d.RegisteredName", "DESC"), ("d.CWANumber", "DESC")],
+        "cwaAsc": [("d.CWANumber", "ASC")],
+        "cwaDesc": [("d.CWANumber", "DESC")],
+        "birthAsc": [("d.Birthdate", "ASC"), ("d.CWANumber", "ASC")],
+        "birthDesc": [("d.Birthdate", "DESC"), ("d.CWANumber", "DESC")],
+    }
+    RELEVANCE = [("s.score", "DESC"), ("d.RegisteredName", "ASC"), ("d.CWANumber", "ASC")]
+
+    @classmethod
+    def search(cls, query, owner_person_id=None, page=1, limit=None, sort=None, cursor=None):
+        """
+        (rows, next cursor) for dogs matching query: d.* plus ownerName and
+        titles, best match first unless sort names one of ORDERINGS. With a
+        cursor the page starts after it (keyset); otherwise page is used as
+        an offset. The next cursor is None on the last page or without a limit.
+        """
+        matches, params = cls._matches(query, owner_person_id)
+        sort = sort if sort in cls.ORDERINGS else "relevance"
+        columns = cls.ORDERINGS.get(sort, cls.RELEVANCE)
+        sql = f"""
+            SELECT d.CWANumber, {keyset.key_select(columns)}
+            FROM ({matches}) s
+            JOIN Dog d ON d.CWANumber = s.CWANumber
+        """
+        if cursor:
+            predicate, after_params = keyset.after(columns, keyset.decode_cursor(cursor, sort, columns))
+            sql += f" WHERE {predicate}"
+            params += after_params
+        sql += " " + keyset.order_by(columns)
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit + 1)
+            if not cursor:
+                sql += " OFFSET %s"
+                params.append((max(page, 1) - 1) * limit)
+        rows = fetch_all(sql, params) or []
+        if limit is None:
+            next_cursor = None
+        else:
+            rows, next_cursor = keyset.split_page(rows, limit, sort, columns)
+        return cls._dog_rows([r["CWANumber"] for r in rows]), next_cursor
+
+    @classmethod
+    def count(cls, query, owner_person_id=None):
+        matches, params = cls._matches(query, owner_person_id)
+        row = fetch_one(f"SELECT COUNT(*) AS total FROM ({matches}) s", params) or {}
+        return int(row.get("total") or 0)
+
+    @classmethod
+    def _matches(cls, query, owner_person_id):
+        """(SQL selecting CWANumber, score for matching dogs, params)."""
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        params = []
+        if terms:
+            per_term = []
+            for term in terms:
+                per_term.append(
+                    f"""
+                    SELECT CWANumber, MAX(Weight + (Token = %s) * {EXACT_BONUS}) AS best
+                    FROM DogSearchToken
+                    WHERE Token LIKE %s
+                    GROUP BY CWANumber
+                    """
+                )
+                params += [term, term + "%"]
+            sql = f"""
+                SELECT hits.CWANumber, SUM(hits.best) AS score
+                FROM ({" UNION ALL ".join(per_term)}) hits
+                GROUP BY hits.CWANumber
+                HAVING COUNT(*) = {len(terms)}
+            """
+        else:
+            sql = "SELECT CWANumber, 0 AS score FROM Dog"
+
+        if owner_person_id:
+            sql = f"""
+                SELECT m.CWANumber, m.score
+                FROM ({sql}) m
+                WHERE EXISTS (
+                    SELECT 1 FROM DogOwner o WHERE o.CWAID = m.CWANumber AND o.PersonID = %s
+                )
+            """
+            params.append(owner_person_id)
+        return sql, params
+
+    @classmethod
+    def _dog_rows(cls, cwa_numbers):
+        """Full Dog rows with owner names and titles for cwa_numbers, in that order."""
+        if not cwa_numbers:
+            return []
+        rows = fetch_all(
+            f"""
+            SELECT
+                d.*,
+                (
+                    SELECT GROUP_CONCAT(
+                        DISTINCT CONCAT_WS(' ', p.FirstName, p.LastName)
+                        ORDER BY p.LastName, p.FirstName
+                        SEPARATOR ', '
+                    )
+                    FROM DogOwner do
+                    JOIN Person p ON p.ID = do.PersonID
+                    WHERE do.CWAID = d.CWANumber
+                ) AS ownerName,
+                (
+                    SELECT GROUP_CONCAT(DISTINCT dt.Title ORDER BY dt.Title SEPARATOR ', ')
+                    FROM DogTitles dt
+                    WHERE dt.CWANumber = d.CWANumber
+                ) AS titles
+            FROM Dog d
+            WHERE d.CWANumber IN ({_in_clause(cwa_numbers)})
+            """,
+            cwa_numbers,
+        ) or []
+        by_cwa = {r["CWANumber"]: r for r in rows}
+        return [by_cwa[c] for c in cwa_numbers if c in by_cwa]
+
+    @classmethod
+    def refresh(cls, cwa_numbers):
+        """
+        Re-index the given dogs; dogs that no longer exist are dropped from
+        the index. Inside deferred() they are only queued.
+        """
+        dirty = _dirty.get()
+        if dirty is not None:
+            dirty.update(c for c in cwa_numbers if c)
+            return
+        cls._refresh_now(cwa_numbers)
+
+    @classmethod
+    def _refresh_now(cls, cwa_numbers):
+        cwa_numbers = sorted({c for c in cwa_numbers if c})
+        for i in range(0, len(cwa_numbers), REFRESH_CHUNK):
+            cls._refresh_chunk(cwa_numbers[i:i + REFRESH_CHUNK])
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        """
+        Collect every refresh() made inside the block and re-index those dogs
+        once when it exits. Nested blocks share the outermost one.
+        """
+        token = cls.start_deferred()
+        try:
+            yield
+        finally:
+            cls.end_deferred(token)
+
+    @classmethod
+    def start_deferred(cls):
+        """Start collecting refreshes; returns the token for end_deferred() (None if already collecting)."""
+        if _dirty.get() is not None:
+            return None
+        return _dirty.set(set())
+
+    @classmethod
+    def end_deferred(cls, token):
+        if token is None:
+            return
+        try:
+            cls.flush()
+        finally:
+            _dirty.reset(token)
+
+    @classmethod
+    def flush(cls):
+        """Re-index the dogs queued so far, e.g. after each chunk of a long job."""
+        dirty = _dirty.get()
+        if not dirty:
+            return
+        cwa_numbers = list(dirty)
+        dirty.clear()
+        cls._refresh_now(cwa_numbers)
+
+    @classmethod
+    def refresh_for_person(cls, person_id):
+        """Re-index every dog the person owns (their name is part of those dogs' tokens)."""
+        cls.refresh(cls.dogs_for_person(person_id))
+
+    @staticmethod
+    def dogs_for_person(person_id):
+        rows = fetch_all("SELECT CWAID FROM DogOwner WHERE PersonID = %s", (person_id,)) or []
+        return [r["CWAID"] for r in rows]
+
+    @classmethod
+    def rebuild(cls):
+        """Re-index every dog."""
+        execute("DELETE FROM DogSearchToken")
+        cls._refresh_now(r["CWANumber"] for r in fetch_all("SELECT CWANumber FROM Dog") or [])
+
+    @classmethod
+    def ensure_built(cls):
+        """Build the index once if it is empty but dogs exist (e.g. right after the migration)."""
+        if fetch_one("SELECT 1 AS found FROM DogSearchToken LIMIT 1"):
+            return
+        if fetch_one("SELECT 1 AS found FROM Dog LIMIT 1"):
+            cls.rebuild()
+
+    @classmethod
+    def _refresh_chunk(cls, cwa_numbers):
+        placeholders = _in_clause(cwa_numbers)
+        dogs = fetch_all(
+            f"""
+            SELECT CWANumber, RegisteredNumber, RegisteredName, CallName
+            FROM Dog
+            WHERE CWANumber IN ({placeholders})
+            """,
+            cwa_numbers,
+        ) or []
+        owners = fetch_all(
+            f"""
+            SELECT do.CWAID, do.PersonID, p.FirstName, p.LastName
+            FROM DogOwner do
+            LEFT JOIN Person p ON p.ID = do.PersonID
+            WHERE do.CWAID IN ({placeholders})
+            """,
+            cwa_numbers,
+        ) or []
+        titles = fetch_all(
+            f"SELECT CWANumber, Title FROM DogTitles WHERE CWANumber IN ({placeholders})",
+            cwa_numbers,
+        ) or []
+
+        texts = []
+        for d in dogs:
+            cwa = d["CWANumber"]
+            texts += [
+                (cwa, "cwa", cwa),
+                (cwa, "regno", d["RegisteredNumber"]),
+                (cwa, "name", d["RegisteredName"]),
+                (cwa, "call", d["CallName"]),
+            ]
+        for o in owners:
+            texts += [
+                (o["CWAID"], "owner", f"{o['FirstName'] or ''} {o['LastName'] or ''}"),
+                (o["CWAID"], "ownerid", o["PersonID"]),
+            ]
+        texts += [(t["CWANumber"], "title", t["Title"]) for t in titles]
+
+        existing = {d["CWANumber"] for d in dogs}
+        rows = {
+            (token, cwa, field, WEIGHTS[field])
+            for cwa, field, text in texts
+            if cwa in existing
+            for token in tokenize(text)
+        }
+
+        with transaction() as tx:
+            tx.execute(f"DELETE FROM DogSearchToken WHERE CWANumber IN ({placeholders})", cwa_numbers)
+            if rows:
+                tx.execute_many(
+                    "INSERT IGNORE INTO DogSearchToken (Token, CWANumber, Field, Weight) VALUES (%s, %s, %s, %s)",
+                    sorted(rows),
+                )
@@ -6,9 +6,10 @@ TODO:
 from database import fetch_all, fetch_one, execute
 from mysql.connector import Error
 from classes.change_log import ChangeLog
+from classes.dog_search_index import DogSearchIndex
 from datetime import datetime
 from utils.email_service import send_titles_email
-from utils.generate_pdf import generate_title_pdf
+from utils.generate_pdf import render_title_certificates
 
 class DogTitle:
     def __init__(self, cwa_number, title, title_number, title_date, name_prefix, name_suffix,
@@ -96,6 +97,19 @@ class DogTitle:
             errors.append("Title number must be 10 characters or less")
         return errors
 
+    UPSERT_COLUMNS = (
+        "CWANumber", "Title", "TitleNumber", "TitleDate", "NamePrefix", "NameSuffix",
+        "LastEditedBy", "LastEditedAt",
+    )
+    UPSERT_KEY = ("CWANumber", "Title")
+
+    def upsert_params(self):
+        """Values in UPSERT_COLUMNS order, for multi-row writes."""
+        return (
+            self.cwa_number, self.title, self.title_number, self.title_date,
+            self.name_prefix, self.name_suffix, self.last_edited_by, self.last_edited_at,
+        )
+
     def save(self):
         """Save dog title to database. Returns True on success, raises Error on failure."""
         try:
@@ -118,6 +132,7 @@ class DogTitle:
                     self.last_edited_at
                 ),
             )
+            DogSearchIndex.refresh([self.cwa_number])
             return True
         except Error as e:
             raise e
@@ -161,6 +176,7 @@ class DogTitle:
                 """,
                 (cwa_number, title),
             )
+            DogSearchIndex.refresh([cwa_number])
             return True
         except Error as e:
             raise e
@@ -190,7 +206,10 @@ class DogTitle:
     @classmethod
     def delete_all_for_title(cls, title):
         title = (title or "").strip()
-        execute("DELETE FROM DogTitles WHERE Title = %s", (title,))
+        dogs = [r["CWANumber"] for r in fetch_all("SELECT CWANumber FROM DogTitles WHERE Title = %s", (title,)) or []]
+        deleted = execute("DELETE FROM DogTitles WHERE Title = %s", (title,))
+        DogSearchIndex.refresh(dogs)
+        return deleted
 
     @classmethod
     def delete_all_for_dog(cls, cwa_number):
@@ -202,6 +221,7 @@ class DogTitle:
             """,
             (cwa_number,),
         )
+        DogSearchIndex.refresh([cwa_number])
         return True
 
     @classmethod
@@ -233,7 +253,8 @@ class DogTitle:
                 (title, f"Auto-created title type for {title}")
             )
 
-        for title in titles_to_add:
+        awarded = []
+        for title in sorted(titles_to_add):
             new_title = cls(
                 cwa_number=dog.cwa_number,
                 title=title,
@@ -246,12 +267,8 @@ class DogTitle:
             )
 
             new_title.save()
+            awarded.append(title)
 
-            if send_email:
-                pdf_bytes = generate_title_pdf(dog, title)
-                for email in dog.get_owner_emails():
-                    send_titles_email(email, pdf_bytes, f"{dog.registered_name}_{title}.pdf")
-            
             ChangeLog.log(
                 changed_table="DogTitles",
                 record_pk=f"{dog.cwa_number}:{title}",
@@ -262,6 +279,14 @@ class DogTitle:
                 after_obj=new_title.to_dict()
             )
 
+        if send_email and awarded:
+            # every new certificate for the dog rendered in one pass
+            certificates = render_title_certificates((dog, title) for title in awarded)
+            emails = dog.get_owner_emails()
+            for title, pdf_bytes in zip(awarded, certificates):
+                for email in emails:
+                    send_titles_email(email, pdf_bytes, f"{dog.registered_name}_{title}.pdf")
+
     @classmethod
     def list_for_dog(cls, cwa_number):
         rows = fetch_all(
@@ -0,0 +1,181 @@
+'''
+Docstring for email_outbox
+
+Outbound emails waiting to be sent. Request handlers and title syncs only
+insert a row here; utils.email_dispatcher sends them in the background, so
+nothing waits on the mail provider.
+
+A row is PENDING until a dispatcher claims it, which sets it SENDING and
+pushes NextAttemptAt out by CLAIM_SECONDS; if that dispatcher dies, the row
+becomes claimable again once that passes. A failed send goes back to
+PENDING with an exponential backoff, and to FAILED after MAX_ATTEMPTS.
+Claims use SELECT ... FOR UPDATE SKIP LOCKED, so every gunicorn worker can
+run a dispatcher without sending anything twice.
+'''
+
+from database import fetch_all, execute, transaction
+import json
+import os
+
+
+class EmailOutbox:
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+    MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+    BACKOFF_BASE_SECONDS = 30
+    BACKOFF_MAX_SECONDS = 3600
+    CLAIM_SECONDS = 300
+    KEEP_SENT_DAYS = 30
+
+    def __init__(self, id=None, to_email=None, subject=None, html=None, attachments=None,
+                 status=PENDING, attempts=0, last_error=None, created_at=None, sent_at=None):
+        self.id = id
+        self.to_email = to_email
+        self.subject = subject
+        self.html = html
+        self.attachments = attachments or []
+        self.status = status
+        self.attempts = int(attempts or 0)
+        self.last_error = last_error
+        self.created_at = created_at
+        self.sent_at = sent_at
+
+    @classmethod
+    def from_db_row(cls, row):
+        if not row:
+            return None
+        return cls(
+            id=row.get("ID"),
+            to_email=row.get("ToEmail"),
+            subject=row.get("Subject"),
+            html=row.get("Html"),
+            attachments=json.loads(row["Attachments"]) if row.get("Attachments") else [],
+            status=row.get("Status"),
+            attempts=row.get("Attempts"),
+            last_error=row.get("LastError"),
+            created_at=row.get("CreatedAt"),
+            sent_at=row.get("SentAt"),
+        )
+
+    @classmethod
+    def enqueue(cls, to_email, subject, html, attachments=None):
+        """
+        Queue one email; attachments is a list of {"filename", "content"}
+        dicts with base64 content. Inside a transaction() the email is only
+        queued if the transaction commits.
+        """
+        email_id = execute(
+            """
+            INSERT INTO EmailOutbox (ToEmail, Subject, Html, Attachments, Status, Attempts, NextAttemptAt, CreatedAt)
+            VALUES (%s, %s, %s, %s, %s, 0, NOW(), NOW())
+            """,
+            (to_email, subject, html, json.dumps(attachments) if attachments else None, cls.PENDING),
+            return_lastrowid=True,
+        )
+        return cls(id=email_id, to_email=to_email, subject=subject, html=html, attachments=attachments)
+
+    @classmethod
+    def claim_batch(cls, limit):
+        """Claim up to limit due emails for this dispatcher and mark them SENDING."""
+        with transaction() as tx:
+            rows = tx.fetch_all(
+                """
+                SELECT ID, ToEmail, Subject, Html, Attachments, Status, Attempts, LastError, CreatedAt, SentAt
+                FROM EmailOutbox
+                WHERE Status IN (%s, %s) AND NextAttemptAt <= NOW()
+                ORDER BY NextAttemptAt, ID
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (cls.PENDING, cls.SENDING, limit),
+            ) or []
+            if not rows:
+                return []
+            ids = [r["ID"] for r in rows]
+            tx.execute(
+                f"""
+                UPDATE EmailOutbox
+                SET Status = %s, Attempts = Attempts + 1, NextAttemptAt = NOW() + INTERVAL %s SECOND
+                WHERE ID IN ({", ".join(["%s"] * len(ids))})
+                """,
+                [cls.SENDING, cls.CLAIM_SECONDS] + ids,
+            )
+        emails = [cls.from_db_row(r) for r in rows]
+        for email in emails:
+            email.status = cls.SENDING
+            email.attempts += 1
+        return emails
+
+    @classmethod
+    def mark_sent(cls, ids):
+        """Attachments are dropped once sent; they are only kept for retries."""
+        if not ids:
+            return
+        execute(
+            f"""
+            UPDATE EmailOutbox
+            SET Status = %s, SentAt = NOW(), Attachments = NULL, LastError = NULL
+            WHERE ID IN ({", ".join(["%s"] * len(ids))})
+            """,
+            [cls.SENT] + list(ids),
+        )
+
+    def mark_failed(self, error):
+        """Schedule a retry with exponential backoff, or give up after MAX_ATTEMPTS."""
+        self.last_error = str(error)[:1000]
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = self.FAILED
+            delay = 0
+        else:
+            self.status = self.PENDING
+            delay = min(self.BACKOFF_BASE_SECONDS * 2 ** (self.attempts - 1), self.BACKOFF_MAX_SECONDS)
+        execute(
+            """
+            UPDATE EmailOutbox
+            SET Status = %s, LastError = %s, NextAttemptAt = NOW() + INTERVAL %s SECOND
+            WHERE ID = %s
+            """,
+            (self.status, self.last_error, delay, self.id),
+        )
+
+    @classmethod
+    def purge_sent(cls, days=KEEP_SENT_DAYS):
+        return execute(
+            "DELETE FROM EmailOutbox WHERE Status = %s AND SentAt < NOW() - INTERVAL %s DAY",
+            (cls.SENT, days),
+        )
+
+    @classmethod
+    def list_recent(cls, limit=50):
+        rows = fetch_all(
+            """
+            SELECT ID, ToEmail, Subject, Html, NULL AS Attachments, Status, Attempts, LastError, CreatedAt, SentAt
+            FROM EmailOutbox
+            ORDER BY ID DESC
+            LIMIT %s
+            """,
+            (limit,),
+        ) or []
+        return [cls.from_db_row(r) for r in rows]
+
+    def to_message(self):
+        """The provider-neutral message handed to a transport."""
+        message = {"to": self.to_email, "subject": self.subject, "html": self.html}
+        if self.attachments:
+            message["attachments"] = self.attachments
+        return message
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "toEmail": self.to_email,
+            "subject": self.subject,
+            "status": self.status,
+            "attempts": self.attempts,
+            "lastError": self.last_error,
+            "createdAt": self.created_at,
+            "sentAt": self.sent_at,
+        }
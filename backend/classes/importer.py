@@ -1,16 +1,25 @@
 # still need to do a little work on this one 
 import csv
 import io
+import unicodedata
+from decimal import Decimal
 from datetime import datetime, timezone
+from mysql.connector import Error
+
+from database import fetch_all, transaction, upsert_sql, insert_ignore_sql, _chunks, _in_clause
 
 from classes.dog_owner import DogOwner
 from classes.dog import Dog
 from classes.meet import Meet
 from classes.person import Person
 from classes.meet_result import MeetResult
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+from classes.meet_recompute import MeetRecompute
+from classes.ytd_standings import YTDStandings
 from classes.race_result import RaceResult
 from classes.change_log import ChangeLog
 from classes.dog_title import DogTitle
+from classes.dog_search_index import DogSearchIndex
 from utils.auth_helpers import current_editor_id
 
 class CsvImporter:
@@ -153,6 +162,30 @@ class CsvImporter:
         },
     }
 
+    BULK_CHUNK_SIZE = 500
+    STREAM_CHUNK_ROWS = 2000
+
+    # Types that can go through _import_entity_bulk. scope_* is the column used
+    # to prefetch existing rows for the whole file, foreign_keys maps payload
+    # fields to the (table, column) they must exist in.
+    BULK_ENTITIES = {
+        "meet_results": {
+            "scope_field": "meetNumber", "scope_column": "MeetNumber",
+            "pk_columns": ("MeetNumber", "CWANumber"),
+            "foreign_keys": {"meetNumber": ("Meet", "MeetNumber"), "cwaNumber": ("Dog", "CWANumber")},
+        },
+        "race_results": {
+            "scope_field": "meetNumber", "scope_column": "MeetNumber",
+            "pk_columns": ("MeetNumber", "CWANumber", "Program", "RaceNumber"),
+            "foreign_keys": {"meetNumber": ("Meet", "MeetNumber"), "cwaNumber": ("Dog", "CWANumber")},
+        },
+        "dog_titles": {
+            "scope_field": "cwaNumber", "scope_column": "CWANumber",
+            "pk_columns": ("CWANumber", "Title"),
+            "foreign_keys": {"cwaNumber": ("Dog", "CWANumber"), "title": ("TitleType", "Title")},
+        },
+    }
+
     POST_SAVE_HOOKS = {
         "dogs": lambda obj, editor_id, now: _sync_titles_from_dog(obj, editor_id, now),
         "meet_results": lambda obj, editor_id, now: _sync_from_meet_result(obj, editor_id, now),
@@ -201,22 +234,202 @@ class CsvImporter:
 
         return payload
 
-    def import_rows(self, import_type, filename, rows, *, mode, use_adjustment=False):
+    def import_rows(self, import_type, filename, rows, *, mode, use_adjustment=False, editor_id=None,
+                    progress=None, bulk=True, total_rows=None):
+        """
+        Import an iterable of CSV dict rows. Rows are consumed STREAM_CHUNK_ROWS
+        at a time, so a generator over the upload keeps memory flat. Meet and
+        dog roll-ups and search index refreshes run after each chunk, so
+        nothing held between chunks grows with the file.
+        """
         if import_type not in self.ENTITIES:
             raise ValueError(f"Unknown CSV type: {import_type}")
-        result = self._import_entity(rows, mode=mode, import_type=import_type, use_adjustment=use_adjustment, **self.ENTITIES[import_type])
-        return {"file": filename, "type": import_type, "rows": len(rows), "mode": mode, "useAdjustment": use_adjustment, **result}
-
-    def _import_entity(self, rows, *, mode, import_type, model, table_name, pk_fields, exists, find, use_adjustment=False):
-        inserted = updated = skipped = failed = 0
-        row_errors = []
-        editor_id = current_editor_id()
-        now = datetime.now(timezone.utc)
+        use_bulk = bulk and import_type in self.BULK_ENTITIES
+        importer = self._import_entity_bulk if use_bulk else self._import_entity
+
+        if editor_id is None:
+            editor_id = current_editor_id()
+        state = _ImportState(editor_id, datetime.now(timezone.utc).replace(microsecond=0))
+
+        for chunk in _chunks(rows, self.STREAM_CHUNK_ROWS):
+            importer(
+                chunk,
+                state=state,
+                start=state.rows + 2,
+                mode=mode,
+                import_type=import_type,
+                use_adjustment=use_adjustment,
+                **self.ENTITIES[import_type],
+            )
+            state.rows += len(chunk)
+            if progress:
+                progress(state.rows, total_rows, f"Imported {state.rows} rows, recalculating affected results")
+            self._apply_deferred(import_type, state.changed_deferred, editor_id, state.now)
+            DogSearchIndex.refresh(state.search_dirty)
+            DogSearchIndex.flush()
+            state.changed_deferred.clear()
+            state.search_dirty.clear()
+
+        return {
+            "file": filename, "type": import_type, "rows": state.rows, "mode": mode,
+            "useAdjustment": use_adjustment, "bulk": use_bulk, **state.report(),
+        }
+
+    def _import_entity_bulk(self, rows, *, state, start, mode, import_type, model, table_name, pk_fields,
+                            use_adjustment=False, **_):
+        """
+        Bulk version of _import_entity for the large result tables. Existing
+        rows and FK targets are prefetched for the whole chunk, rows are
+        validated in memory, and writes go out as multi-row
+        INSERT ... ON DUPLICATE KEY UPDATE (INSERT IGNORE in insert mode) in
+        chunked transactions. Keys are compared through _collation_key, so
+        rows the database treats as the same key are the same key here.
+        """
+        spec = self.BULK_ENTITIES[import_type]
+        editor_id = state.editor_id
+        now = state.now
+        # duplicates within the chunk; ones from earlier chunks are found in the database below
+        seen = set()
+
+        candidates = []
+        for idx, row in enumerate(rows, start=start):
+            if not any(str(v).strip() for v in (row or {}).values() if v is not None):
+                continue
+
+            payload = self.row_to_payload(row, import_type, use_adjustment)
+            pk = {}
+            missing = []
+            for field in pk_fields:
+                value = (payload.get(field) or "").strip()
+                if not value:
+                    missing.append(field)
+                else:
+                    pk[field] = value
+
+            if missing:
+                state.fail({"row": idx, "error": f"Missing required field(s): {', '.join(missing)}"})
+                continue
+
+            pk_key = tuple(_collation_key(pk[f]) for f in pk_fields)
+            if pk_key in seen:
+                state.fail({"row": idx, "error": f"Duplicate PK in CSV: {self._pk_string(pk)}"})
+                continue
+            seen.add(pk_key)
+
+            obj = model.from_request_data(payload)
+            obj.last_edited_by = editor_id
+            obj.last_edited_at = now
+
+            errors = obj.validate_fields() if hasattr(obj, "validate_fields") else obj.validate()
+            if errors:
+                state.fail({"row": idx, "error": ", ".join(errors), "pk": self._pk_string(pk)})
+                continue
+
+            candidates.append((idx, pk, pk_key, obj, payload))
+
+        scope_values = {pk[spec["scope_field"]] for _, pk, _, _, _ in candidates}
+        existing = self._fetch_existing_rows(table_name, spec, scope_values)
+        fk_sets = {
+            field: _existing_keys(table, column, {payload.get(field) for *_, payload in candidates})
+            for field, (table, column) in spec["foreign_keys"].items()
+        }
+        editor_exists = not editor_id or bool(_existing_keys("Person", "ID", {editor_id}))
+
+        to_write = []
+        for idx, pk, pk_key, obj, payload in candidates:
+            errors = [
+                f"{field} '{payload.get(field)}' does not exist"
+                for field in spec["foreign_keys"]
+                if _collation_key(payload.get(field)) not in fk_sets[field]
+            ]
+            if not editor_exists:
+                errors.append("LastEditedBy must reference an existing Person")
+            if errors:
+                state.fail({"row": idx, "error": ", ".join(errors), "pk": self._pk_string(pk)})
+                continue
+
+            before_row = existing.get(pk_key)
+            if before_row and state.written_earlier(before_row.get("LastEditedBy"), before_row.get("LastEditedAt")):
+                state.fail({"row": idx, "error": f"Duplicate PK in CSV: {self._pk_string(pk)}"})
+                continue
+            if mode == "insert" and before_row:
+                state.skipped += 1
+                continue
+            to_write.append((idx, pk, pk_key, obj, payload))
+
+        written = []
+        for chunk in _chunks(to_write, self.BULK_CHUNK_SIZE):
+            try:
+                _write_chunk(model, table_name, [obj for _, _, _, obj, _ in chunk], mode)
+                written.extend(chunk)
+            except Error as e:
+                for idx, pk, *_ in chunk:
+                    state.fail({"row": idx, "error": f"Database error: {e}", "pk": self._pk_string(pk)})
+
+        after = self._fetch_existing_rows(table_name, spec, {pk[spec["scope_field"]] for _, pk, *_ in written})
+
+        log_entries = []
+        changed_deferred = state.changed_deferred
+        for idx, pk, pk_key, obj, payload in written:
+            before_row = existing.get(pk_key)
+            after_row = after.get(pk_key)
+            if mode == "insert" and not (
+                after_row and state.written_earlier(after_row.get("LastEditedBy"), after_row.get("LastEditedAt"))
+            ):
+                # INSERT IGNORE left alone a row someone else inserted since the prefetch
+                state.skipped += 1
+                continue
+            operation = "UPDATE" if before_row else "INSERT"
+            if before_row:
+                state.updated += 1
+            else:
+                state.inserted += 1
+
+            before_snapshot = model.from_db_row(before_row).to_dict() if before_row else None
+            after_snapshot = model.from_db_row(after_row).to_dict() if after_row else obj.to_dict()
+            log_entries.append({
+                "changed_table": table_name,
+                "record_pk": self._pk_string(pk),
+                "operation": operation,
+                "changed_by": editor_id,
+                "source": "api/import POST",
+                "before_obj": before_snapshot,
+                "after_obj": after_snapshot,
+            })
+
+            if operation == "UPDATE" and before_snapshot == after_snapshot:
+                continue
+            if import_type == "dog_titles":
+                state.search_dirty.add(payload.get("cwaNumber"))
+            if import_type == "meet_results":
+                changed_deferred.add((payload.get("cwaNumber"), payload.get("meetNumber")))
+            elif import_type == "race_results":
+                changed_deferred.add((payload.get("cwaNumber"), payload.get("meetNumber")))
+
+        ChangeLog.log_many(log_entries)
+
+    def _fetch_existing_rows(self, table_name, spec, scope_values):
+        """Full rows of table_name whose scope column is in scope_values, keyed by collation PK tuple."""
+        found = {}
+        for chunk in _chunks(sorted(v for v in scope_values if v), self.BULK_CHUNK_SIZE):
+            rows = fetch_all(
+                f"SELECT * FROM `{table_name}` WHERE `{spec['scope_column']}` IN ({_in_clause(chunk)})",
+                chunk,
+            ) or []
+            for r in rows:
+                found[tuple(_collation_key(r[c]) for c in spec["pk_columns"])] = r
+        return found
+
+    def _import_entity(self, rows, *, state, start, mode, import_type, model, table_name, pk_fields, exists, find,
+                       use_adjustment=False):
+        editor_id = state.editor_id
+        now = state.now
+        # duplicates within the chunk; ones from earlier chunks are found via find() below
         seen = set()
         hook = self.POST_SAVE_HOOKS.get(import_type)
-        changed_deferred = set()
+        changed_deferred = state.changed_deferred
 
-        for idx, row in enumerate(rows, start=2):
+        for idx, row in enumerate(rows, start=start):
             if not any(str(v).strip() for v in (row or {}).values() if v is not None):
                 continue
 
@@ -231,14 +444,12 @@ class CsvImporter:
                     pk[field] = value
 
             if missing:
-                failed += 1
-                row_errors.append({"row": idx, "error": f"Missing required field(s): {', '.join(missing)}"})
+                state.fail({"row": idx, "error": f"Missing required field(s): {', '.join(missing)}"})
                 continue
 
             pk_key = tuple(sorted(pk.items()))
             if pk_key in seen:
-                failed += 1
-                row_errors.append({"row": idx, "error": f"Duplicate PK in CSV: {self._pk_string(pk)}"})
+                state.fail({"row": idx, "error": f"Duplicate PK in CSV: {self._pk_string(pk)}"})
                 continue
             seen.add(pk_key)
 
@@ -250,13 +461,18 @@ class CsvImporter:
 
             errors = obj.validate() if hasattr(obj, "validate") else []
             if errors:
-                failed += 1
-                row_errors.append({"row": idx, "error": ", ".join(errors), "pk": self._pk_string(pk)})
+                state.fail({"row": idx, "error": ", ".join(errors), "pk": self._pk_string(pk)})
                 continue
 
             record_exists = exists(pk)
+            existing = find(pk) if record_exists else None
+            if existing is not None and state.written_earlier(
+                getattr(existing, "last_edited_by", None), getattr(existing, "last_edited_at", None)
+            ):
+                state.fail({"row": idx, "error": f"Duplicate PK in CSV: {self._pk_string(pk)}"})
+                continue
             if (mode == "insert" or (mode == "update" and import_type == "people")) and record_exists:
-                skipped += 1
+                state.skipped += 1
                 continue
 
             operation = "UPDATE" if record_exists else "INSERT"
@@ -286,10 +502,9 @@ class CsvImporter:
                     "high_combined_wins": "manual_high_combined_wins_adjustment",
                 }
                 if record_exists:
-                    db_obj = find(pk)
                     for score_field, raw_attr in score_to_raw.items():
                         if score_field in payload:
-                            obj.__setattr__(raw_attr, getattr(db_obj, raw_attr, 0))
+                            obj.__setattr__(raw_attr, getattr(existing, raw_attr, 0))
                             obj.__setattr__(adj_attr_map[raw_attr], float(payload[score_field] or 0 ))
                 else:
                     for score_field, raw_attr in score_to_raw.items():
@@ -297,13 +512,12 @@ class CsvImporter:
                             obj.__setattr__(raw_attr, 0)
                             obj.__setattr__(adj_attr_map[raw_attr], float(payload[score_field] or 0))
             if record_exists:
-                existing = find(pk)
                 before_snapshot = existing.to_dict() if hasattr(existing, "to_dict") else None
                 obj.update()
-                updated += 1
+                state.updated += 1
             else:
                 obj.save()
-                inserted += 1
+                state.inserted += 1
 
             refreshed = find(pk)
             after_snapshot = refreshed.to_dict() if refreshed and hasattr(refreshed, "to_dict") else (
@@ -327,8 +541,9 @@ class CsvImporter:
 
             if import_type == "meet_results":
                 cwa = payload.get("cwaNumber")
-                if cwa:
-                    changed_deferred.add(cwa)
+                meet = payload.get("meetNumber")
+                if cwa and meet:
+                    changed_deferred.add((cwa, meet))
 
             elif import_type == "race_results":
                 cwa = payload.get("cwaNumber")
@@ -343,7 +558,12 @@ class CsvImporter:
                 obj.update_from_meet_results()
                 DogTitle.sync_titles_for_dog(obj, editor_id, now, send_email=False)
 
+    
+    def _apply_deferred(self, import_type, changed_deferred, editor_id, now):
+        """Roll imported meet/race result changes up into meets, dog stats and titles."""
         affected_dogs = set()
+        affected_meets = set()
+        touched_by_meet = {}
         for item in changed_deferred:
             if import_type == "race_results":
                 cwa, meet = item
@@ -352,9 +572,7 @@ class CsvImporter:
                 if not dog:
                     continue
 
-                meet_result = MeetResult.find_by_identifier(meet, cwa)
-
-                if not meet_result:
+                if not MeetResult.exists(meet, cwa):
                     meet_result = MeetResult.from_request_data({
                         "meetNumber": meet,
                         "cwaNumber": cwa,
@@ -394,64 +612,180 @@ class CsvImporter:
                         after_obj=meet_result.to_dict() if hasattr(meet_result, "to_dict") else None,
                     )
 
-                    meet_result = MeetResult.find_by_identifier(meet, cwa)
-                    if not meet_result:
-                        continue
+                touched_by_meet.setdefault(meet, set()).add(cwa)
+
+            else:
+                cwa, meet = item
+                affected_dogs.add(cwa)
+                affected_meets.add(meet)
 
-                before_snapshot = meet_result.to_dict() if hasattr(meet_result, "to_dict") else None
-                meet_result.update_from_race_results()
-                after = MeetResult.find_by_identifier(meet, cwa)
-                after_snapshot = after.to_dict() if after and hasattr(after, "to_dict") else None
+        # One recompute per meet rather than one per imported race row.
+        for meet, touched in touched_by_meet.items():
+            pipeline = MeetRecompute(meet)
+            pipeline.run(cwa_numbers=touched, update_dogs=False)
 
+            for cwa in sorted(touched):
+                before = pipeline.before.get(cwa)
+                after = pipeline.results.get(cwa)
                 ChangeLog.log(
                     changed_table="MeetResults",
                     record_pk=f"cwaNumber={cwa}|meetNumber={meet}",
                     operation="UPDATE",
                     changed_by=editor_id,
                     source="api/import POST",
-                    before_obj=before_snapshot,
-                    after_obj=after_snapshot,
+                    before_obj=before.to_dict() if before else None,
+                    after_obj=after.to_dict() if after else None,
                 )
 
-                dog.update_from_meet_results()
-                DogTitle.sync_titles_for_dog(dog, editor_id, now, send_email=False)
-
-            else:
-                affected_dogs.add(item)
-
+            meet_dogs = set(pipeline.results)
+            Dog.recompute_stats_bulk(meet_dogs)
+            for cwa in touched:
+                dog = Dog.find_by_identifier(cwa)
+                if dog:
+                    DogTitle.sync_titles_for_dog(dog, editor_id, now, send_email=False)
+
+        if affected_meets:
+            MeetHighCombinedWinner.refresh(affected_meets)
+            standings_scope = {}
+            for meet in affected_meets:
+                for year, cwa_numbers in YTDStandings.meet_scope(meet).items():
+                    standings_scope.setdefault(year, set()).update(cwa_numbers)
+            YTDStandings.refresh(standings_scope)
+        if affected_dogs:
+            Dog.recompute_stats_bulk(affected_dogs)
         for cwa in affected_dogs:
             dog = Dog.find_by_identifier(cwa)
             if dog:
-                dog.update_from_meet_results()
                 DogTitle.sync_titles_for_dog(dog, editor_id, now, send_email=False)
 
-        return {
-            "inserted": inserted,
-            "updated": updated,
-            "skipped": skipped,
-            "failed": failed,
-            "rowErrors": row_errors,
-        }
-    
     def _pk_string(self, pk):
         return "|".join(f"{k}={pk[k]}" for k in sorted(pk.keys()))
 
-    def run(self, file_storage, *, import_type=None, mode="update", use_adjustment=False):
+    def run(self, file_storage, *, import_type=None, mode="update", use_adjustment=False, editor_id=None, progress=None, bulk=True):
         filename = getattr(file_storage, "filename", "") or "upload.csv"
         if not import_type:
             import_type = self.detect_type(filename)
 
-        raw = file_storage.read()
-        if not raw:
-            raise ValueError("Uploaded file is empty")
-
+        # Decode incrementally instead of reading the whole upload into memory.
+        # utf-8-sig strips a BOM; undecodable bytes are replaced as before.
+        stream = getattr(file_storage, "stream", file_storage)
+        text = io.TextIOWrapper(io.BufferedReader(_NonClosing(stream)), encoding="utf-8-sig", errors="replace", newline="")
         try:
-            text = raw.decode("utf-8-sig")
-        except Exception:
-            text = raw.decode("utf-8", errors="replace")
+            reader = csv.DictReader(text)
+            if not reader.fieldnames:
+                raise ValueError("Uploaded file is empty")
+
+            return self.import_rows(
+                import_type=import_type,
+                filename=filename,
+                rows=reader,
+                mode=mode,
+                use_adjustment=use_adjustment,
+                editor_id=editor_id,
+                progress=progress,
+                bulk=bulk,
+            )
+        finally:
+            text.detach()
+
+
+class _NonClosing(io.RawIOBase):
+    """Readable view over an upload stream that TextIOWrapper may wrap without owning."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class _ImportState:
+    """Counters carried across the chunks of one import, plus the current chunk's deferred work."""
+
+    MAX_ROW_ERRORS = 1000
+
+    def __init__(self, editor_id, now):
+        self.editor_id = editor_id
+        self.now = now
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.row_errors = []
+        self.changed_deferred = set()
+        self.search_dirty = set()
+
+    def written_earlier(self, last_edited_by, last_edited_at):
+        """
+        Whether a row was last written by this import, i.e. an earlier chunk
+        had the same key. LastEditedAt is a whole-second TIMESTAMP, hence the
+        second-precision now.
+        """
+        if not isinstance(last_edited_at, datetime):
+            return False
+        now = self.now.replace(tzinfo=None) if last_edited_at.tzinfo is None else self.now
+        return last_edited_at == now and last_edited_by == self.editor_id
+
+    def fail(self, error):
+        self.failed += 1
+        if len(self.row_errors) < self.MAX_ROW_ERRORS:
+            self.row_errors.append(error)
+
+    def report(self):
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "rowErrors": self.row_errors,
+            "rowErrorsTruncated": self.failed > len(self.row_errors),
+        }
 
-        rows = list(csv.DictReader(io.StringIO(text)))
-        return self.import_rows(import_type=import_type, filename=filename, rows=rows, mode=mode, use_adjustment=use_adjustment)
+
+def _collation_key(value):
+    """
+    value as the tables' utf8mb4_0900_ai_ci collation compares it: case- and
+    accent-insensitive. Numbers compare by value, so 7, 7.0 and Decimal("7")
+    give the same key.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        number = Decimal(str(value)).normalize()
+        return format(number, "f")
+    text = unicodedata.normalize("NFKD", str(value))
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+
+
+def _existing_keys(table, column, values):
+    """Collation keys of the values present in table.column, one IN (...) query per chunk."""
+    found = set()
+    for chunk in _chunks(sorted(str(v) for v in values if v), CsvImporter.BULK_CHUNK_SIZE):
+        rows = fetch_all(
+            f"SELECT `{column}` AS v FROM `{table}` WHERE `{column}` IN ({_in_clause(chunk)})",
+            chunk,
+        ) or []
+        found.update(_collation_key(r["v"]) for r in rows)
+    return found
+
+
+def _write_chunk(model, table_name, objects, mode="update"):
+    """
+    Write one chunk of model objects in a single transaction and return the
+    affected row count. Insert mode never touches a row that already exists.
+    """
+    if mode == "insert":
+        sql = insert_ignore_sql(table_name, model.UPSERT_COLUMNS)
+    else:
+        sql = upsert_sql(table_name, model.UPSERT_COLUMNS, model.UPSERT_KEY)
+    with transaction() as tx:
+        return tx.execute_many(sql, [obj.upsert_params() for obj in objects])
 
 
 def _sync_titles_from_dog(dog_obj, editor_id, now):
@@ -0,0 +1,208 @@
+'''
+Docstring for job
+
+Tracks long running admin operations (stat reloads, imports, restores) in the
+Job table so any gunicorn worker can report their progress. The worker that
+owns a queued or running job keeps its UpdatedAt fresh (utils.job_runner), so
+a job whose UpdatedAt stops moving was lost with its worker.
+'''
+
+from database import fetch_all, fetch_one, execute
+from datetime import datetime, timedelta, timezone
+import json
+import os
+
+
+class Job:
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+    FINISHED_STATUSES = {SUCCEEDED, FAILED}
+
+    # Several missed heartbeats (utils.job_runner.HEARTBEAT_SECONDS) before a job counts as lost.
+    STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+
+    def __init__(self, id=None, job_type=None, status=QUEUED, processed_rows=0, total_rows=None,
+                 message=None, result=None, error=None, created_by=None, created_at=None,
+                 started_at=None, finished_at=None, updated_at=None):
+        self.id = id
+        self.job_type = job_type
+        self.status = status
+        self.processed_rows = int(processed_rows or 0)
+        self.total_rows = total_rows
+        self.message = message
+        self.result = result
+        self.error = error
+        self.created_by = created_by
+        self.created_at = created_at
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_db_row(cls, row):
+        if not row:
+            return None
+        return cls(
+            id=row.get("ID"),
+            job_type=row.get("JobType"),
+            status=row.get("Status"),
+            processed_rows=row.get("ProcessedRows"),
+            total_rows=row.get("TotalRows"),
+            message=row.get("Message"),
+            result=row.get("Result"),
+            error=row.get("Error"),
+            created_by=row.get("CreatedBy"),
+            created_at=row.get("CreatedAt"),
+            started_at=row.get("StartedAt"),
+            finished_at=row.get("FinishedAt"),
+            updated_at=row.get("UpdatedAt"),
+        )
+
+    @classmethod
+    def create(cls, job_type, created_by=None):
+        now = datetime.now(timezone.utc)
+        job_id = execute(
+            """
+            INSERT INTO Job (JobType, Status, ProcessedRows, CreatedBy, CreatedAt, UpdatedAt)
+            VALUES (%s, %s, 0, %s, %s, %s)
+            """,
+            (job_type, cls.QUEUED, created_by, now, now),
+            return_lastrowid=True,
+        )
+        return cls(id=job_id, job_type=job_type, created_by=created_by, created_at=now, updated_at=now)
+
+    @classmethod
+    def find_by_identifier(cls, id):
+        row = fetch_one(
+            """
+            SELECT ID, JobType, Status, ProcessedRows, TotalRows, Message, Result, Error,
+                   CreatedBy, CreatedAt, StartedAt, FinishedAt, UpdatedAt
+            FROM Job
+            WHERE ID = %s
+            LIMIT 1
+            """,
+            (id,),
+        )
+        return cls.from_db_row(row)
+
+    @classmethod
+    def list_recent(cls, limit=50):
+        rows = fetch_all(
+            """
+            SELECT ID, JobType, Status, ProcessedRows, TotalRows, Message, Result, Error,
+                   CreatedBy, CreatedAt, StartedAt, FinishedAt, UpdatedAt
+            FROM Job
+            ORDER BY ID DESC
+            LIMIT %s
+            """,
+            (limit,),
+        ) or []
+        return [cls.from_db_row(r) for r in rows]
+
+    @classmethod
+    def heartbeat(cls, ids):
+        """Touch UpdatedAt on jobs this worker still owns."""
+        if not ids:
+            return
+        execute(
+            f"UPDATE Job SET UpdatedAt = %s WHERE ID IN ({', '.join(['%s'] * len(ids))})",
+            [datetime.now(timezone.utc)] + list(ids),
+        )
+
+    @classmethod
+    def fail_stale(cls, stale_seconds=STALE_SECONDS):
+        """Mark queued or running jobs with no heartbeat for stale_seconds FAILED; returns how many."""
+        now = datetime.now(timezone.utc)
+        return execute(
+            """
+            UPDATE Job
+            SET Status = %s, Error = %s, FinishedAt = %s, UpdatedAt = %s
+            WHERE Status IN (%s, %s) AND UpdatedAt < %s
+            """,
+            (cls.FAILED, "Job was interrupted (the server restarted before it finished)", now, now,
+             cls.QUEUED, cls.RUNNING, now - timedelta(seconds=stale_seconds)),
+        )
+
+    def mark_running(self):
+        self.status = self.RUNNING
+        self.started_at = datetime.now(timezone.utc)
+        execute(
+            "UPDATE Job SET Status = %s, StartedAt = %s, UpdatedAt = %s WHERE ID = %s",
+            (self.status, self.started_at, self.started_at, self.id),
+        )
+
+    def update_progress(self, processed_rows=None, total_rows=None, message=None):
+        if processed_rows is not None:
+            self.processed_rows = int(processed_rows)
+        if total_rows is not None:
+            self.total_rows = int(total_rows)
+        if message is not None:
+            self.message = str(message)[:255]
+        execute(
+            """
+            UPDATE Job
+            SET ProcessedRows = %s, TotalRows = %s, Message = %s, UpdatedAt = %s
+            WHERE ID = %s
+            """,
+            (self.processed_rows, self.total_rows, self.message, datetime.now(timezone.utc), self.id),
+        )
+
+    def mark_succeeded(self, result=None):
+        self._finish(self.SUCCEEDED, result=result)
+
+    def mark_failed(self, error):
+        self._finish(self.FAILED, error=str(error))
+
+    def _finish(self, status, result=None, error=None):
+        self.status = status
+        self.finished_at = datetime.now(timezone.utc)
+        self.result = json.dumps(result, default=str) if result is not None else None
+        self.error = error
+        execute(
+            """
+            UPDATE Job
+            SET Status = %s, ProcessedRows = %s, TotalRows = %s, Message = %s,
+                Result = %s, Error = %s, FinishedAt = %s, UpdatedAt = %s
+            WHERE ID = %s
+            """,
+            (self.status, self.processed_rows, self.total_rows, self.message,
+             self.result, self.error, self.finished_at, self.finished_at, self.id),
+        )
+
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    def is_stale(self):
+        """Unfinished with no heartbeat for STALE_SECONDS (UpdatedAt holds UTC)."""
+        if self.is_finished() or not self.updated_at:
+            return False
+        updated_at = self.updated_at
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - updated_at > timedelta(seconds=self.STALE_SECONDS)
+
+    def to_dict(self):
+        result = self.result
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except ValueError:
+                pass
+        return {
+            "id": self.id,
+            "jobType": self.job_type,
+            "status": self.status,
+            "processedRows": self.processed_rows,
+            "totalRows": self.total_rows,
+            "message": self.message,
+            "result": result,
+            "error": self.error,
+            "createdBy": self.created_by,
+            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+            "updatedAt": self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -6,6 +6,7 @@ TODO:
 
 from database import fetch_all, fetch_one, execute
 from mysql.connector import Error
+from utils import keyset
 
 def _date_key(value):
     if not value:
@@ -368,21 +369,51 @@ class Meet:
 
     @staticmethod
     def search(query, sort = "dateDesc", page = 1, limit = None):
+        rows, _ = Meet.search_page(query, sort, page, limit)
+        return rows
 
-        orderings = {
-            "dateAsc": "ORDER BY m.MeetDate ASC",
-            "dateDesc": "ORDER BY m.MeetDate DESC",
-            "numberAsc": "ORDER BY m.MeetNumber ASC",
-            "numberDesc": "ORDER BY m.MeetNumber DESC",
-            "locationAsc": "ORDER BY m.Location ASC",
-            "locationDesc": "ORDER BY m.Location DESC",
-            "clubAsc": "ORDER BY m.ClubAbbreviation ASC",
-            "clubDesc": "ORDER BY m.ClubAbbreviation DESC",
-        }
+    # sort name -> keyset ordering; MeetNumber is unique and breaks ties
+    SEARCH_ORDERINGS = {
+        "dateAsc": [("m.MeetDate", "ASC"), ("m.MeetNumber", "ASC")],
+        "dateDesc": [("m.MeetDate", "DESC"), ("m.MeetNumber", "DESC")],
+        "numberAsc": [("m.MeetNumber", "ASC")],
+        "numberDesc": [("m.MeetNumber", "DESC")],
+        "locationAsc": [("m.Location", "ASC"), ("m.MeetNumber", "ASC")],
+        "locationDesc": [("m.Location", "DESC"), ("m.MeetNumber", "DESC")],
+        "clubAsc": [("m.ClubAbbreviation", "ASC"), ("m.MeetNumber", "ASC")],
+        "clubDesc": [("m.ClubAbbreviation", "DESC"), ("m.MeetNumber", "DESC")],
+    }
+
+    @staticmethod
+    def _search_filter(query):
+        """(WHERE condition, params) for a search string; empty matches every meet."""
         q = (query or "").strip()
+        if not q:
+            return "1=1", []
         like = f"%{q}%"
+        return """(
+                m.MeetNumber LIKE %s
+                OR m.ClubAbbreviation LIKE %s
+                OR m.MeetDate LIKE %s
+                OR m.RaceSecretary LIKE %s
+                OR m.Judge LIKE %s
+                OR m.Location LIKE %s
+                OR m.Yards LIKE %s
+                OR m.PublicNotes LIKE %s
+            )""", [like] * 8
+
+    @staticmethod
+    def search_page(query, sort = "dateDesc", page = 1, limit = None, cursor = None):
+        """
+        (rows, next cursor). With a cursor the page starts after it (keyset);
+        otherwise page is used as an offset.
+        """
+        if sort not in Meet.SEARCH_ORDERINGS:
+            sort = "dateDesc"
+        columns = Meet.SEARCH_ORDERINGS[sort]
+        where, params = Meet._search_filter(query)
 
-        sql = """
+        sql = f"""
             SELECT 
                 m.MeetNumber, m.ClubAbbreviation, m.MeetDate, m.RaceSecretary,
                 CONCAT(pf.FirstName, ' ', pf.LastName) AS RaceSecretaryName,
@@ -394,30 +425,32 @@ class Meet:
                     WHERE grouped.ClubAbbreviation = m.ClubAbbreviation
                       AND grouped.MeetDate = m.MeetDate
                       AND grouped.Location = m.Location
-                ) AS EventMeetCount
+                ) AS EventMeetCount,
+                {keyset.key_select(columns)}
             FROM Meet m
             LEFT JOIN Person pf ON m.RaceSecretary = pf.ID
             LEFT JOIN Person jj ON m.Judge = jj.ID
-            WHERE 
-                m.MeetNumber LIKE %s
-                OR m.ClubAbbreviation LIKE %s
-                OR m.MeetDate LIKE %s
-                OR m.RaceSecretary LIKE %s
-                OR m.Judge LIKE %s
-                OR m.Location LIKE %s
-                OR m.Yards LIKE %s
-                OR m.PublicNotes LIKE %s
+            WHERE {where}
         """
-        params = [like, like, like, like, like, like, like, like]
-        if sort not in orderings:
-            sort = "dateDesc"
-        sql += " " + orderings[sort]
-        if limit is not None:
-           sql = sql + " LIMIT %s OFFSET %s"
-           params.append(limit)
-           params.append((page-1)*limit)
-        rows = fetch_all(sql, params)
-        return rows
+        if cursor:
+            predicate, after_params = keyset.after(columns, keyset.decode_cursor(cursor, sort, columns))
+            sql += f" AND {predicate}"
+            params += after_params
+        sql += " " + keyset.order_by(columns)
+        if limit is None:
+            return fetch_all(sql, params) or [], None
+        sql += " LIMIT %s"
+        params.append(limit + 1)
+        if not cursor:
+            sql += " OFFSET %s"
+            params.append((page - 1) * limit)
+        return keyset.split_page(fetch_all(sql, params), limit, sort, columns)
+
+    @staticmethod
+    def search_count(query):
+        where, params = Meet._search_filter(query)
+        row = fetch_one(f"SELECT COUNT(*) AS total FROM Meet m WHERE {where}", params) or {}
+        return int(row.get("total") or 0)
     
     @classmethod
     def get_dogs_for_meet(cls, meet_number):
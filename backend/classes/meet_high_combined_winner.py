@@ -0,0 +1,163 @@
+'''
+Docstring for meet_high_combined_winner
+
+High-combined winners, worked out once per meet when its placements change
+instead of being re-derived with correlated subqueries by every caller.
+
+Two rules are in use and both are kept:
+  ALL_PLACED      lowest MeetPlacement + ConformationPlacement among every
+                  placed dog, ties to the better MeetPlacement. Counted into
+                  Dog.HighCombinedWins (and so titles).
+  EXCLUDING_LAST  the same, but only among dogs that were not last in either
+                  placement. Used by the HC wins figures and standings.
+'''
+
+from database import fetch_all, fetch_one, execute, transaction, _in_clause
+from utils.date_ranges import year_range
+
+
+def _placement(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MeetHighCombinedWinner:
+
+    ALL_PLACED = "ALL_PLACED"
+    EXCLUDING_LAST = "EXCLUDING_LAST"
+
+    @classmethod
+    def winners(cls, results):
+        """
+        {basis: [cwa, ...]} for one meet. results is an iterable of
+        (cwa_number, meet_placement, conformation_placement).
+        """
+        parsed = [(c, _placement(m), _placement(p)) for c, m, p in results]
+        placed = [(cwa, mp, cp) for cwa, mp, cp in parsed if mp is not None and cp is not None]
+        found = {cls.ALL_PLACED: cls._best(placed), cls.EXCLUDING_LAST: []}
+        if placed:
+            # "last" is judged over every dog with that placement, not only the fully placed ones
+            last_meet = max(mp for _, mp, _ in parsed if mp is not None)
+            last_conf = max(cp for _, _, cp in parsed if cp is not None)
+            eligible = [r for r in placed if r[1] < last_meet and r[2] < last_conf]
+            found[cls.EXCLUDING_LAST] = cls._best(eligible)
+        return found
+
+    @staticmethod
+    def _best(rows):
+        if not rows:
+            return []
+        best = min((mp + cp, mp) for _, mp, cp in rows)
+        return sorted(cwa for cwa, mp, cp in rows if (mp + cp, mp) == best)
+
+    @classmethod
+    def write_meet(cls, meet_number, results):
+        """Replace one meet's winner rows from its (cwa, meet placement, conformation placement) results."""
+        cls._write({meet_number: cls.winners(results)})
+
+    @classmethod
+    def refresh(cls, meet_numbers):
+        """Recompute the winners of the given meets from MeetResults."""
+        meet_numbers = sorted({m for m in meet_numbers if m})
+        if not meet_numbers:
+            return
+        rows = fetch_all(
+            f"""
+            SELECT MeetNumber, CWANumber, MeetPlacement, ConformationPlacement
+            FROM MeetResults
+            WHERE MeetNumber IN ({_in_clause(meet_numbers)})
+            """,
+            meet_numbers,
+        ) or []
+        by_meet = {m: [] for m in meet_numbers}
+        for r in rows:
+            by_meet[r["MeetNumber"]].append((r["CWANumber"], r["MeetPlacement"], r["ConformationPlacement"]))
+        cls._write({m: cls.winners(results) for m, results in by_meet.items()})
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every meet. Each batch of meets is replaced in its own
+        transaction, so readers see old or new winners, never an empty table.
+        """
+        meets = [r["MeetNumber"] for r in fetch_all("SELECT MeetNumber FROM Meet") or []]
+        for i in range(0, len(meets), 500):
+            cls.refresh(meets[i:i + 500])
+        execute(
+            """
+            DELETE w FROM MeetHighCombinedWinner w
+            LEFT JOIN Meet m ON m.MeetNumber = w.MeetNumber
+            WHERE m.MeetNumber IS NULL
+            """
+        )
+
+    @classmethod
+    def _write(cls, winners_by_meet):
+        meet_numbers = list(winners_by_meet)
+        if not meet_numbers:
+            return
+        rows = [
+            (meet, basis, cwa)
+            for meet, found in winners_by_meet.items()
+            for basis, cwa_numbers in found.items()
+            for cwa in cwa_numbers
+        ]
+        with transaction() as tx:
+            tx.execute(
+                f"DELETE FROM MeetHighCombinedWinner WHERE MeetNumber IN ({_in_clause(meet_numbers)})",
+                meet_numbers,
+            )
+            if rows:
+                tx.execute_many(
+                    "INSERT INTO MeetHighCombinedWinner (MeetNumber, Basis, CWANumber) VALUES (%s, %s, %s)",
+                    rows,
+                )
+
+    @classmethod
+    def count_for_dog(cls, cwa_number, basis=ALL_PLACED, start=None, end=None):
+        """Meets won by the dog, optionally limited to MeetDate in [start, end)."""
+        if start is None:
+            row = fetch_one(
+                """
+                SELECT COUNT(*) AS hc_wins
+                FROM MeetHighCombinedWinner
+                WHERE CWANumber = %s AND Basis = %s
+                """,
+                (cwa_number, basis),
+            ) or {}
+        else:
+            row = fetch_one(
+                """
+                SELECT COUNT(*) AS hc_wins
+                FROM MeetHighCombinedWinner w
+                JOIN Meet m ON m.MeetNumber = w.MeetNumber
+                WHERE w.CWANumber = %s AND w.Basis = %s
+                  AND m.MeetDate >= %s AND m.MeetDate < %s
+                """,
+                (cwa_number, basis, start, end),
+            ) or {}
+        return int(row.get("hc_wins") or 0)
+
+    @classmethod
+    def counts_for_year(cls, year, basis=EXCLUDING_LAST, cwa_numbers=None):
+        """{cwa: wins} for meets held in the given year."""
+        params = [basis, *year_range(year)]
+        dog_filter = ""
+        if cwa_numbers is not None:
+            dog_filter = f"AND w.CWANumber IN ({_in_clause(cwa_numbers)})"
+            params += list(cwa_numbers)
+        rows = fetch_all(
+            f"""
+            SELECT w.CWANumber, COUNT(*) AS hc_wins
+            FROM MeetHighCombinedWinner w
+            JOIN Meet m ON m.MeetNumber = w.MeetNumber
+            WHERE w.Basis = %s
+              AND m.MeetDate >= %s AND m.MeetDate < %s
+              {dog_filter}
+            GROUP BY w.CWANumber
+            """,
+            params,
+        ) or []
+        return {r["CWANumber"]: int(r["hc_wins"]) for r in rows}
@@ -0,0 +1,125 @@
+'''
+Docstring for meet_participants
+
+Per-meet cache of the dogs and race rows the ARX/NARX, DPC and HC
+calculators need. Dogs are fetched with a single IN (...) query and
+adult status / titles are computed once per dog instead of once per call.
+'''
+
+from database import fetch_all
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+class MeetParticipants:
+
+    DOG_COLUMNS = """
+        CWANumber, RegisteredNumber, ForeignType,
+        CallName, RegisteredName, Birthdate, PedigreeLink,
+        Status, Average, CurrentGrade,
+        MeetPoints, ARXPoints, NARXPoints, ShowPoints,
+        DPCLegs, MeetWins, MeetAppearences, HighCombinedWins, AOMEarned,
+        DPCPoints, ManualMeetPointsAdjustment, ManualARXPointsAdjustment,
+        ManualNARXPointsAdjustment, ManualShowPointsAdjustment,
+        ManualDPCPointsAdjustment, ManualMeetAppearancesAdjustment,
+        ManualMeetWinsAdjustment, ManualDPCLegsAdjustment,
+        ManualHighCombinedWinsAdjustment, PublicNotes, PrivateNotes,
+        DNA, SireDNA, DamDNA, KennelClubChampion, LastEditedBy, LastEditedAt
+    """
+
+    def __init__(self, meet_number=None, dogs=None, races=None):
+        self.meet_number = meet_number
+        self.dogs = dogs or {}
+        self.races = races or {}
+        self._adult = {}
+        self._titles = {}
+        self._arx_titles = {}
+
+    @classmethod
+    def load(cls, meet_number, cwa_numbers=()):
+        """
+        Load every race row for the meet plus the dogs that ran in it (and any
+        extra cwa_numbers, e.g. dogs that only have a MeetResults row).
+        """
+        race_rows = fetch_all(
+            """
+            SELECT CWANumber, Program, RaceNumber, Placement, AOMEarned, Incident
+            FROM RaceResults
+            WHERE MeetNumber = %s
+            """,
+            (meet_number,),
+        ) or []
+        races = {}
+        for r in race_rows:
+            races.setdefault(r["CWANumber"], []).append(r)
+
+        dogs = cls._fetch_dogs(set(races) | set(cwa_numbers or ()))
+        return cls(meet_number=meet_number, dogs=dogs, races=races)
+
+    @classmethod
+    def for_dogs(cls, cwa_numbers):
+        """Dogs only, for callers that have a CWA list but no meet."""
+        return cls(dogs=cls._fetch_dogs(cwa_numbers))
+
+    @classmethod
+    def _fetch_dogs(cls, cwa_numbers):
+        from classes.dog import Dog
+
+        cwa_numbers = sorted({c for c in cwa_numbers if c})
+        if not cwa_numbers:
+            return {}
+        placeholders = ", ".join(["%s"] * len(cwa_numbers))
+        rows = fetch_all(
+            f"""
+            SELECT {cls.DOG_COLUMNS}
+            FROM Dog
+            WHERE CWANumber IN ({placeholders})
+            """,
+            cwa_numbers,
+        ) or []
+        return {r["CWANumber"]: Dog.from_db_row(r) for r in rows}
+
+    def dog(self, cwa):
+        return self.dogs.get(cwa)
+
+    def is_adult(self, cwa):
+        if cwa not in self._adult:
+            dog = self.dogs.get(cwa)
+            self._adult[cwa] = bool(dog and dog.is_adult())
+        return self._adult[cwa]
+
+    def titles(self, cwa):
+        if cwa not in self._titles:
+            dog = self.dogs.get(cwa)
+            self._titles[cwa] = set(dog.check_titles() or []) if dog else set()
+        return self._titles[cwa]
+
+    def has_arx(self, cwa):
+        if cwa not in self._arx_titles:
+            dog = self.dogs.get(cwa)
+            self._arx_titles[cwa] = bool(dog and "ARX" in dog.check_arx_titles())
+        return self._arx_titles[cwa]
+
+    def count_adults(self, cwa_numbers):
+        return sum(1 for cwa in cwa_numbers if self.is_adult(cwa))
+
+    def adult_starts(self):
+        """Number of adult whippets that ran in this meet."""
+        return self.count_adults(self.races)
+
+    def race_rows(self, cwa):
+        return self.races.get(cwa, [])
+
+    def had_incident(self, cwa):
+        return any(_text(r.get("Incident")) for r in self.races.get(cwa, []))
+
+    def completed_all_4_programs(self, cwa):
+        """Dog must complete all 4 programs with no incident in this meet."""
+        if self.had_incident(cwa):
+            return False
+        programs = {_text(r.get("Program")) for r in self.races.get(cwa, []) if _text(r.get("Program"))}
+        return len(programs) == 4
@@ -0,0 +1,276 @@
+'''
+Docstring for meet_recompute
+
+Meet-scoped replacement for the per-dog cascade in
+MeetResult.update_from_race_results. Everything the cascade used to read one
+row at a time (results, races, dogs) is loaded once for the meet, placements,
+DPC/HC legs and ARX/NARX/DPC points are worked out in memory, and only the
+rows that actually changed are written back in a single transaction.
+'''
+
+from database import fetch_all, transaction
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+from classes.meet_participants import MeetParticipants
+from classes.ytd_standings import YTDStandings
+from datetime import datetime, timezone
+import copy
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _float(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class MeetRecompute:
+
+    # (MeetResults column, MeetResult attribute, normaliser used to detect changes)
+    WRITE_COLUMNS = (
+        ("MeetPoints", "meet_points", lambda v: round(_float(v), 2)),
+        ("AOMEarned", "aom_earned", lambda v: round(_float(v), 2)),
+        ("MeetPlacement", "meet_placement", _int),
+        ("DPCLeg", "dpc_leg", _int),
+        ("HCScore", "hc_score", _int),
+        ("HCLegEarned", "hc_leg_earned", _int),
+        ("DPCPoints", "dpc_points", lambda v: round(_float(v), 2)),
+        ("ARXEarned", "arx_earned", lambda v: round(_float(v), 2)),
+        ("NARXEarned", "narx_earned", lambda v: round(_float(v), 2)),
+    )
+
+    def __init__(self, meet_number):
+        self.meet_number = meet_number
+        self.results = {}
+        self.before = {}
+        self.races = {}
+        self.dogs = {}
+        self.participants = None
+
+    def load(self):
+        """Load every MeetResult, then the meet's races and dogs through MeetParticipants (three queries)."""
+        from classes.meet_result import MeetResult
+
+        rows = fetch_all(
+            """
+            SELECT MeetNumber, CWANumber, Average, Grade, MeetPlacement, ConformationPlacement,
+                    MatchPoints, MeetPoints, ARXEarned, NARXEarned, Shown, ShowPlacement, ShowPoints, DPCLeg,
+                    HCScore, HCLegEarned, AOMEarned, DPCPoints, EntryType, LastEditedBy, LastEditedAt
+            FROM MeetResults
+            WHERE MeetNumber = %s
+            ORDER BY CWANumber
+            """,
+            (self.meet_number,),
+        ) or []
+        self.results = {r["CWANumber"]: MeetResult.from_db_row(r) for r in rows}
+        self.before = {cwa: copy.copy(mr) for cwa, mr in self.results.items()}
+
+        self.participants = MeetParticipants.load(self.meet_number, list(self.results))
+        self.races = self.participants.races
+        self.dogs = self.participants.dogs
+        return self
+
+    def had_incident(self, cwa):
+        return self.participants.had_incident(cwa)
+
+    def compute_race_totals(self, cwa_numbers):
+        """MeetPoints/AOMEarned for the given dogs from their non-incident races."""
+        from classes.race_result import RaceResult
+        scorer = RaceResult(
+            meet_number=self.meet_number, cwa_number=None,
+            program=None, race_number=None,
+            box=None, placement=None, meet_points=None,
+            aom_earned=None, dpc_points=None, incident=None,
+            last_edited_by=None, last_edited_at=None,
+        )
+        for cwa in cwa_numbers:
+            mr = self.results.get(cwa)
+            if not mr:
+                continue
+            valid = [r for r in self.races.get(cwa, []) if not _text(r.get("Incident"))]
+            mr.meet_points = sum(scorer.get_placement_points(_text(r.get("Placement")).upper()) for r in valid)
+            mr.aom_earned = sum(_float(r.get("AOMEarned")) for r in valid)
+
+    def compute_placements(self):
+        """Rank non-incident dogs by MeetPoints; ties go to the better placement in the last race."""
+        ranked = [mr for cwa, mr in self.results.items() if not self.had_incident(cwa)]
+        ranked.sort(key=lambda mr: _float(mr.meet_points), reverse=True)
+
+        all_races = [r for rows in self.races.values() for r in rows]
+        last_program = max((_text(r.get("Program")) for r in all_races), default=None)
+        last_race = max((_text(r.get("RaceNumber")) for r in all_races), default=None)
+        last_placement = {
+            r["CWANumber"]: _int(r.get("Placement"), None)
+            for r in all_races
+            if _text(r.get("Program")) == last_program and _text(r.get("RaceNumber")) == last_race
+        }
+
+        placements = {}
+        i = 0
+        while i < len(ranked):
+            j = i + 1
+            while j < len(ranked) and _float(ranked[j].meet_points) == _float(ranked[i].meet_points):
+                j += 1
+            tied = ranked[i:j]
+            if len(tied) > 1:
+                tied.sort(key=lambda mr: last_placement.get(mr.cwa_number)
+                          if last_placement.get(mr.cwa_number) is not None else float("inf"))
+            for k, mr in enumerate(tied):
+                placements[mr.cwa_number] = i + k + 1
+            i = j
+
+        next_incident_placement = len(placements) + 1
+        for cwa, mr in self.results.items():
+            if cwa in placements:
+                mr.meet_placement = placements[cwa]
+            else:
+                mr.meet_placement = next_incident_placement
+                next_incident_placement += 1
+
+    def compute_dpc_leg(self):
+        """Best conformation placement that is not last, held by a dog without DPC/DPCX."""
+        shown = [mr for mr in self.results.values() if _text(mr.conformation_placement).isdigit()]
+        total_shown = len(shown)
+
+        winner_cwa = None
+        if total_shown >= 2:
+            shown.sort(key=lambda mr: int(_text(mr.conformation_placement)))
+            for mr in shown:
+                if not self.participants.dog(mr.cwa_number):
+                    continue
+                if int(_text(mr.conformation_placement)) >= total_shown:
+                    continue
+                titles = self.participants.titles(mr.cwa_number)
+                if "DPC" in titles or "DPCX" in titles:
+                    continue
+                winner_cwa = mr.cwa_number
+                break
+
+        for mr in self.results.values():
+            mr.dpc_leg = 1 if mr.cwa_number == winner_cwa else 0
+
+    def compute_hc_leg(self):
+        """Lowest MeetPlacement + ShowPlacement wins the HC leg, ties go to the better MeetPlacement."""
+        scores = {}
+        for cwa, mr in self.results.items():
+            meet_placement = _int(mr.meet_placement)
+            show_placement = _int(mr.show_placement)
+            scores[cwa] = meet_placement + show_placement if meet_placement > 0 and show_placement > 0 else 0
+
+        eligible = [cwa for cwa, score in scores.items() if score > 0]
+        winner_cwa = None
+        if eligible:
+            best = min(scores[cwa] for cwa in eligible)
+            tied = [cwa for cwa in eligible if scores[cwa] == best]
+            tied.sort(key=lambda cwa: _int(self.results[cwa].meet_placement, 999) or 999)
+            winner_cwa = tied[0]
+
+        for cwa, mr in self.results.items():
+            mr.hc_leg_earned = 1 if cwa == winner_cwa else 0
+
+    def compute_derived_fields(self):
+        """DPC points, ARX/NARX and HCScore from the final placements."""
+        from classes.race_result import RaceResult
+        calculator = RaceResult(
+            meet_number=self.meet_number, cwa_number=None,
+            program=None, race_number=None,
+            box=None, placement=None, meet_points=None,
+            aom_earned=None, dpc_points=None, incident=None,
+            last_edited_by=None, last_edited_at=None,
+        )
+
+        dpc_distribution = calculator.get_dpc_point_distribution(self.participants.adult_starts())
+
+        for cwa, mr in self.results.items():
+            meet_placement = _int(mr.meet_placement)
+            calculator.cwa_number = cwa
+
+            if self.participants.is_adult(cwa) and meet_placement > 0 and not self.had_incident(cwa):
+                idx = meet_placement - 1
+                mr.dpc_points = dpc_distribution[idx] if 0 <= idx < len(dpc_distribution) else 0
+            else:
+                mr.dpc_points = 0
+
+            mr.arx_earned = calculator.calculate_arx_earned(meet_placement, self.participants)
+            mr.narx_earned = calculator.calculate_narx_earned(meet_placement, self.participants)
+            mr.hc_score = calculator.calculate_hc_score(meet_placement, _int(mr.conformation_placement))
+
+    def changed_results(self):
+        changed = []
+        for cwa, mr in self.results.items():
+            old = self.before.get(cwa)
+            if old is None or any(
+                norm(getattr(old, attr)) != norm(getattr(mr, attr))
+                for _, attr, norm in self.WRITE_COLUMNS
+            ):
+                changed.append(mr)
+        return changed
+
+    def write(self, changed):
+        if not changed:
+            return
+        now = datetime.now(timezone.utc)
+        assignments = ", ".join(f"{column} = %s" for column, _, _ in self.WRITE_COLUMNS)
+        params = []
+        for mr in changed:
+            mr.last_edited_at = now
+            params.append(
+                tuple(getattr(mr, attr) for _, attr, _ in self.WRITE_COLUMNS)
+                + (now, mr.meet_number, mr.cwa_number)
+            )
+
+        with transaction() as tx:
+            tx.execute_many(
+                f"""
+                UPDATE MeetResults
+                SET {assignments}, LastEditedAt = %s
+                WHERE MeetNumber = %s AND CWANumber = %s
+                """,
+                params,
+            )
+
+    def run(self, cwa_numbers=None, update_dogs=True):
+        """
+        Recompute the whole meet. cwa_numbers limits which dogs get their
+        MeetPoints/AOMEarned re-summed from RaceResults (default: every dog that
+        has races in this meet). Returns the list of MeetResults that changed.
+        """
+        self.load()
+        if not self.results:
+            return []
+
+        if cwa_numbers is None:
+            cwa_numbers = list(self.races)
+        self.compute_race_totals(cwa_numbers)
+        self.compute_placements()
+        self.compute_dpc_leg()
+        self.compute_hc_leg()
+        self.compute_derived_fields()
+
+        changed = self.changed_results()
+        self.write(changed)
+        MeetHighCombinedWinner.write_meet(self.meet_number, [
+            (cwa, mr.meet_placement, mr.conformation_placement) for cwa, mr in self.results.items()
+        ])
+        YTDStandings.refresh_meet(self.meet_number)
+
+        if update_dogs:
+            from classes.dog import Dog
+            Dog.recompute_stats_bulk(list(self.results))
+        return changed
+
+    @classmethod
+    def recompute(cls, meet_number, cwa_numbers=None, update_dogs=True):
+        return cls(meet_number).run(cwa_numbers=cwa_numbers, update_dogs=update_dogs)
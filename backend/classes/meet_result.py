@@ -117,8 +117,8 @@ class MeetResult:
         )
         return existing is not None
 
-    def validate(self):
-        """Validate required fields. Returns list of errors (empty if valid)."""
+    def validate_fields(self):
+        """Validate field values without touching the database. Returns list of errors."""
         errors = []
         if not self.meet_number:
             errors.append("Meet number is required")
@@ -146,6 +146,11 @@ class MeetResult:
             errors.append("CWA number must be 10 characters or less")
         if self.entry_type != "REG" and self.entry_type != "PUPPY":
             errors.append("invalid entry type")
+        return errors
+
+    def validate(self):
+        """Validate required fields and foreign keys. Returns list of errors (empty if valid)."""
+        errors = self.validate_fields()
 
         meet_exists = None
         if self.meet_number:
@@ -174,6 +179,23 @@ class MeetResult:
                 errors.append("LastEditedBy must reference an existing Person")
         return errors
 
+    UPSERT_COLUMNS = (
+        "MeetNumber", "CWANumber", "Average", "Grade", "MeetPlacement", "ConformationPlacement",
+        "MatchPoints", "MeetPoints", "ARXEarned", "NARXEarned", "Shown", "ShowPlacement", "ShowPoints", "DPCLeg",
+        "HCScore", "HCLegEarned", "AOMEarned", "DPCPoints", "EntryType", "LastEditedBy", "LastEditedAt",
+    )
+    UPSERT_KEY = ("MeetNumber", "CWANumber")
+
+    def upsert_params(self):
+        """Values in UPSERT_COLUMNS order, for multi-row writes."""
+        return (
+            self.meet_number, self.cwa_number, self.average, self.grade, self.meet_placement,
+            self.conformation_placement, self.match_points, self.meet_points, self.arx_earned,
+            self.narx_earned, self.shown, self.show_placement, self.show_points, self.dpc_leg,
+            self.hc_score, self.hc_leg_earned, self.aom_earned, self.dpc_points, self.entry_type,
+            self.last_edited_by, self.last_edited_at,
+        )
+
     def save(self):
         """Save meet result to database. Returns True on success, raises Error on failure."""
         try:
@@ -296,44 +318,18 @@ class MeetResult:
         return [MeetResult.from_db_row(row) for row in rows]
 
     def update_from_race_results(self):
-        """Recalculate meet result totals from RaceResults for this meet+dog."""
+        """Recalculate meet result totals from RaceResults for this meet+dog, then the rest of the meet."""
         if not self.meet_number or not self.cwa_number:
             return
 
-        from classes.race_result import RaceResult
-
-        race_rows = fetch_all("""
-            SELECT Placement, AOMEarned, Incident
-            FROM RaceResults
-            WHERE MeetNumber = %s AND CWANumber = %s
-        """, (self.meet_number, self.cwa_number)) or []
-
-        valid_race_rows = [r for r in race_rows if not str(r.get("Incident") or "").strip()]
-        placements = [str(r.get("Placement") or "").strip().upper() for r in valid_race_rows]
-
-        rr = RaceResult(
-            meet_number=self.meet_number, cwa_number=self.cwa_number,
-            program=None, race_number=None,
-            box=None, placement=None, meet_points=None,
-            aom_earned=None, dpc_points=None, incident=None,
-            last_edited_by=None, last_edited_at=None,
-        )
-
-        self.meet_points = sum(rr.get_placement_points(p) for p in placements)
-        self.aom_earned = sum(float(r.get("AOMEarned") or 0) for r in valid_race_rows)
-
-        self.last_edited_at = datetime.now(timezone.utc)
-        self.update()
-
-        MeetResult.recalculate_all_placements_for_meet(self.meet_number)
-        RaceResult.calculate_dpc_leg_for_meet(self.meet_number)
-        RaceResult.calculate_hc_leg_for_meet(self.meet_number)
-        MeetResult.recalculate_derived_fields_for_meet(self.meet_number)
+        from classes.meet_recompute import MeetRecompute
+        MeetRecompute.recompute(self.meet_number, cwa_numbers=[self.cwa_number])
 
     @classmethod
     def recalculate_derived_fields_for_meet(cls, meet_number):
         """Recalculate ARX/NARX/DPC/HC for every dog in a meet using final placements, then roll up to Dog."""
         from classes.race_result import RaceResult
+        from classes.meet_participants import MeetParticipants
         from classes.dog import Dog
 
         rows = fetch_all("""
@@ -341,10 +337,7 @@ class MeetResult:
             FROM MeetResults WHERE MeetNumber = %s
         """, [meet_number]) or []
 
-        cwa_rows = fetch_all("""
-            SELECT DISTINCT CWANumber FROM RaceResults WHERE MeetNumber = %s
-        """, [meet_number]) or []
-        cwa_numbers = [r.get("CWANumber") for r in cwa_rows if r.get("CWANumber")]
+        participants = MeetParticipants.load(meet_number, [r.get("CWANumber") for r in rows])
 
         rr = RaceResult(
             meet_number=meet_number, cwa_number=None,
@@ -354,7 +347,7 @@ class MeetResult:
             last_edited_by=None, last_edited_at=None,
         )
 
-        adult_count = rr.count_num_adult_whippets(cwa_numbers)
+        adult_count = participants.adult_starts()
         dpc_distribution = rr.get_dpc_point_distribution(adult_count)
 
         for row in rows:
@@ -362,17 +355,12 @@ class MeetResult:
             meet_placement = row.get("MeetPlacement")
             conformation_placement = row.get("ConformationPlacement")
 
-            race_rows = fetch_all("""
-                SELECT Incident FROM RaceResults
-                WHERE MeetNumber = %s AND CWANumber = %s
-            """, [meet_number, cwa]) or []
-            had_incident = any(str(r.get("Incident") or "").strip() for r in race_rows)
+            had_incident = participants.had_incident(cwa)
 
             rr.cwa_number = cwa
             rr.meet_number = meet_number
 
-            dog = Dog.find_by_identifier(cwa)
-            if dog and dog.is_adult() and meet_placement and meet_placement > 0 and not had_incident:
+            if participants.is_adult(cwa) and meet_placement and meet_placement > 0 and not had_incident:
                 idx = meet_placement - 1
                 dpc_points = dpc_distribution[idx] if 0 <= idx < len(dpc_distribution) else 0
             else:
@@ -388,15 +376,14 @@ class MeetResult:
                 WHERE MeetNumber = %s AND CWANumber = %s
             """, [
                 dpc_points,
-                rr.calculate_arx_earned(meet_placement),
-                rr.calculate_narx_earned(meet_placement),
+                rr.calculate_arx_earned(meet_placement, participants),
+                rr.calculate_narx_earned(meet_placement, participants),
                 rr.calculate_hc_score(meet_placement, conformation_placement),
                 datetime.now(timezone.utc),
                 meet_number, cwa
             ])
 
-            if dog:
-                dog.update_from_meet_results()
+        Dog.recompute_stats_bulk([r.get("CWANumber") for r in rows])
 
     @classmethod
     def calculate_meet_rankings(cls, meet_number):
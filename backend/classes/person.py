@@ -3,6 +3,7 @@ from database import fetch_all, fetch_one, execute
 from mysql.connector import Error
 import re
 from utils.validators import varchar_field 
+from classes.dog_search_index import DogSearchIndex
 
 class Person:
     def __init__(self, id, person_id, first_name, last_name, email_address, address_line_one,
@@ -246,6 +247,7 @@ class Person:
                     self.last_edited_by, self.last_edited_at, self.id  
                 ),
             )
+            DogSearchIndex.refresh_for_person(self.id)
             return True
         except Error as e:
             raise e
@@ -253,6 +255,7 @@ class Person:
     def delete(self):
         """Delete person from database. Returns True on success, raises Error on failure."""
         try:
+            dogs = DogSearchIndex.dogs_for_person(self.id)
             execute(
                 """
                 DELETE FROM Person
@@ -260,6 +263,7 @@ class Person:
                 """,
                 (self.id,),
             )
+            DogSearchIndex.refresh(dogs)
             return True
         except Error as e:
             raise e
@@ -18,6 +18,10 @@ def _get_dog_class():
     from classes.dog import Dog
     return Dog
 
+def _get_participants_class():
+    from classes.meet_participants import MeetParticipants
+    return MeetParticipants
+
 class RaceResult:
 
     def __init__(self, meet_number, cwa_number, program, race_number, box,
@@ -130,6 +134,22 @@ class RaceResult:
             errors.append("Race number must be 10 characters or less")
         return errors
 
+    UPSERT_COLUMNS = (
+        "MeetNumber", "CWANumber", "Program", "RaceNumber", "Box",
+        "Placement", "MeetPoints", "AOMEarned", "DPCPoints", "Incident",
+        "LastEditedBy", "LastEditedAt",
+    )
+    UPSERT_KEY = ("MeetNumber", "CWANumber", "Program", "RaceNumber")
+
+    def upsert_params(self):
+        """Values in UPSERT_COLUMNS order, for multi-row writes."""
+        placement_val = 0 if str(self.placement).upper() == "AOM" else self.placement
+        return (
+            self.meet_number, self.cwa_number, self.program, self.race_number, self.box or None,
+            placement_val, self.meet_points, self.aom_earned, self.dpc_points, self.incident,
+            self.last_edited_by, self.last_edited_at,
+        )
+
     def save(self):
         """Save race result to database. Returns True on success, raises Error on failure."""
         try:
@@ -247,16 +267,12 @@ class RaceResult:
         """
         execute(query, (cwa_number,))
 
-    def count_num_adult_whippets(self, cwa_numbers):
+    def count_num_adult_whippets(self, cwa_numbers, participants=None):
         """Calculate the number of adult whippets in the race based on CWA numbers."""
-        Dog = _get_dog_class()
-        count_adults = 0
-        for cwa in cwa_numbers:
-            dog = Dog.find_by_identifier(cwa)
-            if dog and dog.is_adult():
-                count_adults += 1
-    
-        return count_adults
+        cwa_numbers = list(cwa_numbers)
+        if participants is None:
+            participants = _get_participants_class().for_dogs(cwa_numbers)
+        return participants.count_adults(cwa_numbers)
     
     def get_dpc_point_distribution(self, count_adults):
         """Determine point distribution based on number of adult whippets."""
@@ -293,8 +309,11 @@ class RaceResult:
             return 0.5
         return 0
 
-    def completed_all_4_programs_for_arx(self):
+    def completed_all_4_programs_for_arx(self, participants=None):
         """Dog must complete all 4 programs with no incident in this meet."""
+        if participants is not None:
+            return participants.completed_all_4_programs(self.cwa_number)
+
         rows = fetch_all("""
             SELECT Program, Incident
             FROM RaceResults
@@ -311,22 +330,18 @@ class RaceResult:
                 programs.add(program)
         return len(programs) == 4
 
-    def _get_arx_narx_eligibility(self, meet_placement):
-        Dog = _get_dog_class()
+    def _get_arx_narx_eligibility(self, meet_placement, participants=None):
         """Shared eligibility check for ARX/NARX. Returns (eligible, meet_placement) tuple."""
-        dog = Dog.find_by_identifier(self.cwa_number)
-        if not dog or not dog.is_adult():
-            return False, 0
+        if participants is None:
+            participants = _get_participants_class().load(self.meet_number, [self.cwa_number])
 
-        if not self.completed_all_4_programs_for_arx():
+        if not participants.is_adult(self.cwa_number):
             return False, 0
 
-        rows = fetch_all("""
-            SELECT DISTINCT CWANumber FROM RaceResults WHERE MeetNumber = %s
-        """, (self.meet_number,)) or []
+        if not self.completed_all_4_programs_for_arx(participants):
+            return False, 0
 
-        cwa_numbers = [r["CWANumber"] for r in rows if r.get("CWANumber")]
-        adult_starts = self.count_num_adult_whippets(cwa_numbers)
+        adult_starts = participants.adult_starts()
         if adult_starts <= 0:
             return False, 0
 
@@ -340,26 +355,26 @@ class RaceResult:
         in_top_half = meet_placement > 0 and meet_placement <= cutoff
         return in_top_half, meet_placement
 
-    def calculate_arx_earned(self, meet_placement):
-        Dog = _get_dog_class()
-        dog = Dog.find_by_identifier(self.cwa_number)
-        if not dog or not dog.is_adult():
+    def calculate_arx_earned(self, meet_placement, participants=None):
+        if participants is None:
+            participants = _get_participants_class().load(self.meet_number, [self.cwa_number])
+
+        if not participants.is_adult(self.cwa_number):
             return 0
 
-        if "ARX" in dog.check_arx_titles():
+        if participants.has_arx(self.cwa_number):
             return 0
 
-        eligible, _ = self._get_arx_narx_eligibility(meet_placement)
+        eligible, _ = self._get_arx_narx_eligibility(meet_placement, participants)
         return 1 if eligible else 0
 
-    def calculate_narx_earned(self, meet_placement):
+    def calculate_narx_earned(self, meet_placement, participants=None):
         """NARX earned same as ARX but always passes even if dog already has NARX titles."""
-        eligible, _ = self._get_arx_narx_eligibility(meet_placement)
+        eligible, _ = self._get_arx_narx_eligibility(meet_placement, participants)
         return 1 if eligible else 0
 
     @classmethod
-    def calculate_dpc_leg_for_meet(cls, meet_number):
-        Dog = _get_dog_class()
+    def calculate_dpc_leg_for_meet(cls, meet_number, participants=None):
         rows = fetch_all("""
             SELECT *
             FROM MeetResults
@@ -368,6 +383,8 @@ class RaceResult:
 
         from classes.meet_result import MeetResult
         results = [MeetResult.from_db_row(r) for r in rows]
+        if participants is None:
+            participants = _get_participants_class().load(meet_number, [r.cwa_number for r in results])
 
         shown_results = [
             r for r in results
@@ -381,7 +398,7 @@ class RaceResult:
             shown_results.sort(key=lambda r: int(r.conformation_placement))
 
             for r in shown_results:
-                dog = Dog.find_by_identifier(r.cwa_number)
+                dog = participants.dog(r.cwa_number)
                 if not dog:
                     continue
 
@@ -389,7 +406,7 @@ class RaceResult:
                 if placement >= total_shown:
                     continue
 
-                titles = set(dog.check_titles() or [])
+                titles = participants.titles(r.cwa_number)
 
                 is_champion = bool(
                     getattr(dog, "akc_champion", False) or
@@ -408,25 +425,22 @@ class RaceResult:
             r.dpc_leg = 1 if r.cwa_number == winner_cwa else 0
             r.update()
 
-    def calculate_hc_score_from_self(self):
+    def calculate_hc_score_from_self(self, participants=None):
         """
         HC score = sum of numeric race placements for this dog in this meet.
         Dog must be adult, complete all 4 programs, and have no incident.
         Lower HC score is better.
         """
-        Dog = _get_dog_class()
-        dog = Dog.find_by_identifier(self.cwa_number)
-        if not dog or not dog.is_adult():
+        if participants is None:
+            participants = _get_participants_class().load(self.meet_number, [self.cwa_number])
+
+        if not participants.is_adult(self.cwa_number):
             return 0
 
-        if not self.completed_all_4_programs_for_arx():
+        if not self.completed_all_4_programs_for_arx(participants):
             return 0
 
-        rows = fetch_all("""
-            SELECT Placement
-            FROM RaceResults
-            WHERE MeetNumber = %s AND CWANumber = %s
-        """, (self.meet_number, self.cwa_number)) or []
+        rows = participants.race_rows(self.cwa_number)
 
         score = 0
         count = 0
@@ -1,4 +1,7 @@
 from database import fetch_all, fetch_one
+from classes.ytd_standings import YTDStandings
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+from utils.date_ranges import resolve_range
 
 class Stats:
     def get_top_all_time(self, limit=20):
@@ -32,7 +35,11 @@ class Stats:
         
         return results
     
-    def get_top_by_year(self, year, limit=20):
+    def get_top_by_year(self, year, limit=20, start=None, end=None):
+        """Top dogs in a year or season window; all time when neither is given."""
+        period = resolve_range(year, start, end)
+        if not period:
+            return self.get_top_all_time(limit)
         query = """
             SELECT 
                 d.ID as dog_id,
@@ -50,13 +57,13 @@ class Stats:
             LEFT JOIN Person o ON do.PersonID = o.PersonID
             LEFT JOIN RaceResults rr ON d.CWANumber = rr.CWANumber
             LEFT JOIN Meet r ON rr.MeetNumber = r.MeetNumber
-            WHERE YEAR(r.MeetDate) = %s
+            WHERE r.MeetDate >= %s AND r.MeetDate < %s
             GROUP BY d.ID, d.RegisteredName, d.CWANumber, o.PersonID, o.FirstName, o.LastName
             ORDER BY total_points DESC, wins DESC
             LIMIT %s
         """
         
-        results = fetch_all(query, (year, limit))
+        results = fetch_all(query, (*period, limit))
         
         for idx, dog in enumerate(results, 1):
             dog['rank'] = idx
@@ -66,7 +73,9 @@ class Stats:
 
     
     
-    def search_stats_by_year(self, year, dog_id=None, owner_id=None):
+    def search_stats_by_year(self, year, dog_id=None, owner_id=None, start=None, end=None):
+        """Race results in a year or season window; unfiltered by date when neither is given."""
+        period = resolve_range(year, start, end)
         query = """
             SELECT 
                 d.ID as dog_id,
@@ -85,10 +94,13 @@ class Stats:
             LEFT JOIN Person o ON do.PersonID = o.PersonID
             LEFT JOIN RaceResults rr ON d.CWANumber = rr.CWANumber
             LEFT JOIN Meet r ON rr.MeetNumber = r.MeetNumber
-            WHERE YEAR(r.MeetDate) = %s
+            WHERE 1 = 1
         """
         
-        params = [year]
+        params = []
+        if period:
+            query += " AND r.MeetDate >= %s AND r.MeetDate < %s"
+            params.extend(period)
         
         if dog_id:
             query += " AND d.CWANumber = %s"
@@ -102,7 +114,8 @@ class Stats:
         
         return fetch_all(query, tuple(params))
 
-    def search_stats_by_dog(self, cwa_number, owner_id, year):
+    def search_stats_by_dog(self, cwa_number, owner_id, year, start=None, end=None):
+        period = resolve_range(year, start, end)
         dog_query = """
             SELECT 
                 d.ID as dog_id,
@@ -141,9 +154,9 @@ class Stats:
         """
         
         params = [cwa_number]
-        if year is not None:
-            stats_query += " AND YEAR(r.MeetDate) = %s"
-            params.append(year)
+        if period:
+            stats_query += " AND r.MeetDate >= %s AND r.MeetDate < %s"
+            params.extend(period)
         
         stats = fetch_one(stats_query, tuple(params))
         
@@ -159,9 +172,9 @@ class Stats:
         """
         
         params = [cwa_number]  
-        if year is not None:
-            recent_query += " AND YEAR(r.MeetDate) = %s"
-            params.append(year)
+        if period:
+            recent_query += " AND r.MeetDate >= %s AND r.MeetDate < %s"
+            params.extend(period)
         
         recent_query += " ORDER BY r.MeetDate DESC LIMIT 10"
         
@@ -180,7 +193,8 @@ class Stats:
 
 
     
-    def search_stats_by_owner(self, owner_id, dog_id, year):
+    def search_stats_by_owner(self, owner_id, dog_id, year, start=None, end=None):
+        period = resolve_range(year, start, end)
         owner_query = """
             SELECT * FROM Person WHERE PersonID = %s
         """
@@ -207,9 +221,9 @@ class Stats:
         
         params = [owner_id]
         
-        if year:
-            dogs_query += " AND YEAR(r.MeetDate) = %s"
-            params.append(year)
+        if period:
+            dogs_query += " AND r.MeetDate >= %s AND r.MeetDate < %s"
+            params.extend(period)
 
         if dog_id:
             dogs_query += " AND d.CWANumber = %s"
@@ -248,7 +262,8 @@ class Stats:
         results = fetch_all(query)
         return [row['year'] for row in results]
     
-    def get_dog_info(self, cwa_number, year=None):
+    def get_dog_info(self, cwa_number, year=None, start=None, end=None):
+        period = resolve_range(year, start, end)
         params = []
         
         meet_results_join = """
@@ -263,18 +278,18 @@ class Stats:
                 FROM MeetResults mr
         """
 
-        if year:
-            meet_results_join += " JOIN Meet m ON m.MeetNumber = mr.MeetNumber WHERE YEAR(m.MeetDate) = %s"
-            params.append(year)
+        if period:
+            meet_results_join += " JOIN Meet m ON m.MeetNumber = mr.MeetNumber WHERE m.MeetDate >= %s AND m.MeetDate < %s"
+            params.extend(period)
 
         meet_results_join += """
                 GROUP BY CWANumber
             ) rr ON d.CWANumber = rr.CWANumber
         """
 
-        manual_meet_expr = "0" if year else "COALESCE(d.ManualMeetPointsAdjustment, 0)"
-        manual_show_expr = "0" if year else "COALESCE(d.ManualShowPointsAdjustment, 0)"
-        manual_dpc_expr = "0" if year else "COALESCE(d.ManualDPCPointsAdjustment, 0)"
+        manual_meet_expr = "0" if period else "COALESCE(d.ManualMeetPointsAdjustment, 0)"
+        manual_show_expr = "0" if period else "COALESCE(d.ManualShowPointsAdjustment, 0)"
+        manual_dpc_expr = "0" if period else "COALESCE(d.ManualDPCPointsAdjustment, 0)"
 
         query = f"""
             SELECT 
@@ -320,96 +335,38 @@ class Stats:
 
 
     def get_ytd_hc_wins(self, year):
-        query = """
-            WITH eligible AS (
-                SELECT
-                    mr.MeetNumber,
-                    mr.CWANumber,
-                    mr.MeetPlacement,
-                    mr.ConformationPlacement,
-                    (mr.MeetPlacement + mr.ConformationPlacement) AS combined_score
-                FROM MeetResults mr
-                JOIN Meet m ON m.MeetNumber = mr.MeetNumber
-                WHERE YEAR(m.MeetDate) = %s
-                AND mr.MeetPlacement IS NOT NULL
-                AND mr.ConformationPlacement IS NOT NULL
-                AND mr.MeetPlacement < (
-                    SELECT MAX(x.MeetPlacement)
-                    FROM MeetResults x
-                    WHERE x.MeetNumber = mr.MeetNumber
-                    AND x.MeetPlacement IS NOT NULL
-                )
-                AND mr.ConformationPlacement < (
-                    SELECT MAX(y.ConformationPlacement)
-                    FROM MeetResults y
-                    WHERE y.MeetNumber = mr.MeetNumber
-                    AND y.ConformationPlacement IS NOT NULL
-                )
-            ),
-            winners AS (
-                SELECT e.*
-                FROM eligible e
-                WHERE e.combined_score = (
-                    SELECT MIN(e2.combined_score)
-                    FROM eligible e2
-                    WHERE e2.MeetNumber = e.MeetNumber
-                )
-                AND e.MeetPlacement = (
-                    SELECT MIN(e3.MeetPlacement)
-                    FROM eligible e3
-                    WHERE e3.MeetNumber = e.MeetNumber
-                    AND e3.combined_score = e.combined_score
-                )
-            )
-            SELECT
-                d.ID as dog_id,
-                d.CallName as call_name,
-                d.RegisteredName as dog_name,
-                d.CWANumber as cwanumber,
-                o.ID as owner_id,
-                CONCAT(o.FirstName, ' ', o.LastName) as owner_name,
-                COUNT(*) as value
-            FROM winners w
-            LEFT JOIN Dog d ON w.CWANumber = d.CWANumber
-            LEFT JOIN DogOwner do ON d.CWANumber = do.CWAID
-            LEFT JOIN Person o ON do.PersonID = o.ID
-            GROUP BY
-                d.ID,
-                d.CallName,
-                d.RegisteredName,
-                d.CWANumber,
-                o.ID,
-                o.FirstName,
-                o.LastName
-            HAVING COUNT(*) > 0
-            ORDER BY value DESC, d.RegisteredName ASC
-        """
+        return YTDStandings.list_for(year, YTDStandings.HC_WINS)
 
-        results = fetch_all(query, (year,))
-        return self.apply_competition_ranking(results, 'value')
-
-    # returns the YTD standings for a specific stat
+    # returns the YTD standings for a specific stat, pre-ranked in YTDStandings
     def get_ytd_standings(self, stat_type, year):
-        # if the year is not valid, return empty list
-        if year not in self.get_available_years():
+        # if the stat type is not valid, return empty list
+        if stat_type not in YTDStandings.STAT_TYPES:
             return []
-        
-        if stat_type == 'hc_wins':
-            return self.get_ytd_hc_wins(year)
-
-        # map stat type to the correct DB column name
-        stat_map = {
-            'meet_points': 'MeetPoints',
-            'match_points': 'ShowPoints',
-            'hc_wins': 'HighCombinedWins',
-            'narx': 'NARXEarned'
-        }
 
-        # if the stat type is not valid, return empty list
-        if stat_type not in stat_map:
+        return YTDStandings.list_for(year, stat_type)
+
+    # standings for an arbitrary season window, computed live (YTDStandings only holds calendar years)
+    def get_standings_for_range(self, stat_type, start, end):
+        period = resolve_range(start=start, end=end)
+
+        if stat_type == YTDStandings.HC_WINS:
+            value_expr = "COUNT(*)"
+            source = """
+                FROM Meet m
+                JOIN MeetHighCombinedWinner w ON w.MeetNumber = m.MeetNumber AND w.Basis = %s
+                JOIN Dog d ON d.CWANumber = w.CWANumber
+            """
+            params = [MeetHighCombinedWinner.EXCLUDING_LAST, *period]
+        elif stat_type in YTDStandings.SUM_COLUMNS:
+            value_expr = f"COALESCE(SUM(mr.{YTDStandings.SUM_COLUMNS[stat_type]}), 0)"
+            source = """
+                FROM Meet m
+                JOIN MeetResults mr ON mr.MeetNumber = m.MeetNumber
+                JOIN Dog d ON d.CWANumber = mr.CWANumber
+            """
+            params = list(period)
+        else:
             return []
-        
-        stat_column = stat_map[stat_type]
 
         query = f"""
             SELECT
@@ -419,13 +376,11 @@ class Stats:
                 d.CWANumber as cwanumber,
                 o.ID as owner_id,
                 CONCAT(o.FirstName, ' ', o.LastName) as owner_name,
-                COALESCE(SUM(mr.{stat_column}), 0) as value
-            FROM Dog d
+                {value_expr} as value
+            {source}
             LEFT JOIN DogOwner do ON d.CWANumber = do.CWAID
             LEFT JOIN Person o ON do.PersonID = o.ID
-            LEFT JOIN MeetResults mr ON d.CWANumber = mr.CWANumber
-            LEFT JOIN Meet m ON mr.MeetNumber = m.MeetNumber
-            WHERE YEAR(m.MeetDate) = %s
+            WHERE m.MeetDate >= %s AND m.MeetDate < %s
             GROUP BY
                 d.ID,
                 d.CallName,
@@ -434,14 +389,9 @@ class Stats:
                 o.ID,
                 o.FirstName,
                 o.LastName
-            HAVING COALESCE(SUM(mr.{stat_column}), 0) > 0
+            HAVING {value_expr} > 0
             ORDER BY value DESC, d.RegisteredName ASC
         """
 
-        results = fetch_all(query, (year,))
-
+        results = fetch_all(query, tuple(params))
         return self.apply_competition_ranking(results, 'value')
-        
-
-
-
@@ -1,10 +1,20 @@
 from database import fetch_all, fetch_one, execute
+import copy
+import os
+import threading
+import time
+
+# title -> (expires_at, UserRole or None), shared by every request in the process
+_title_cache = {}
+_title_cache_lock = threading.Lock()
 
 class UserRole:
     NONE = 0
     SELF = 1
     ALL = 2
 
+    CACHE_TTL_SECONDS = float(os.getenv("ROLE_CACHE_TTL", "30"))
+
     def __init__(
         self,
         title=None,
@@ -76,6 +86,29 @@ class UserRole:
         )
         return cls.from_db_row(row)
 
+    @classmethod
+    def find_by_title_cached(cls, title):
+        """
+        find_by_title behind a short process-wide TTL cache, for the
+        signed-in user's role that nearly every request looks up.
+        Cleared whenever a role is saved, updated or deleted.
+        """
+        now = time.monotonic()
+        with _title_cache_lock:
+            hit = _title_cache.get(title)
+        if hit and hit[0] > now:
+            return copy.copy(hit[1])
+
+        role = cls.find_by_title(title)
+        with _title_cache_lock:
+            _title_cache[title] = (now + cls.CACHE_TTL_SECONDS, role)
+        return copy.copy(role)
+
+    @staticmethod
+    def invalidate_cache():
+        with _title_cache_lock:
+            _title_cache.clear()
+
     @classmethod
     def exists(cls, title):
         t = (title or "").strip().upper()
@@ -93,6 +126,7 @@ class UserRole:
             """,
             (self.id,)
         )
+        UserRole.invalidate_cache()
         return True
 
     def validate(self):
@@ -136,6 +170,7 @@ class UserRole:
             ),
             return_lastrowid=True
         )
+        UserRole.invalidate_cache()
         return True
 
     def update_by_id(self):
@@ -161,6 +196,7 @@ class UserRole:
                 self.id,
             ),
         )
+        UserRole.invalidate_cache()
         return True
 
     @staticmethod
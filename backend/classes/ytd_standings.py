@@ -0,0 +1,172 @@
+'''
+Docstring for ytd_standings
+
+Materialized year-to-date standings. One row per (Year, StatType, CWANumber)
+holds the dog's total for that year and its competition rank, so the
+standings pages read pre-ranked rows instead of aggregating MeetResults on
+every request. Rows are refreshed for the affected year and dogs whenever a
+meet's results change; rebuild() recomputes whole years.
+'''
+
+from database import fetch_all, transaction, _in_clause
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+from utils.date_ranges import year_range
+
+
+class YTDStandings:
+
+    # stat type -> MeetResults column summed for it
+    SUM_COLUMNS = {
+        "meet_points": "MeetPoints",
+        "match_points": "ShowPoints",
+        "narx": "NARXEarned",
+    }
+    HC_WINS = "hc_wins"
+    STAT_TYPES = (*SUM_COLUMNS, HC_WINS)
+
+    @classmethod
+    def list_for(cls, year, stat_type):
+        """Pre-ranked standings rows in the shape the standings page expects."""
+        if stat_type not in cls.STAT_TYPES:
+            return []
+        rows = fetch_all(
+            """
+            SELECT
+                d.ID as dog_id,
+                d.CallName as call_name,
+                d.RegisteredName as dog_name,
+                d.CWANumber as cwanumber,
+                o.ID as owner_id,
+                CONCAT(o.FirstName, ' ', o.LastName) as owner_name,
+                s.Value as value,
+                s.Ranking as `rank`
+            FROM YTDStandings s
+            JOIN Dog d ON d.CWANumber = s.CWANumber
+            LEFT JOIN DogOwner do ON d.CWANumber = do.CWAID
+            LEFT JOIN Person o ON do.PersonID = o.ID
+            WHERE s.Year = %s AND s.StatType = %s
+            ORDER BY s.Ranking ASC, d.RegisteredName ASC
+            """,
+            (year, stat_type),
+        ) or []
+        if stat_type == cls.HC_WINS:
+            for row in rows:
+                row["value"] = int(row["value"])
+        return rows
+
+    @classmethod
+    def meet_scope(cls, meet_number):
+        """{year: {cwa, ...}} for the dogs that currently have results in the meet."""
+        rows = fetch_all(
+            """
+            SELECT YEAR(m.MeetDate) AS year, mr.CWANumber
+            FROM Meet m
+            JOIN MeetResults mr ON mr.MeetNumber = m.MeetNumber
+            WHERE m.MeetNumber = %s
+            """,
+            (meet_number,),
+        ) or []
+        scope = {}
+        for r in rows:
+            scope.setdefault(int(r["year"]), set()).add(r["CWANumber"])
+        return scope
+
+    @classmethod
+    def refresh_meet(cls, meet_number, previous_scope=None):
+        """
+        Refresh standings after a meet's results changed. previous_scope is the
+        meet_scope() taken before the change, so dogs that were removed from the
+        meet, or a year the meet was moved out of, are refreshed too.
+        """
+        scope = cls.meet_scope(meet_number)
+        for year, cwa_numbers in (previous_scope or {}).items():
+            scope.setdefault(year, set()).update(cwa_numbers)
+        cls.refresh(scope)
+
+    @classmethod
+    def refresh(cls, scope):
+        """Recompute the given dogs for each year in scope ({year: cwa_numbers}) and re-rank those years."""
+        for year, cwa_numbers in scope.items():
+            cwa_numbers = sorted({c for c in cwa_numbers if c})
+            if cwa_numbers:
+                cls._write_year(year, cls._compute(year, cwa_numbers), cwa_numbers)
+
+    @classmethod
+    def rebuild(cls, years=None):
+        """Full recompute of the given years (default: every year with a meet)."""
+        if years is None:
+            years = [int(r["year"]) for r in fetch_all(
+                "SELECT DISTINCT YEAR(MeetDate) AS year FROM Meet"
+            ) or []]
+            stale = fetch_all("SELECT DISTINCT Year FROM YTDStandings") or []
+            years = sorted(set(years) | {int(r["Year"]) for r in stale})
+        for year in years:
+            cls._write_year(year, cls._compute(year))
+
+    @classmethod
+    def _compute(cls, year, cwa_numbers=None):
+        """[(stat_type, cwa, value), ...] for the year, limited to cwa_numbers if given."""
+        start, end = year_range(year)
+        dog_filter = ""
+        dog_params = []
+        if cwa_numbers is not None:
+            dog_filter = f"AND mr.CWANumber IN ({_in_clause(cwa_numbers)})"
+            dog_params = list(cwa_numbers)
+
+        sums = ", ".join(f"COALESCE(SUM(mr.{column}), 0) AS {stat}" for stat, column in cls.SUM_COLUMNS.items())
+        rows = fetch_all(
+            f"""
+            SELECT mr.CWANumber, {sums}
+            FROM MeetResults mr
+            JOIN Meet m ON m.MeetNumber = mr.MeetNumber
+            WHERE m.MeetDate >= %s AND m.MeetDate < %s
+            {dog_filter}
+            GROUP BY mr.CWANumber
+            """,
+            [start, end] + dog_params,
+        ) or []
+
+        values = []
+        for r in rows:
+            for stat in cls.SUM_COLUMNS:
+                if (r[stat] or 0) > 0:
+                    values.append((stat, r["CWANumber"], r[stat]))
+
+        wins = MeetHighCombinedWinner.counts_for_year(year, MeetHighCombinedWinner.EXCLUDING_LAST, cwa_numbers)
+        values.extend((cls.HC_WINS, cwa, count) for cwa, count in wins.items() if count)
+        return values
+
+    @classmethod
+    def _write_year(cls, year, values, cwa_numbers=None):
+        """Replace the year's rows (or just cwa_numbers' rows) with values and re-rank the year."""
+        with transaction() as tx:
+            if cwa_numbers is None:
+                tx.execute("DELETE FROM YTDStandings WHERE Year = %s", (year,))
+            else:
+                tx.execute(
+                    f"DELETE FROM YTDStandings WHERE Year = %s AND CWANumber IN ({_in_clause(cwa_numbers)})",
+                    [year] + list(cwa_numbers),
+                )
+            if values:
+                tx.execute_many(
+                    """
+                    INSERT INTO YTDStandings (Year, StatType, CWANumber, Value, Ranking)
+                    VALUES (%s, %s, %s, %s, 0)
+                    """,
+                    [(year, stat, cwa, value) for stat, cwa, value in values],
+                )
+            tx.execute(
+                """
+                UPDATE YTDStandings s
+                JOIN (
+                    SELECT StatType, CWANumber,
+                           RANK() OVER (PARTITION BY StatType ORDER BY Value DESC) AS Ranking
+                    FROM YTDStandings
+                    WHERE Year = %s
+                ) ranked
+                    ON ranked.StatType = s.StatType AND ranked.CWANumber = s.CWANumber
+                SET s.Ranking = ranked.Ranking
+                WHERE s.Year = %s
+                """,
+                (year, year),
+            )
@@ -1,8 +1,10 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from mysql.connector import Error
+from datetime import date, timedelta
 from classes.change_log import ChangeLog
-from utils.auth_helpers import current_role
+from utils.auth_helpers import current_editor_id, current_role
 from utils.error_handler import handle_error
+from utils.job_runner import submit_job
 
 change_log_bp = Blueprint("change_log", __name__, url_prefix="/api/change_log")
 
@@ -26,9 +28,50 @@ def list_all_change_logs():
     if not role or role.title != "ADMIN":
         return jsonify({"ok": False, "error": "Not authorized"}), 403
 
+    args = request.args
     try:
-        change_logs = ChangeLog.list_all()
-        return jsonify({"ok": True, "data": [c.to_dict() for c in change_logs]}), 200
+        since = date.fromisoformat(args["from"]) if args.get("from") else None
+        until = date.fromisoformat(args["to"]) + timedelta(days=1) if args.get("to") else None
+        limit = int(args.get("limit") or ChangeLog.PAGE_SIZE)
+    except ValueError:
+        return jsonify({"ok": False, "error": "Invalid filter"}), 400
 
+    try:
+        change_logs, next_cursor = ChangeLog.search(
+            changed_table=(args.get("table") or "").strip() or None,
+            record_pk=(args.get("recordPk") or "").strip() or None,
+            changed_by=args.get("changedBy") or None,
+            since=since,
+            until=until,
+            archived=(args.get("archived") or "").lower() == "true",
+            limit=limit,
+            cursor=args.get("cursor") or None,
+        )
+        return jsonify({
+            "ok": True,
+            "data": [c.to_dict() for c in change_logs],
+            "nextCursor": next_cursor,
+        }), 200
+
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except Error as e:
+        return handle_error(e, "Database error")
+
+
+@change_log_bp.post("/archive")
+def archive_change_logs():
+    role = current_role()
+    if not role or role.title != "ADMIN":
+        return jsonify({"ok": False, "error": "Not authorized"}), 403
+
+    before = ChangeLog.archive_cutoff()
+    try:
+        job = submit_job("archive_change_log", _archive_job, before, created_by=current_editor_id())
+        return jsonify({"ok": True, "jobId": job.id, "before": before.isoformat()}), 202
     except Error as e:
-        return handle_error(e, "Database error")
\ No newline at end of file
+        return handle_error(e, "Database error")
+
+
+def _archive_job(before, progress):
+    return {"before": before.isoformat(), "archived": ChangeLog.archive(before, progress=progress)}
@@ -1,56 +1,31 @@
 from flask import Blueprint, jsonify, request, Response
 from datetime import datetime
 import os
-from utils.auth_helpers import current_role
+import shutil
+import tempfile
+import time
+from utils.auth_helpers import current_editor_id, current_role
 from utils.error_handler import handle_error
-from database import fetch_all, fetch_one, get_conn
+from utils.job_runner import submit_job
+from utils.sql_statements import iter_statement_batches
+from utils.sql_dump import get_tables, table_inserts
+from utils import db_archive
+from database import fetch_one, get_conn
 from classes.dog import Dog
 from classes.person import Person 
 from classes.meet import Meet
+from classes.job import Job
 from compression import zstd
 
 database_bp = Blueprint("database", __name__, url_prefix="/api/database")
 
-
-def escape(val):
-    if val is None:
-        return "NULL"
-    if isinstance(val, (int, float)):
-        return str(val)
-    return "'" + str(val).replace("'", "''") + "'"
-
-
-def get_tables():
-    db_name = os.getenv("DB_NAME", "cwa_db")
-    key = f"Tables_in_{db_name}"
-    tables = fetch_all("SHOW TABLES")
-    return [row[key] for row in tables]
-
+# Finished archive dumps wait here until downloaded; older ones are removed when a new dump starts.
+DUMP_DIR = os.getenv("DATABASE_DUMP_DIR", os.path.join(tempfile.gettempdir(), "cwa-dumps"))
+DUMP_KEEP_SECONDS = 24 * 3600
 
 def restore_from_file(path):
-
-    with get_conn() as conn:
-        conn.autocommit = False
-        cur = conn.cursor()
-
-        try:
-            with open(path, "r", encoding="utf-8") as file:
-                sql = file.read()
-
-            statements = sql.split(';')
-            for statement in statements:
-                statement = statement.strip()
-                if statement:  
-                    cur.execute(statement)
-
-            conn.commit()
-
-        except Exception:
-            conn.rollback()
-            raise
-
-        finally:
-            cur.close()
+    with open(path, "rb") as stream:
+        restore_from_commands(iter_statement_batches(chunked_reader(stream, 1024 * 1024)))
 
 
 def generate_sql():
@@ -60,16 +35,12 @@ def generate_sql():
             yield f"DROP TABLE IF EXISTS `{table_name}`;\n"
             create_stmt = fetch_one(f"SHOW CREATE TABLE `{table_name}`")
             yield create_stmt["Create Table"] + ";\n\n"
-            rows = fetch_all(f"SELECT * FROM `{table_name}`")
-            for row in rows:
-                columns = ", ".join(f"`{col}`" for col in row.keys())
-                values = ", ".join(escape(val) for val in row.values())
-                yield f"INSERT INTO `{table_name}` ({columns}) VALUES ({values});\n"
-            
+            yield from table_inserts(table_name)
             yield "\n"
 
         yield "SET FOREIGN_KEY_CHECKS=1;\n"
 
+
 def zstd_wrapper(text_stream):
     compressor = zstd.ZstdCompressor(level=9)
     for x in text_stream:
@@ -79,6 +50,10 @@ def zstd_wrapper(text_stream):
 
 @database_bp.get("/dump")
 def dump_database():
+    """
+    Plain SQL dump as one zstd stream. The parallel per-table archive, which
+    restores faster, is built by a job: POST /dump/archive.
+    """
     try:
         role = current_role()
         if not role or role.title != "ADMIN":
@@ -94,30 +69,97 @@ def dump_database():
         return handle_error(e, "Server error")
 
 
+def _dump_path(job_id):
+    return os.path.join(DUMP_DIR, f"{job_id}.cwadump")
+
+
+def _purge_old_dumps():
+    cutoff = time.time() - DUMP_KEEP_SECONDS
+    for name in os.listdir(DUMP_DIR):
+        path = os.path.join(DUMP_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _dump_job(progress):
+    """Write the archive (see utils.db_archive) to DUMP_DIR for GET /dump/archive/<job id>."""
+    os.makedirs(DUMP_DIR, exist_ok=True)
+    _purge_old_dumps()
+    path = _dump_path(progress.job.id)
+    archive = tempfile.NamedTemporaryFile(dir=DUMP_DIR, prefix="dump-", suffix=".tmp", delete=False)
+    try:
+        with archive:
+            manifest = db_archive.write_archive(archive, progress=progress)
+        os.replace(archive.name, path)
+    except Exception:
+        os.remove(archive.name)
+        raise
+    progress(message="Dump complete", force=True)
+    return {"tables": len(manifest["tables"]), "bytes": os.path.getsize(path)}
+
+
+@database_bp.post("/dump/archive")
+def dump_archive():
+    try:
+        role = current_role()
+        if not role or role.title != "ADMIN":
+            return jsonify({"ok": False, "error": "Not authorized to dump the database"}), 403
+
+        job = submit_job("dump_database", _dump_job, created_by=current_editor_id())
+        return jsonify({"ok": True, "jobId": job.id}), 202
+    except Exception as e:
+        return handle_error(e, "Server error")
+
+
+@database_bp.get("/dump/archive/<int:job_id>")
+def download_archive(job_id):
+    try:
+        role = current_role()
+        if not role or role.title != "ADMIN":
+            return jsonify({"ok": False, "error": "Not authorized to dump the database"}), 403
+
+        job = Job.find_by_identifier(job_id)
+        if not job or job.job_type != "dump_database":
+            return jsonify({"ok": False, "error": "Dump does not exist"}), 404
+        if job.status != Job.SUCCEEDED:
+            return jsonify({"ok": False, "error": "Dump is not finished", "status": job.status}), 409
+
+        path = _dump_path(job_id)
+        if not os.path.exists(path):
+            return jsonify({"ok": False, "error": "Dump has expired"}), 410
+
+        def stream():
+            with open(path, "rb") as f:
+                yield from chunked_reader(f, 1024 * 1024)
+
+        timestamp = (job.finished_at or datetime.now()).strftime("%Y%m%d%H%M%S")
+        return Response(
+            stream(),
+            mimetype="application/octet-stream",
+            headers={"Content-disposition": f"attachment; filename={timestamp}-db-dump.cwadump"}
+        )
+    except Exception as e:
+        return handle_error(e, "Server error")
+
+
 def zstd_decompression_wrapper(compressed_stream):
     """
-    Takes an iterator of ZSTD compressed chunks and return UTF-8 string chunks
+    Takes an iterator of ZSTD compressed chunks and return decompressed byte
+    chunks. Decoding is left to the statement splitter, since a chunk can end
+    in the middle of a UTF-8 character.
     """
     decompressor = zstd.ZstdDecompressor()
     for x in compressed_stream:
-        yield decompressor.decompress(x).decode("utf-8")
-
-
-def iter_commands(chunks):
-    """
-    Take an iterator of string chunks and yield complete sql commands.
-    """
-    buffer = ""
-    for chunk in chunks:
-        buffer += chunk
-        while ";" in buffer:
-            line, buffer = buffer.split(";", 1)
-            yield line
+        yield decompressor.decompress(x)
 
 
-def restore_from_commands(statements):
+def restore_from_commands(batches):
     """
-    Takes an iterator of SQL commands and applys them to the DB
+    Takes an iterator of SQL statement batches (see iter_statement_batches)
+    and applies them to the DB on one connection.
     """
     
     with get_conn() as conn:
@@ -125,9 +167,8 @@ def restore_from_commands(statements):
         cur = conn.cursor()
 
         try:
-            for statement in statements:
-                statement = statement.strip()
-                if statement:  
+            for statements in batches:
+                for statement in statements:
                     cur.execute(statement)
 
             conn.commit()
@@ -139,22 +180,55 @@ def restore_from_commands(statements):
         finally:
             cur.close()
 
+def chunked_reader(stream, chunk_size=4096):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _restore_job(path, progress):
+    if db_archive.is_archive(path):
+        result = db_archive.restore_archive(path, progress=progress)
+        progress(message="Restore complete", force=True)
+        return result
+
+    total = os.path.getsize(path)
+    progress(0, total, "Restoring database")
+    with open(path, "rb") as stream:
+        def tracked():
+            for chunk in chunked_reader(stream, 1024 * 1024):
+                yield chunk
+                progress(stream.tell(), total)
+        restore_from_commands(iter_statement_batches(zstd_decompression_wrapper(tracked())))
+    progress(total, total, "Restore complete", force=True)
+    return {"bytes": total}
+
+
 @database_bp.post("/restore")
 def restore_database():
-    
-    def chunked_reader():
-        chunk_size = 4096
-        while True:
-            chunk = request.stream.read(chunk_size)
-            if not chunk:
-                break
-            yield chunk
     try:
         role = current_role()
         if not role or role.title != "ADMIN":
             return jsonify({"ok": False, "error": "Not authorized to restore the database"}), 403
-        restore_from_commands(iter_commands(zstd_decompression_wrapper(chunked_reader())))
-        return jsonify({"ok": True}), 200 
+
+        upload = tempfile.NamedTemporaryFile(prefix="restore-", delete=False)
+        try:
+            with upload:
+                shutil.copyfileobj(request.stream, upload)
+
+            job = submit_job(
+                "restore_database",
+                _restore_job,
+                upload.name,
+                created_by=current_editor_id(),
+                cleanup=lambda: os.remove(upload.name),
+            )
+        except Exception:
+            os.remove(upload.name)
+            raise
+        return jsonify({"ok": True, "jobId": job.id}), 202
     except Exception as e:
         return handle_error(e, "Server error")
 
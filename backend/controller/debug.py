@@ -0,0 +1,63 @@
+from flask import Blueprint, jsonify, request
+from mysql.connector import Error
+from classes.email_outbox import EmailOutbox
+from utils.auth_helpers import current_role
+from utils.error_handler import handle_error
+from utils.query_stats import QueryStats
+
+debug_bp = Blueprint("debug", __name__, url_prefix="/api/debug")
+
+
+@debug_bp.get("/queries")
+def list_queries():
+    """
+    Query fingerprints seen by this worker, heaviest first.
+    ?sort=total|calls|max (default total), ?limit=1..500 (default 50).
+    """
+    role = current_role()
+    if not role or role.title != "ADMIN":
+        return jsonify({"ok": False, "error": "Not authorized"}), 403
+
+    sort = request.args.get("sort", "total")
+    if sort not in ("total", "calls", "max"):
+        return jsonify({"ok": False, "error": "sort must be one of total, calls, max"}), 400
+
+    try:
+        limit = min(max(int(request.args.get("limit", 50)), 1), 500)
+    except ValueError:
+        limit = 50
+
+    return jsonify({
+        "ok": True,
+        "summary": QueryStats.summary(),
+        "data": QueryStats.top(sort, limit),
+    }), 200
+
+
+@debug_bp.delete("/queries")
+def reset_queries():
+    """Start a fresh profile, e.g. before exercising one page."""
+    role = current_role()
+    if not role or role.title != "ADMIN":
+        return jsonify({"ok": False, "error": "Not authorized"}), 403
+
+    QueryStats.reset()
+    return jsonify({"ok": True}), 200
+
+
+@debug_bp.get("/emails")
+def list_emails():
+    """Most recent outbox entries with their delivery status, newest first."""
+    role = current_role()
+    if not role or role.title != "ADMIN":
+        return jsonify({"ok": False, "error": "Not authorized"}), 403
+
+    try:
+        limit = min(max(int(request.args.get("limit", 50)), 1), 500)
+    except ValueError:
+        limit = 50
+
+    try:
+        return jsonify({"ok": True, "data": [e.to_dict() for e in EmailOutbox.list_recent(limit)]}), 200
+    except Error as e:
+        return handle_error(e, "Database error")
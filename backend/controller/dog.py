@@ -1,15 +1,20 @@
 from flask import Blueprint, jsonify, request
+import time
 from mysql.connector import Error
 from datetime import datetime, timezone
 from classes.dog import Dog
 from classes.dog_title import DogTitle
 from classes.dog_owner import DogOwner
+from classes.dog_search_index import DogSearchIndex
 from classes.race_result import RaceResult
 from classes.meet_result import MeetResult
 from classes.change_log import ChangeLog
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+from classes.ytd_standings import YTDStandings
 from classes.user_role import UserRole
 from utils.auth_helpers import current_editor_id, current_role, require_scope
 from utils.error_handler import handle_error
+from utils.job_runner import submit_job
 from classes.title_type import TitleType 
 
 dog_bp = Blueprint("dog", __name__, url_prefix="/api/dog")
@@ -182,6 +187,11 @@ def delete_dog():
         meet_results = MeetResult.list_meets_with_results_for_dog(dog.cwa_number)
         race_results = RaceResult.list_race_results_for_dog(dog.cwa_number)
 
+        standings_scope = {}
+        for meet_number in {meet.meet_number for meet in meet_results}:
+            for year, cwa_numbers in YTDStandings.meet_scope(meet_number).items():
+                standings_scope.setdefault(year, set()).update(cwa_numbers)
+
         for race in race_results:
             ChangeLog.log(
                 changed_table="RaceResults",
@@ -207,6 +217,7 @@ def delete_dog():
             )
 
         MeetResult.delete_all_for_dog(dog.cwa_number)
+        MeetHighCombinedWinner.refresh({meet.meet_number for meet in meet_results})
 
         # Delete owners
         for owner in owners:
@@ -239,6 +250,7 @@ def delete_dog():
         
         #remove dog record
         Dog.delete(dog.cwa_number)
+        YTDStandings.refresh(standings_scope)
 
         ChangeLog.log(
             changed_table="Dog",
@@ -381,9 +393,11 @@ def search_dogs():
         page = int(request.args.get("page", 1))
     except (TypeError, ValueError):
         page = 1
+    cursor = request.args.get("cursor") or None
     try:
-        count = len(Dog.search(query=q, owner_person_id=owner))
-        rows = Dog.search(query=q, owner_person_id=owner, page=page, limit=20, sort=sort)
+        rows, next_cursor = Dog.search_page(
+            query=q, owner_person_id=owner, page=page, limit=20, sort=sort, cursor=cursor
+        )
         items = []
         for r in rows:
             d = dict(r)
@@ -400,8 +414,24 @@ def search_dogs():
                 "grade": d.get("CurrentGrade"), 
                 "average": d.get("Average"), 
             })
-        return jsonify({"ok": True, "total": count, "items": items}), 200
+        body = {"ok": True, "items": items, "nextCursor": next_cursor}
+        # page-number requests still get a total; cursor clients use /search/count once
+        if not cursor:
+            body["total"] = Dog.search_count(query=q, owner_person_id=owner)
+        return jsonify(body), 200
+
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except Error as e:
+        return handle_error(e, "Database error")
 
+
+@dog_bp.get("/search/count")
+def count_dogs():
+    q = (request.args.get("q") or "").strip()
+    owner = request.args.get("owner", None)
+    try:
+        return jsonify({"ok": True, "total": Dog.search_count(query=q, owner_person_id=owner)}), 200
     except Error as e:
         return handle_error(e, "Database error")
 
@@ -435,7 +465,21 @@ def reload_all_stats():
     role = current_role()
     if not role or role.title != "ADMIN":
         return jsonify({"ok":False, "message": "unauthorized"})
-    for dog in Dog.list_all_dogs():
-        if dog is not None:
-            dog.update_from_meet_results()
-    return jsonify({"ok":True})
+    try:
+        job = submit_job("reload_all_stats", _reload_all_stats_job, created_by=current_editor_id())
+        return jsonify({"ok": True, "jobId": job.id}), 202
+    except Error as e:
+        return handle_error(e, "Database error")
+
+
+def _reload_all_stats_job(progress):
+    started = time.perf_counter()
+    progress(message="Finding high combined winners", force=True)
+    MeetHighCombinedWinner.rebuild()
+    summary = Dog.recompute_stats_bulk(progress=progress)
+    progress(message="Rebuilding standings", force=True)
+    YTDStandings.rebuild()
+    progress(message="Rebuilding search index", force=True)
+    DogSearchIndex.rebuild()
+    summary["elapsedSeconds"] = round(time.perf_counter() - started, 3)
+    return summary
@@ -1,8 +1,12 @@
 from flask import Blueprint, jsonify, request
 from mysql.connector import Error
+from werkzeug.datastructures import FileStorage
+import os
+import tempfile
 from classes.importer import CsvImporter
-from utils.auth_helpers import current_role
+from utils.auth_helpers import current_editor_id, current_role
 from utils.error_handler import handle_error
+from utils.job_runner import submit_job
 
 import_bp = Blueprint("import_bp", __name__, url_prefix="/api/import")
 importer = CsvImporter()
@@ -27,6 +31,7 @@ def import_csv():
     import_type = (request.args.get("type") or "dogs").strip().lower()
     mode = (request.args.get("mode") or "insert").strip().lower()
     use_adjustment = request.args.get("useAdjustment", "false").strip().lower() == "true"
+    bulk = request.args.get("bulk", "true").strip().lower() == "true"
 
     '''
     if import_type == "people":
@@ -69,17 +74,34 @@ def import_csv():
     if mode not in ("insert", "update"):
         return jsonify({"ok": False, "error": "mode must be 'insert' or 'update'"}), 400
 
-    try:
-        report = importer.run(
-            f,
-            import_type=import_type,
-            mode=mode,
-            use_adjustment=use_adjustment,
-        )
-        return jsonify({"ok": True, "report": report}), 200
+    if import_type not in importer.ENTITIES:
+        return jsonify({"ok": False, "error": f"Unknown CSV type: {import_type}"}), 400
 
-    except ValueError as e:
-        return jsonify({"ok": False, "error": str(e)}), 400
+    try:
+        upload = tempfile.NamedTemporaryFile(prefix="import-", suffix=".csv", delete=False)
+        try:
+            with upload:
+                f.save(upload)
+
+            editor_id = current_editor_id()
+            job = submit_job(
+                "import_csv",
+                _import_csv_job,
+                upload.name,
+                f.filename,
+                created_by=editor_id,
+                cleanup=lambda: os.remove(upload.name),
+                import_type=import_type,
+                mode=mode,
+                use_adjustment=use_adjustment,
+                editor_id=editor_id,
+                bulk=bulk,
+            )
+        except Exception:
+            # no job owns the upload yet, so nothing else will remove it
+            os.remove(upload.name)
+            raise
+        return jsonify({"ok": True, "jobId": job.id}), 202
 
     except Error as e:
         return handle_error(e, "Database error")
@@ -87,6 +109,11 @@ def import_csv():
     except Exception as e:
         return handle_error(e, "Server error")
 
+def _import_csv_job(path, filename, *, progress, **options):
+    with open(path, "rb") as stream:
+        return importer.run(FileStorage(stream=stream, filename=filename), progress=progress, **options)
+
+
 @import_bp.get("/types")
 def get_import_types():
     return jsonify({
@@ -0,0 +1,44 @@
+from flask import Blueprint, jsonify, request
+from mysql.connector import Error
+from classes.job import Job
+from utils.auth_helpers import current_role
+from utils.error_handler import handle_error
+
+job_bp = Blueprint("job", __name__, url_prefix="/api/jobs")
+
+
+@job_bp.get("")
+def list_jobs():
+    role = current_role()
+    if not role or role.title != "ADMIN":
+        return jsonify({"ok": False, "error": "Not authorized"}), 403
+
+    try:
+        limit = min(max(int(request.args.get("limit", 50)), 1), 200)
+    except ValueError:
+        limit = 50
+
+    try:
+        jobs = Job.list_recent(limit)
+        return jsonify({"ok": True, "data": [j.to_dict() for j in jobs]}), 200
+    except Error as e:
+        return handle_error(e, "Database error")
+
+
+@job_bp.get("/<int:id>")
+def get_job(id):
+    role = current_role()
+    if not role or role.title != "ADMIN":
+        return jsonify({"ok": False, "error": "Not authorized"}), 403
+
+    try:
+        job = Job.find_by_identifier(id)
+        if not job:
+            return jsonify({"ok": False, "error": "Job does not exist"}), 404
+        if job.is_stale():
+            # its worker is gone; don't leave the caller polling until the monitor notices
+            Job.fail_stale()
+            job = Job.find_by_identifier(id)
+        return jsonify({"ok": True, "data": job.to_dict()}), 200
+    except Error as e:
+        return handle_error(e, "Database error")
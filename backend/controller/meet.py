@@ -5,6 +5,7 @@ from mysql.connector import Error
 from datetime import datetime, timezone
 from classes.meet import Meet
 from classes.change_log import ChangeLog
+from classes.ytd_standings import YTDStandings
 from classes.user_role import UserRole
 from utils.auth_helpers import current_editor_id, current_role, require_scope
 from utils.error_handler import handle_error
@@ -111,7 +112,9 @@ def edit_meet():
         return jsonify({"ok": False, "error": ", ".join(validation_errors)}), 400
 
     try:
+        old_standings_scope = YTDStandings.meet_scope(meet_number)
         meet.update()
+        YTDStandings.refresh_meet(meet_number, old_standings_scope)
         Meet.sync_completed_status_for_group(
             existing.club_abbreviation,
             existing.meet_date,
@@ -263,9 +266,9 @@ def search_meets():
     except:
         page = 1
     sort= (request.args.get("sort") or "dateDesc").strip()
+    cursor = request.args.get("cursor") or None
     try:
-        rows = Meet.search(q, sort, page, limit)
-        count = len(Meet.search(q, limit=None))
+        rows, next_cursor = Meet.search_page(q, sort, page, limit, cursor)
 
         items = []
         for r in rows:
@@ -285,8 +288,22 @@ def search_meets():
                 "eventMeetCount": d.get("EventMeetCount"),
                 "publicNotes": d.get("PublicNotes"),
             })
-        return jsonify({"ok": True, "total": count, "items": items}), 200
+        body = {"ok": True, "items": items, "nextCursor": next_cursor}
+        # page-number requests still get a total; cursor clients use /search/count once
+        if not cursor:
+            body["total"] = Meet.search_count(q)
+        return jsonify(body), 200
+
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except Error as e:
+        return handle_error(e, "Database error")
 
+@meet_bp.get("/search/count")
+def count_meets():
+    q = (request.args.get("q") or "").strip()
+    try:
+        return jsonify({"ok": True, "total": Meet.search_count(q)}), 200
     except Error as e:
         return handle_error(e, "Database error")
 
@@ -7,9 +7,11 @@ from classes.dog_title import DogTitle
 from classes.user_role import UserRole
 from classes.race_result import RaceResult
 from classes.meet import Meet
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+from classes.ytd_standings import YTDStandings
 from utils.auth_helpers import current_editor_id, current_role, require_scope
 from utils.error_handler import handle_error
-from database import fetch_one, fetch_all, execute
+from database import fetch_one, fetch_all, execute, execute_many, transaction
 
 meet_result_bp = Blueprint("meet_result", __name__, url_prefix="/api/meet_result")
 
@@ -47,38 +49,6 @@ def _meet_stats(cwa_number: str) -> dict:
         (cwa_number,),
     ) or {}
 
-    hc_row = fetch_one(
-        """
-        SELECT COUNT(*) as hc_wins
-        FROM MeetResults mr
-        WHERE mr.CWANumber = %s
-          AND mr.MeetPlacement IS NOT NULL
-          AND mr.ConformationPlacement IS NOT NULL
-          AND mr.MeetPlacement + mr.ConformationPlacement = (
-              SELECT MIN(inner_mr.MeetPlacement + inner_mr.ConformationPlacement)
-              FROM MeetResults inner_mr
-              WHERE inner_mr.MeetNumber = mr.MeetNumber
-                AND inner_mr.MeetPlacement IS NOT NULL
-                AND inner_mr.ConformationPlacement IS NOT NULL
-          )
-          AND mr.MeetPlacement = (
-              SELECT MIN(inner_mr.MeetPlacement)
-              FROM MeetResults inner_mr
-              WHERE inner_mr.MeetNumber = mr.MeetNumber
-                AND inner_mr.MeetPlacement IS NOT NULL
-                AND inner_mr.ConformationPlacement IS NOT NULL
-                AND inner_mr.MeetPlacement + inner_mr.ConformationPlacement = (
-                    SELECT MIN(inner2.MeetPlacement + inner2.ConformationPlacement)
-                    FROM MeetResults inner2
-                    WHERE inner2.MeetNumber = mr.MeetNumber
-                      AND inner2.MeetPlacement IS NOT NULL
-                      AND inner2.ConformationPlacement IS NOT NULL
-                )
-          )
-        """,
-        (cwa_number,),
-    ) or {}
-
     return {
         "meet_points": float(row.get("meet_points") or 0),
         "arx_points": float(row.get("arx_points") or 0),
@@ -88,7 +58,7 @@ def _meet_stats(cwa_number: str) -> dict:
         "meet_wins": float(row.get("meet_wins") or 0),
         "meet_appearences": float(row.get("meet_appearences") or 0),
         "dpc_points": float(row.get("dpc_points") or 0),
-        "high_combined_wins": int(hc_row.get("hc_wins") or 0),
+        "high_combined_wins": MeetHighCombinedWinner.count_for_dog(cwa_number),
     }
 
 def _apply_meet_stats_delta(dog: Dog, old: dict, new: dict, editor_id: str, now: datetime):
@@ -272,61 +242,81 @@ def bulk_update_edit_result_view(meet_number):
         old_stats = {}
         for cwa in all_in_meet_set:
             old_stats[cwa] = _meet_stats(cwa)
+        old_standings_scope = YTDStandings.meet_scope(meet_number)
 
-        execute("DELETE FROM RaceResults WHERE MeetNumber = %s", (meet_number,))
-        execute("DELETE FROM MeetResults WHERE MeetNumber = %s", (meet_number,))
+        # Replace the meet's results atomically on one connection.
+        with transaction():
+            execute("DELETE FROM RaceResults WHERE MeetNumber = %s", (meet_number,))
+            execute("DELETE FROM MeetResults WHERE MeetNumber = %s", (meet_number,))
 
-        for entry in entries:
-            cwa_number = entry.get("cwaNumber")
-            if not cwa_number:
-                continue
+            race_rows = []
+            for entry in entries:
+                cwa_number = entry.get("cwaNumber")
+                if not cwa_number:
+                    continue
                 
-            shown = 1 if entry.get("shown") else 0
-            show_points = float(entry.get("showPoints") or 0)
-
-            show_placement = entry.get("showPlace") or "0"
-            if entry.get("showPlace") == "N/A":
-                show_placement = "0"
-
-            arx_earned = int(entry.get("ARXEarned") or 0)
-            narx_earned = int(entry.get("NARXEarned") or 0)
-            dpc_points = int(entry.get("dpcPoints") or 0)
-            dpc_leg = 1 if entry.get("dpcLeg") == "1" else 0
-            grade = entry.get("grade")
-            entry_type = entry.get("entryType")
-            average = float(entry.get("average") or 0)
-            hcWinner = bool(entry.get("hcWinner") or False)
-            aomEarned = float(entry.get("aomEarned") or 0)
-            meet_placement_str = str(entry.get("meetPlacement") or 0).strip()
-            meet_points_str = str(entry.get("meetPoints") or 0).strip()
-            races = entry.get("races") or []
-            for race in races:
-                program = race.get("program")
-                race_number = race.get("race")
-                box = race.get("box") or None
-                placement = race.get("placement")
-                incident = race.get("incident") or ""
+                shown = 1 if entry.get("shown") else 0
+                show_points = float(entry.get("showPoints") or 0)
+
+                show_placement = entry.get("showPlace") or "0"
+                if entry.get("showPlace") == "N/A":
+                    show_placement = "0"
+
+                arx_earned = int(entry.get("ARXEarned") or 0)
+                narx_earned = int(entry.get("NARXEarned") or 0)
+                dpc_points = int(entry.get("dpcPoints") or 0)
+                dpc_leg = 1 if entry.get("dpcLeg") == "1" else 0
+                grade = entry.get("grade")
+                entry_type = entry.get("entryType")
+                average = float(entry.get("average") or 0)
+                hcWinner = bool(entry.get("hcWinner") or False)
+                aomEarned = float(entry.get("aomEarned") or 0)
+                meet_placement_str = str(entry.get("meetPlacement") or 0).strip()
+                meet_points_str = str(entry.get("meetPoints") or 0).strip()
+                races = entry.get("races") or []
+                for race in races:
+                    program = race.get("program")
+                    race_number = race.get("race")
+                    box = race.get("box") or None
+                    placement = race.get("placement")
+                    incident = race.get("incident") or ""
                 
-                if not program or not race_number:
-                    continue
+                    if not program or not race_number:
+                        continue
 
-                placement_str = str(placement).strip() if placement else ""
+                    placement_str = str(placement).strip() if placement else ""
                 
+                    try:
+                        placement_num = int(placement_str) if placement_str.isdigit() else 0
+                    except (ValueError, TypeError):
+                        placement_num = 0
+                
+                    if placement_num > 0:
+                        rr = RaceResult("", "", "", "", "", placement_str, "", "", "", "", None, None)
+                        meet_points = rr.get_placement_points(placement_str)
+                    elif placement_str.upper() == "AOM":
+                        meet_points = 0.5
+                        placement_num = 0
+                    else:
+                        meet_points = 0
+
+                    race_rows.append(
+                        (meet_number, cwa_number, program, race_number, box,
+                         placement_num, meet_points, 0, 0, incident, editor_id, now)
+                    )
+
                 try:
-                    placement_num = int(placement_str) if placement_str.isdigit() else 0
+                    meet_points_val = float(meet_points_str) if meet_points_str and meet_points_str.isdigit() or meet_points_str.replace('.', '', 1).isdigit() else 0
                 except (ValueError, TypeError):
-                    placement_num = 0
-                
-                if placement_num > 0:
-                    rr = RaceResult("", "", "", "", "", placement_str, "", "", "", "", None, None)
-                    meet_points = rr.get_placement_points(placement_str)
-                elif placement_str.upper() == "AOM":
-                    meet_points = 0.5
-                    placement_num = 0
-                else:
-                    meet_points = 0
-
-                execute(
+                    meet_points_val = 0
+
+
+                new_result = MeetResult(meet_number, cwa_number, average, grade, int(meet_placement_str) if meet_placement_str and meet_placement_str.isdigit() else 0, 0, 0, meet_points_val, arx_earned, narx_earned, shown, show_placement, show_points, dpc_leg, 0, 1 if hcWinner else 0, aomEarned, dpc_points, entry_type, editor_id, now)
+                new_result.save()
+                #new_result.update_from_race_results()
+
+            if race_rows:
+                execute_many(
                     """
                     INSERT INTO RaceResults (
                         MeetNumber, CWANumber, Program, RaceNumber, Box,
@@ -335,19 +325,10 @@ def bulk_update_edit_result_view(meet_number):
                     )
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     """,
-                    (meet_number, cwa_number, program, race_number, box,
-                     placement_num, meet_points, 0, 0, incident, editor_id, now),
+                    race_rows,
                 )
 
-            try:
-                meet_points_val = float(meet_points_str) if meet_points_str and meet_points_str.isdigit() or meet_points_str.replace('.', '', 1).isdigit() else 0
-            except (ValueError, TypeError):
-                meet_points_val = 0
-
-
-            new_result = MeetResult(meet_number, cwa_number, average, grade, int(meet_placement_str) if meet_placement_str and meet_placement_str.isdigit() else 0, 0, 0, meet_points_val, arx_earned, narx_earned, shown, show_placement, show_points, dpc_leg, 0, 1 if hcWinner else 0, aomEarned, dpc_points, entry_type, editor_id, now)
-            new_result.save()
-            #new_result.update_from_race_results()
+            MeetHighCombinedWinner.refresh([meet_number])
         
         default_new = {
             "meet_points": 0, "arx_points": 0, "narx_points": 0,
@@ -370,6 +351,8 @@ def bulk_update_edit_result_view(meet_number):
                 _apply_meet_stats_delta(dog, old_stats[cwa], default_new, editor_id, now)
                 dog.update_from_meet_results()
 
+        YTDStandings.refresh_meet(meet_number, old_standings_scope)
+
         #RaceResult.calculate_dpc_leg_for_meet(meet_number)
         #RaceResult.calculate_hc_leg_for_meet(meet_number)
 
@@ -452,4 +435,4 @@ def get_race_entries(meet_number, program, race_number):
     except Error as e:
         return handle_error(e, "Database error")
     except Exception as e:
-        return handle_error(e, "Server error")
\ No newline at end of file
+        return handle_error(e, "Server error")
\ No newline at end of file
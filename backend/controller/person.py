@@ -4,8 +4,9 @@ from datetime import datetime, timezone
 from database import fetch_all, fetch_one
 from classes.person import Person
 from classes.change_log import ChangeLog
-from utils.auth_helpers import current_editor_id, current_role
+from utils.auth_helpers import current_editor_id, current_role, invalidate_identity
 from utils.error_handler import handle_error
+from utils import keyset
 
 person_bp = Blueprint("person", __name__, url_prefix="/api/person")
 
@@ -139,6 +140,7 @@ def edit_person():
 
     try:
         person.update()
+        invalidate_identity()
         refreshed = Person.find_by_id(record_id)
         after_snapshot = refreshed.to_dict() if refreshed else person.to_dict()
 
@@ -194,6 +196,7 @@ def delete_person():
 
     try:
         existing.delete()
+        invalidate_identity()
         ChangeLog.log(
             changed_table="Person",
             record_pk=existing.id,
@@ -256,6 +259,26 @@ def list_all_persons():
         return handle_error(e, "Database error")
 
 
+# keyset ordering for /search; ID is unique and breaks ties
+PERSON_SEARCH_ORDER = [("p.LastName", "ASC"), ("p.FirstName", "ASC"), ("p.ID", "ASC")]
+PERSON_SEARCH_LIMIT = 200
+
+
+def _person_search_filter(q):
+    """(WHERE condition, params) for a people search string."""
+    if not q:
+        return "1=1", []
+    like = f"%{q}%"
+    return """(
+            p.PersonID LIKE %s
+            OR CONCAT(p.FirstName, ' ', p.LastName) LIKE %s
+            OR p.FirstName LIKE %s
+            OR p.LastName LIKE %s
+            OR p.EmailAddress LIKE %s
+            OR p.SystemRole LIKE %s
+        )""", [like] * 6
+
+
 @person_bp.get("/search")
 def search_people():
     role = current_role()
@@ -266,8 +289,14 @@ def search_people():
         return jsonify({"ok": False, "error": "Not authorized to search people"}), 403
 
     q = (request.args.get("q") or "").strip()
+    try:
+        limit = min(max(int(request.args.get("limit", PERSON_SEARCH_LIMIT)), 1), PERSON_SEARCH_LIMIT)
+    except (TypeError, ValueError):
+        limit = PERSON_SEARCH_LIMIT
+    cursor = request.args.get("cursor") or None
+    where, params = _person_search_filter(q)
 
-    sql = """
+    sql = f"""
         SELECT
             p.ID,
             p.PersonID,
@@ -288,40 +317,49 @@ def search_people():
             p.Notes,
             p.PublicNotes,
             CONCAT(e.FirstName, ' ', e.LastName) AS LastEditedBy,
-            p.LastEditedAt
+            p.LastEditedAt,
+            {keyset.key_select(PERSON_SEARCH_ORDER)}
         FROM Person p
         LEFT JOIN Person e
             ON p.LastEditedBy = e.ID
-        WHERE 1=1
-    """
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        sql += """
-            AND (
-                p.PersonID LIKE %s
-                OR CONCAT(p.FirstName, ' ', p.LastName) LIKE %s
-                OR p.FirstName LIKE %s
-                OR p.LastName LIKE %s
-                OR p.EmailAddress LIKE %s
-                OR p.SystemRole LIKE %s
-            )
-        """
-        params.extend([like, like, like, like, like, like])
-
-    sql += """
-        ORDER BY p.LastName ASC, p.FirstName ASC, p.PersonID ASC
-        LIMIT 200
+        WHERE {where}
     """
 
     try:
-        rows = fetch_all(sql, params) or []
+        if cursor:
+            predicate, after_params = keyset.after(
+                PERSON_SEARCH_ORDER, keyset.decode_cursor(cursor, "name", PERSON_SEARCH_ORDER)
+            )
+            sql += f" AND {predicate}"
+            params += after_params
+        sql += f" {keyset.order_by(PERSON_SEARCH_ORDER)} LIMIT %s"
+        params.append(limit + 1)
+
+        rows, next_cursor = keyset.split_page(fetch_all(sql, params), limit, "name", PERSON_SEARCH_ORDER)
         people = []
         for row in rows:
             p = Person.from_db_row(row) if hasattr(Person, "from_db_row") else None
             people.append(p.to_dict() if p else row)
-        return jsonify({"ok": True, "data": people}), 200
+        return jsonify({"ok": True, "data": people, "nextCursor": next_cursor}), 200
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except Error as e:
+        return handle_error(e, "Database error")
+
+
+@person_bp.get("/search/count")
+def count_people():
+    role = current_role()
+    if not role:
+        return jsonify({"ok": False, "error": "Not signed in"}), 401
+
+    if role.title != "ADMIN":
+        return jsonify({"ok": False, "error": "Not authorized to search people"}), 403
+
+    where, params = _person_search_filter((request.args.get("q") or "").strip())
+    try:
+        row = fetch_one(f"SELECT COUNT(*) AS total FROM Person p WHERE {where}", params) or {}
+        return jsonify({"ok": True, "total": int(row.get("total") or 0)}), 200
     except Error as e:
         return handle_error(e, "Database error")
 
@@ -354,6 +392,7 @@ def update_profile():
         person = Person.find_by_id(current_id)
         person.public_notes = request.data.decode("utf-8")
         person.update()
+        invalidate_identity()
         return jsonify({"ok": True})
     except Error as e:
         print(e)
@@ -390,6 +429,7 @@ def reset_password():
         person.last_edited_by = current_editor_id()
         person.last_edited_at = datetime.now(timezone.utc)
         person.update()
+        invalidate_identity()
 
         refreshed = Person.find_by_identifier(person_id)
         after_snapshot = refreshed.to_dict() if refreshed else person.to_dict()
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from classes.stats import Stats
 from utils.error_handler import handle_error
 
@@ -8,6 +8,8 @@ stats_controller = Stats()
 
 @stats_bp.get('/standings/ytd/<stat_type>/<int:year>')
 def get_ytd_standings(stat_type, year):
+    if request.args.get('from') or request.args.get('to'):
+        return get_standings_for_range(stat_type)
     try:
         results = stats_controller.get_ytd_standings(stat_type, year)
         return jsonify({
@@ -20,14 +22,39 @@ def get_ytd_standings(stat_type, year):
     except Exception as e:
         return handle_error(e, "Server error")
 
+@stats_bp.get('/standings/<stat_type>')
+def get_standings_for_range(stat_type):
+    start = request.args.get('from')
+    end = request.args.get('to')
+    if not start or not end:
+        return jsonify({'success': False, 'error': "'from' and 'to' are required"}), 400
+    try:
+        results = stats_controller.get_standings_for_range(stat_type, start, end)
+        return jsonify({
+            'success': True,
+            'data': results,
+            'stat_type': stat_type,
+            'from': start,
+            'to': end,
+            'count': len(results)
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return handle_error(e, "Server error")
+
 @stats_bp.get('/<cwa_number>')
 @stats_bp.get('/<cwa_number>/year/<int:year>')
 def get_dog_info(cwa_number, year=None):
     try:
-        result = stats_controller.get_dog_info(cwa_number, year)
+        result = stats_controller.get_dog_info(
+            cwa_number, year, start=request.args.get('from'), end=request.args.get('to')
+        )
         if not result:
             return jsonify({'success': False, 'error': 'Dog not found'}), 404
         return jsonify({'success': True, 'data': result}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return handle_error(e, "Server error")
     
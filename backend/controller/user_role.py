@@ -2,7 +2,7 @@ from flask import Blueprint, jsonify, request
 from mysql.connector import Error
 from classes.user_role import UserRole
 from classes.change_log import ChangeLog
-from utils.auth_helpers import current_editor_id, current_role
+from utils.auth_helpers import current_editor_id, current_role, invalidate_identity
 from utils.error_handler import handle_error
 
 user_role_bp = Blueprint("user_role", __name__, url_prefix="/api/user_role")
@@ -114,6 +114,7 @@ def edit_user_role():
 
     try:
         user_role.update_by_id()
+        invalidate_identity()
         role_after = UserRole.find_by_id(role_id)
 
         ChangeLog.log(
@@ -159,6 +160,7 @@ def delete_user_role():
 
     try:
         target.delete_by_id()
+        invalidate_identity()
 
         ChangeLog.log(
             changed_table="UserRole",
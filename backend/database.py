@@ -1,12 +1,17 @@
+import itertools
 import os
 import time
 import mysql.connector
 import mysql.connector.pooling
-import traceback
 from contextlib import contextmanager
+from contextvars import ContextVar
+from utils.query_stats import QueryStats
 
 mysql_connector = None
 
+# Connection pinned by transaction(); get_conn() hands it out while it is set.
+_ambient = ContextVar("db_transaction", default=None)
+
 def get_connection_pool():
     global mysql_connector
     if mysql_connector is None:
@@ -27,65 +32,230 @@ def get_connection_pool():
 
 @contextmanager
 def get_conn():
+    tx = _ambient.get()
+    if tx is not None:
+        yield tx.conn
+        return
+
     conn = get_connection_pool().get_connection()
     try: 
         yield conn
     finally:
         conn.close()
 
-def fetch_all(sql: str, params=()):
-    start = time.time()
-    with get_conn() as conn:
-        cur = conn.cursor(dictionary=True)
+
+class Transaction:
+    """
+    Handle yielded by transaction(); runs statements on the pinned
+    connection, and raises once the transaction is over.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.finished = False
+        self._after_commit = []
+
+    def _live_conn(self):
+        if self.finished:
+            raise RuntimeError("Transaction is already committed or rolled back")
+        return self.conn
+
+    def after_commit(self, callback):
+        """Run callback() once the transaction has committed, outside it; dropped on rollback."""
+        self._after_commit.append(callback)
+
+    def fetch_all(self, sql: str, params=()):
+        return _fetch_all(self._live_conn(), sql, params)
+
+    def fetch_one(self, sql: str, params=()):
+        return _fetch_one(self._live_conn(), sql, params)
+
+    def execute(self, sql: str, params=(), *, return_lastrowid: bool = False):
+        return _execute(self._live_conn(), sql, params, return_lastrowid)
+
+    def execute_many(self, sql: str, param_list):
+        return _execute_many(self._live_conn(), sql, param_list)
+
+
+@contextmanager
+def transaction():
+    """
+    Unit of work: pins one pooled connection with autocommit off for the
+    block. fetch_all/fetch_one/execute/execute_many (and every model method
+    built on them) run on that connection until the block exits, then it
+    commits, or rolls back if the block raised. A nested transaction() joins
+    the outer one.
+    """
+    outer = _ambient.get()
+    if outer is not None:
+        yield outer
+        return
+
+    conn = get_connection_pool().get_connection()
+    conn.autocommit = False
+    tx = Transaction(conn)
+    token = _ambient.set(tx)
+    try:
+        yield tx
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        tx.finished = True
+        _ambient.reset(token)
         try:
-            cur.execute(sql, params)
-            result = cur.fetchall()
-            elapsed = time.time() - start
-            if elapsed > 1.0:
-                print(f"[SLOW QUERY] {elapsed:.2f}s")
-                traceback.print_stack()
-            return result
+            conn.autocommit = True
         finally:
-            cur.close()
+            conn.close()
+    for callback in tx._after_commit:
+        callback()
+
+
+def current_transaction():
+    """The Transaction the caller is running inside, or None."""
+    return _ambient.get()
+
+
+@contextmanager
+def outside_transaction():
+    """Run the block on fresh autocommit connections even inside a transaction()."""
+    token = _ambient.set(None)
+    try:
+        yield
+    finally:
+        _ambient.reset(token)
+
+def fetch_all(sql: str, params=()):
+    with get_conn() as conn:
+        return _fetch_all(conn, sql, params)
 
 def fetch_one(sql: str, params=()):
-    start = time.time()
     with get_conn() as conn:
-        cur = conn.cursor(dictionary=True)
-        try:
-            cur.execute(sql, params)
-            result = cur.fetchone()
-            elapsed = time.time() - start
-            if elapsed > 1.0:
-                print(f"[SLOW QUERY] {elapsed:.2f}s - {sql[:100]}")
-            return result
-        finally:
-            cur.close()
+        return _fetch_one(conn, sql, params)
 
 
 def execute(sql: str, params=(), *, return_lastrowid: bool = False):
-    start = time.time()
     with get_conn() as conn:
-        cur = conn.cursor()
-        try:
-            cur.execute(sql, params)
-            elapsed = time.time() - start
-            if elapsed > 1.0:
-                print(f"[SLOW QUERY] {elapsed:.2f}s - {sql[:100]}")
-
-            if return_lastrowid:
-                return cur.lastrowid
-
-            return cur.rowcount
-        finally:
-            cur.close()
+        return _execute(conn, sql, params, return_lastrowid)
 
 
 def execute_many(sql: str, param_list):
     with get_conn() as conn:
-        cur = conn.cursor()
+        return _execute_many(conn, sql, param_list)
+
+
+def _fetch_all(conn, sql, params):
+    start = time.perf_counter()
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(sql, params)
+        result = cur.fetchall()
+        QueryStats.record(sql, time.perf_counter() - start, len(result))
+        return result
+    finally:
+        cur.close()
+
+
+def _fetch_one(conn, sql, params):
+    start = time.perf_counter()
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(sql, params)
+        result = cur.fetchone()
+        QueryStats.record(sql, time.perf_counter() - start, 1 if result else 0)
+        return result
+    finally:
+        cur.close()
+
+
+def _execute(conn, sql, params, return_lastrowid):
+    start = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, params)
+        QueryStats.record(sql, time.perf_counter() - start, cur.rowcount)
+
+        if return_lastrowid:
+            return cur.lastrowid
+
+        return cur.rowcount
+    finally:
+        cur.close()
+
+
+def _execute_many(conn, sql, param_list):
+    start = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        cur.executemany(sql, param_list)
+        QueryStats.record(sql, time.perf_counter() - start, cur.rowcount)
+        return cur.rowcount
+    finally:
+        cur.close()
+
+
+def stream_rows(sql: str, params=(), *, batch_size: int = 1000):
+    """
+    Yield (column_names, rows) batches of up to batch_size tuples from an
+    unbuffered cursor, so large tables are never held in memory at once.
+    Uses its own pooled connection: the cursor keeps it busy until the
+    result set is exhausted, so it cannot share an ambient transaction.
+    """
+    start = time.perf_counter()
+    total = 0
+    conn = get_connection_pool().get_connection()
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(sql, params)
+        columns = cur.column_names
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            total += len(rows)
+            yield columns, rows
+        QueryStats.record(sql, time.perf_counter() - start, total)
+    finally:
         try:
-            cur.executemany(sql, param_list)
-            return cur.rowcount
-        finally:
+            if conn.unread_result:
+                conn.consume_results()
             cur.close()
+        finally:
+            conn.close()
+
+
+def upsert_sql(table: str, columns, key_columns):
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE for every non-key column. Used with
+    execute_many/cursor.executemany, which sends it as one multi-row INSERT.
+    """
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    updates = ", ".join(f"`{c}` = VALUES(`{c}`)" for c in columns if c not in key_columns)
+    return (
+        f"INSERT INTO `{table}` ({column_list}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+
+def insert_ignore_sql(table: str, columns):
+    """INSERT IGNORE counterpart of upsert_sql: rows whose unique key already exists are skipped."""
+    column_list = ", ".join(f"`{c}`" for c in columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    return f"INSERT IGNORE INTO `{table}` ({column_list}) VALUES ({placeholders})"
+
+
+def _in_clause(values):
+    """Placeholder list for an IN (...) clause over values."""
+    return ", ".join(["%s"] * len(values))
+
+
+def _chunks(items, size):
+    """Lists of up to size items from any iterable, so generators work too."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -1,6 +1,11 @@
-from flask import Flask
+from flask import Flask, g, request
+from classes.change_log import ChangeLog
+from classes.dog_search_index import DogSearchIndex
 from config import get_config
 from router import register_routes
+from utils.email_dispatcher import get_dispatcher
+from utils.job_runner import start_job_monitor
+from utils.query_stats import RequestQueries
 from utils.seed_user import seed_user
 import os
 
@@ -8,11 +13,75 @@ def create_app(config_name='development'):
     """Application factory pattern"""
     app = Flask(__name__)
     seed_user()
+    DogSearchIndex.ensure_built()
+    start_job_monitor()
+    # sends queued emails in the background; anything left from before a restart goes out now
+    get_dispatcher()
     app.config.from_object(get_config())
     register_routes(app)
+    register_change_log_buffer(app)
+    register_search_index_refresh(app)
+    register_query_budget(app)
     return app
 
 
+def register_change_log_buffer(app):
+    """
+    Buffer ChangeLog entries per request and write them in one INSERT once
+    the response is ready. Entries logged inside a transaction() only reach
+    the buffer if it commits.
+    """
+
+    @app.before_request
+    def _open_change_log_buffer():
+        g.change_log_token = ChangeLog.start_buffer()
+
+    @app.after_request
+    def _flush_change_log_buffer(response):
+        ChangeLog.flush()
+        return response
+
+    @app.teardown_request
+    def _close_change_log_buffer(exc):
+        if "change_log_token" not in g:
+            return
+        left = ChangeLog.end_buffer(g.pop("change_log_token"))
+        if left:
+            # the request failed before after_request; these entries are for writes that did commit
+            print(f"[CHANGE LOG] {request.method} {request.path} failed ({exc!r}), writing {left} entries for committed changes")
+
+
+def register_search_index_refresh(app):
+    """Re-index every dog a request touched once, when it ends (successful or not)."""
+
+    @app.before_request
+    def _defer_search_index():
+        g.search_index_token = DogSearchIndex.start_deferred()
+
+    @app.teardown_request
+    def _refresh_search_index(exc):
+        if "search_index_token" in g:
+            DogSearchIndex.end_deferred(g.pop("search_index_token"))
+
+
+def register_query_budget(app):
+    """Count each request's queries, report them as Server-Timing and warn when over budget."""
+
+    @app.before_request
+    def _start_query_counter():
+        RequestQueries.start()
+
+    @app.after_request
+    def _report_query_counter(response):
+        counter = RequestQueries.current()
+        if counter is None:
+            return response
+        response.headers.add("Server-Timing", counter.server_timing())
+        for warning in counter.warnings():
+            print(f"[QUERY BUDGET] {request.method} {request.path} - {warning}")
+        return response
+
+
 if __name__ == "__main__":
     app = create_app()
     app.run(host="0.0.0.0", port=8000, debug=os.env("FLASK_DEBUGGER") == "TRUE")
\ No newline at end of file
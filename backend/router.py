@@ -6,7 +6,9 @@ from controller.dog_owner import dog_owner_bp
 from controller.dog_title import dog_title_bp
 from controller.dog import dog_bp
 from controller.database import database_bp
+from controller.debug import debug_bp
 from controller.importer import import_bp
+from controller.job import job_bp
 from controller.meet import meet_bp
 from controller.meet_result import meet_result_bp
 from controller.person import person_bp
@@ -49,7 +51,9 @@ def register_routes(app):
     app.register_blueprint(dog_title_bp)
     app.register_blueprint(dog_bp)
     app.register_blueprint(database_bp)
+    app.register_blueprint(debug_bp)
     app.register_blueprint(import_bp)
+    app.register_blueprint(job_bp)
     app.register_blueprint(meet_bp)
     app.register_blueprint(meet_result_bp)
     app.register_blueprint(person_bp)
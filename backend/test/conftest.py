@@ -31,6 +31,9 @@ def app():
         os.environ["SEED_ADMIN_EMAIL"] = "test@test.com"
         os.environ["CF_TURNSTILE_SECRET_KEY"] = "hi"
         os.environ["SEED_ADMIN_PASSWORD"] = "password"
+        os.environ["EMAIL_TRANSPORT"] = "local"
+        # the email tests call dispatch_once themselves
+        os.environ["EMAIL_DISPATCHER"] = "FALSE"
         app = create_app()
         app.config.update({
             "TESTING": True,
@@ -1,10 +1,11 @@
+from database import execute, fetch_one, transaction
+import json
 from classes.change_log import ChangeLog
 import pytest
 import datetime
 @pytest.fixture
 def change_log_object():
-    for log in ChangeLog.list_all():
-        ChangeLog.delete(log.id)
+    execute("DELETE FROM ChangeLog")
 
     new_log = ChangeLog(None,"CHANGEDTABLE","PK", "EDIT", 1, datetime.datetime.now(),"SOURCE","TEST1","TEST2")
     new_log.save() 
@@ -52,4 +53,114 @@ def test_get_change_log(admin_session, change_log_object):
     assert response.json["data"]["changedBy"] == 1
     assert response.json["data"]["source"] == "SOURCE"
     assert response.json["data"]["beforeData"] == "TEST1"
-    assert response.json["data"]["afterData"] == "TEST2"
\ No newline at end of file
+    assert response.json["data"]["afterData"] == "TEST2"
+
+
+def test_buffered_change_log_flushes_on_exit(app):
+    def buffered_logs():
+        found = []
+        for i in range(3):
+            logs, _ = ChangeLog.search(record_pk=f"BUFFERED{i}")
+            found += logs
+        return found
+
+    with ChangeLog.buffered():
+        for i in range(3):
+            ChangeLog.log(
+                changed_table="CHANGEDTABLE",
+                record_pk=f"BUFFERED{i}",
+                operation="DELETE",
+                changed_by=None,
+                source="test",
+                before_obj={"i": i},
+            )
+        assert buffered_logs() == []
+
+    logs = buffered_logs()
+    assert len(logs) == 3
+    for log in logs:
+        ChangeLog.delete(log.id)
+
+
+def test_list_change_logs_filtered(admin_session, change_log_object):
+    response = admin_session.get("/api/change_log/get?table=CHANGEDTABLE&recordPk=PK&changedBy=1")
+    assert response.json["ok"]
+    assert [log["id"] for log in response.json["data"]] == [change_log_object.id]
+    assert response.json["nextCursor"] is None
+
+    response = admin_session.get("/api/change_log/get?table=NOTATABLE")
+    assert response.json["data"] == []
+
+
+def test_list_change_logs_bad_date(admin_session):
+    response = admin_session.get("/api/change_log/get?from=yesterday")
+    assert response.status_code == 400
+    assert not response.json["ok"]
+
+
+def test_archive_moves_old_change_logs(app):
+    old_log = ChangeLog(None, "CHANGEDTABLE", "ARCHIVED", "EDIT", 1, datetime.datetime(2000, 1, 1), "SOURCE", "TEST1", "TEST2")
+    old_log.save()
+    try:
+        assert ChangeLog.archive(datetime.date(2001, 1, 1)) >= 1
+        assert not fetch_one("SELECT ID FROM ChangeLog WHERE ID = %s", (old_log.id,))
+        assert ChangeLog.exists(old_log.id)
+        assert ChangeLog.find_by_identifier(old_log.id).record_pk == "ARCHIVED"
+
+        archived, _ = ChangeLog.search(record_pk="ARCHIVED", archived=True)
+        assert [log.id for log in archived] == [old_log.id]
+    finally:
+        execute("DELETE FROM ChangeLogArchive WHERE ID = %s", (old_log.id,))
+
+
+def test_change_log_stores_edit_as_delta(app):
+    before = {"cwaNumber": "1111", "name": "TESTINGTON", "grade": "D", "notes": "x" * 500}
+    after = {**before, "grade": "C"}
+    ChangeLog.log(
+        changed_table="CHANGEDTABLE",
+        record_pk="DELTA",
+        operation="EDIT",
+        changed_by=None,
+        source="test",
+        before_obj=before,
+        after_obj=after,
+    )
+    row = fetch_one("SELECT ID, BeforeData, AfterData FROM ChangeLog WHERE RecordPK = 'DELTA'")
+    try:
+        assert len(row["AfterData"]) < len(json.dumps(after))
+        log = ChangeLog.find_by_identifier(row["ID"])
+        assert json.loads(log.before_data) == before
+        assert json.loads(log.after_data) == after
+    finally:
+        ChangeLog.delete(row["ID"])
+
+
+def test_buffered_change_log_follows_transaction(app):
+    def log(record_pk):
+        ChangeLog.log(
+            changed_table="CHANGEDTABLE",
+            record_pk=record_pk,
+            operation="DELETE",
+            changed_by=None,
+            source="test",
+        )
+
+    with ChangeLog.buffered():
+        log("BEFORE_TX")
+        with pytest.raises(RuntimeError):
+            with transaction():
+                log("ROLLED_BACK")
+                ChangeLog.flush()
+                raise RuntimeError("rollback")
+        with transaction():
+            log("COMMITTED")
+
+    logs = []
+    for record_pk in ("BEFORE_TX", "ROLLED_BACK", "COMMITTED"):
+        found, _ = ChangeLog.search(record_pk=record_pk)
+        logs += found
+    try:
+        assert sorted(log.record_pk for log in logs) == ["BEFORE_TX", "COMMITTED"]
+    finally:
+        for entry in logs:
+            ChangeLog.delete(entry.id)
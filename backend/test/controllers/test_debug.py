@@ -0,0 +1,36 @@
+def test_queries_not_admin(all_privileges_session):
+    response = all_privileges_session.get("/api/debug/queries")
+    assert not response.json["ok"]
+    assert response.json["error"] == "Not authorized"
+    assert response.status_code == 403
+
+
+def test_queries_lists_fingerprints(admin_session):
+    admin_session.delete("/api/debug/queries")
+    admin_session.get("/api/dog/get/1")
+    admin_session.get("/api/dog/get/2")
+
+    response = admin_session.get("/api/debug/queries?sort=calls")
+    assert response.status_code == 200
+    assert response.json["ok"]
+    assert response.json["summary"]["calls"] > 0
+    fingerprints = [q["fingerprint"] for q in response.json["data"]]
+    assert all("%s" not in f for f in fingerprints)
+    assert len(fingerprints) == len(set(fingerprints))
+
+
+def test_queries_bad_sort(admin_session):
+    response = admin_session.get("/api/debug/queries?sort=rows")
+    assert response.status_code == 400
+
+
+def test_server_timing_header(admin_session):
+    response = admin_session.get("/api/dog/get/1")
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert "queries" in response.headers["Server-Timing"]
+
+
+def test_emails_not_admin(all_privileges_session):
+    response = all_privileges_session.get("/api/debug/emails")
+    assert not response.json["ok"]
+    assert response.status_code == 403
@@ -0,0 +1,57 @@
+from classes.dog_title import DogTitle
+import datetime
+'''
+=====================
+/api/dog/search
+=====================
+'''
+def test_search_dogs_by_name_prefix(client, dog_factory):
+    dog = dog_factory()
+    response = client.get("/api/dog/search?q=testing " + dog.cwa_number)
+    assert response.status_code == 200
+    assert response.json["ok"]
+    assert response.json["total"] == 1
+    assert response.json["items"][0]["id"] == dog.cwa_number
+    assert response.json["items"][0]["callName"] == "TEST"
+
+
+def test_search_dogs_by_title(client, dog_factory):
+    dog = dog_factory()
+    DogTitle(dog.cwa_number, "DPC", "1", datetime.date(2020, 1, 1), "", "").save()
+    response = client.get("/api/dog/search?q=dpc " + dog.cwa_number)
+    assert response.json["total"] == 1
+    assert response.json["items"][0]["title"] == "DPC"
+
+
+def test_search_dogs_no_match(client, dog_factory):
+    dog_factory()
+    response = client.get("/api/dog/search?q=zzzznotadog")
+    assert response.status_code == 200
+    assert response.json["total"] == 0
+    assert response.json["items"] == []
+
+
+def test_search_dogs_last_page_has_no_cursor(client, dog_factory):
+    dog = dog_factory()
+    response = client.get("/api/dog/search?sort=cwaAsc&q=" + dog.cwa_number)
+    assert response.json["total"] == 1
+    assert response.json["nextCursor"] is None
+
+
+def test_search_dogs_rejects_bad_cursor(client, dog_factory):
+    dog_factory()
+    response = client.get("/api/dog/search?sort=cwaAsc&cursor=notacursor")
+    assert response.status_code == 400
+    assert not response.json["ok"]
+
+
+'''
+=====================
+/api/dog/search/count
+=====================
+'''
+def test_count_dogs(client, dog_factory):
+    dog = dog_factory()
+    response = client.get("/api/dog/search/count?q=" + dog.cwa_number)
+    assert response.status_code == 200
+    assert response.json["total"] == 1
@@ -0,0 +1,51 @@
+from database import execute, fetch_one
+from classes.email_outbox import EmailOutbox
+from utils.email_dispatcher import EmailDispatcher
+from utils.email_service import send_titles_email
+from utils.email_transport import LocalTransport
+import time
+
+
+def _wait_until_sent(email_id, timeout=10):
+    dispatcher = EmailDispatcher(transport=LocalTransport())
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        row = fetch_one("SELECT Status FROM EmailOutbox WHERE ID = %s", (email_id,))
+        if row["Status"] == EmailOutbox.SENT:
+            return True
+        dispatcher.dispatch_once()
+        time.sleep(0.1)
+    return False
+
+
+def test_titles_email_is_queued_and_sent(app):
+    send_titles_email("owner@test.com", b"%PDF-1.4", "DOG_TITLE.pdf")
+    row = fetch_one("SELECT ID FROM EmailOutbox WHERE ToEmail = 'owner@test.com' ORDER BY ID DESC LIMIT 1")
+    try:
+        assert _wait_until_sent(row["ID"])
+        sent = [m for m in LocalTransport.sent if m["to"] == "owner@test.com"]
+        assert sent[-1]["attachments"][0]["filename"] == "DOG_TITLE.pdf"
+        assert fetch_one("SELECT Attachments FROM EmailOutbox WHERE ID = %s", (row["ID"],))["Attachments"] is None
+    finally:
+        execute("DELETE FROM EmailOutbox WHERE ID = %s", (row["ID"],))
+
+
+def test_failed_email_backs_off_then_gives_up(app):
+    email = EmailOutbox.enqueue("retry@test.com", "Subject", "<p>Body</p>")
+    try:
+        email.attempts = 1
+        email.mark_failed("provider down")
+        row = fetch_one(
+            "SELECT Status, LastError, NextAttemptAt > NOW() AS later FROM EmailOutbox WHERE ID = %s",
+            (email.id,),
+        )
+        assert row["Status"] == EmailOutbox.PENDING
+        assert row["LastError"] == "provider down"
+        assert row["later"]
+
+        email.attempts = EmailOutbox.MAX_ATTEMPTS
+        email.mark_failed("provider down")
+        row = fetch_one("SELECT Status FROM EmailOutbox WHERE ID = %s", (email.id,))
+        assert row["Status"] == EmailOutbox.FAILED
+    finally:
+        execute("DELETE FROM EmailOutbox WHERE ID = %s", (email.id,))
@@ -0,0 +1,63 @@
+from classes.job import Job
+from database import execute
+import pytest
+
+
+@pytest.fixture
+def job_object():
+    job = Job.create("TESTJOB")
+    job.update_progress(processed_rows=5, total_rows=10, message="halfway")
+    yield job
+
+
+def test_get_job_not_admin(all_privileges_session):
+    response = all_privileges_session.get("/api/jobs/0")
+    assert not response.json["ok"]
+    assert response.json["error"] == "Not authorized"
+    assert response.status_code == 403
+
+
+def test_get_job_invalid_id(admin_session):
+    response = admin_session.get("/api/jobs/999999")
+    assert not response.json["ok"]
+    assert response.json["error"] == "Job does not exist"
+    assert response.status_code == 404
+
+
+def test_get_job(admin_session, job_object):
+    response = admin_session.get("/api/jobs/" + str(job_object.id))
+    assert response.json["ok"]
+    assert response.json["data"]["id"] == job_object.id
+    assert response.json["data"]["jobType"] == "TESTJOB"
+    assert response.json["data"]["status"] == "QUEUED"
+    assert response.json["data"]["processedRows"] == 5
+    assert response.json["data"]["totalRows"] == 10
+    assert response.json["data"]["message"] == "halfway"
+
+
+def test_reload_all_stats_returns_job(admin_session):
+    response = admin_session.get("/api/dog/reload_all_stats")
+    assert response.status_code == 202
+    assert response.json["ok"]
+    assert response.json["jobId"]
+
+
+def test_fail_stale_jobs(app):
+    job = Job.create("TESTJOB")
+    job.mark_running()
+    assert Job.find_by_identifier(job.id).status == Job.RUNNING
+
+    execute("UPDATE Job SET UpdatedAt = UpdatedAt - INTERVAL 1 DAY WHERE ID = %s", (job.id,))
+    assert Job.fail_stale() >= 1
+    stale = Job.find_by_identifier(job.id)
+    assert stale.status == Job.FAILED
+    assert stale.error
+
+
+def test_get_stale_job_reports_failed(admin_session):
+    job = Job.create("TESTJOB")
+    job.mark_running()
+    execute("UPDATE Job SET UpdatedAt = UpdatedAt - INTERVAL 1 DAY WHERE ID = %s", (job.id,))
+    response = admin_session.get("/api/jobs/" + str(job.id))
+    assert response.json["ok"]
+    assert response.json["data"]["status"] == "FAILED"
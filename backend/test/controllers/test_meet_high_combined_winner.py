@@ -0,0 +1,20 @@
+from classes.meet_high_combined_winner import MeetHighCombinedWinner
+
+
+def test_winners_last_place_counts_every_racer():
+    results = [("A", 3, 1), ("B", 1, 4), ("C", 2, 3)]
+    results += [(str(n), n, None) for n in range(4, 11)]
+    found = MeetHighCombinedWinner.winners(results)
+    assert found[MeetHighCombinedWinner.ALL_PLACED] == ["A"]
+    assert found[MeetHighCombinedWinner.EXCLUDING_LAST] == ["A"]
+
+
+def test_winners_ties_go_to_better_meet_placement():
+    found = MeetHighCombinedWinner.winners([("A", 2, 2), ("B", 1, 3), ("C", 3, 4)])
+    assert found[MeetHighCombinedWinner.ALL_PLACED] == ["B"]
+    assert found[MeetHighCombinedWinner.EXCLUDING_LAST] == ["B"]
+
+
+def test_winners_without_placements():
+    found = MeetHighCombinedWinner.winners([("A", None, 1), ("B", 2, None)])
+    assert found == {MeetHighCombinedWinner.ALL_PLACED: [], MeetHighCombinedWinner.EXCLUDING_LAST: []}
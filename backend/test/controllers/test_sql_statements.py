@@ -0,0 +1,64 @@
+from utils.sql_statements import StatementSplitter, iter_statement_batches
+import pytest
+
+
+def split(data, size=None):
+    """Statements from data fed size bytes at a time (all at once when size is None)."""
+    splitter = StatementSplitter()
+    size = size or len(data) or 1
+    found = []
+    for i in range(0, len(data), size):
+        found += splitter.feed(data[i:i + size])
+    return found + splitter.close()
+
+
+CASES = [
+    (b"SELECT 1; SELECT 2;", ["SELECT 1", "SELECT 2"]),
+    (b"SELECT 1; SELECT 2", ["SELECT 1", "SELECT 2"]),
+    (b"SELECT 'a'", ["SELECT 'a'"]),
+    (b'SELECT "a"', ['SELECT "a"']),
+    (b"SELECT `a`", ["SELECT `a`"]),
+    (b"INSERT INTO t VALUES ('a;b');", ["INSERT INTO t VALUES ('a;b')"]),
+    (b"SELECT 'it''s; fine';", ["SELECT 'it''s; fine'"]),
+    (b'SELECT "say ""hi"";";', ['SELECT "say ""hi"";"']),
+    (b"SELECT 'a\\'; b';", ["SELECT 'a\\'; b'"]),
+    (b"SELECT 'a\\\\';SELECT 2;", ["SELECT 'a\\\\'", "SELECT 2"]),
+    (b"SELECT `a``;b`;", ["SELECT `a``;b`"]),
+    (b"SELECT '--not a comment';", ["SELECT '--not a comment'"]),
+    (b"SELECT 1; -- note; here\nSELECT 2;", ["SELECT 1", "SELECT 2"]),
+    (b"SELECT 1 --\tnote;\n;", ["SELECT 1"]),
+    (b"SELECT 2--1;", ["SELECT 2--1"]),
+    (b"SELECT 1; # note; here\nSELECT 2;", ["SELECT 1", "SELECT 2"]),
+    (b"SELECT /* a; b */ 1;", ["SELECT   1"]),
+    (b"SELECT 1/*x*/+2;", ["SELECT 1 +2"]),
+    (b"SELECT 4/2;", ["SELECT 4/2"]),
+    (b"/*!40101 SET NAMES utf8mb4 */;", ["/*!40101 SET NAMES utf8mb4 */"]),
+    (b"/*!40101 SET @a = ';' */;SELECT 1;", ["/*!40101 SET @a = ';' */", "SELECT 1"]),
+    (b"SELECT 1; -- trailing comment", ["SELECT 1"]),
+    (b"SELECT 1; /* trailing */", ["SELECT 1"]),
+    (b"SELECT '\xc3\xa9t\xc3\xa9';", ["SELECT 'été'"]),
+    (b";;  ;", []),
+]
+
+
+@pytest.mark.parametrize("data, expected", CASES)
+def test_splits_whole_input(data, expected):
+    assert split(data) == expected
+
+
+@pytest.mark.parametrize("data, expected", CASES)
+def test_splits_the_same_at_every_chunk_size(data, expected):
+    for size in range(1, len(data) + 1):
+        assert split(data, size) == expected, f"chunk size {size}"
+
+
+@pytest.mark.parametrize("data", [b"SELECT 'a", b"SELECT '''", b"SELECT 'a\\", b"SELECT \"a''", b"SELECT `a"])
+def test_unterminated_quote_raises(data):
+    for size in range(1, len(data) + 1):
+        with pytest.raises(ValueError):
+            split(data, size)
+
+
+def test_iter_statement_batches():
+    chunks = [b"SELECT 1; SEL", b"ECT 2", b"; SELECT 3"]
+    assert list(iter_statement_batches(chunks)) == [["SELECT 1"], ["SELECT 2"], ["SELECT 3"]]
@@ -1,20 +1,33 @@
-from flask import jsonify, session
+from flask import g, jsonify, session
 from classes.user_role import UserRole
 from classes.person import Person
 
 def current_user():
-    """Return session user dict, or empty dict if not signed in."""
+    """Return session user dict, or empty dict if not signed in.
+    The Person check runs once per request; later calls reuse it from flask.g."""
     user = session.get("user") or {}
     person_id = user.get("ID")  
+
+    cached = g.get("current_identity")
+    if cached is not None and cached[0] == person_id:
+        return cached[1]
+
     person = Person.find_by_id(person_id)
 
     if not person or person.locked:
         session.clear()
-        return {}
+        user = {}
 
+    g.current_identity = (person_id, user)
     return user
 
 
+def invalidate_identity():
+    """Forget this request's cached user and role, e.g. after editing a person."""
+    g.pop("current_identity", None)
+    g.pop("current_role", None)
+
+
 def current_editor_id():
     """Return the current user's internal Person table ID."""
     u = current_user()
@@ -35,7 +48,14 @@ def current_role():
     if not title:
         return None
 
-    return UserRole.find_by_title(title.strip().upper())
+    key = (pid, title.strip().upper())
+    cached = g.get("current_role")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    role = UserRole.find_by_title_cached(key[1])
+    g.current_role = (key, role)
+    return role
 
 
 def require_scope(scope_value, action):
@@ -0,0 +1,108 @@
+'''
+Docstring for change_log_codec
+
+Storage format for ChangeLog.BeforeData / AfterData. An edit used to store
+the whole object twice as JSON text; now BeforeData keeps the full snapshot
+and AfterData only the fields that changed, and either is zstd-compressed
+when that makes it smaller. Reads rebuild the same JSON text as before, so
+API responses do not change.
+
+A stored value is one of:
+  TAG_ZSTD + zstd frame      the frame holds one of the forms below
+  TAG_DELTA + JSON           {"set": {field: new value}, "unset": [field]}
+                             applied to BeforeData of the same row
+  anything else              UTF-8 JSON (or text) as written before this
+                             format existed
+Neither tag byte can start JSON text.
+'''
+
+import json
+import os
+from compression import zstd
+
+TAG_ZSTD = b"\x01"
+TAG_DELTA = b"\x02"
+
+COMPRESS_ENABLED = os.getenv("CHANGE_LOG_COMPRESS", "TRUE").upper() == "TRUE"
+# Smaller payloads rarely shrink once the frame header is added.
+COMPRESS_MIN_BYTES = 128
+COMPRESSION_LEVEL = 6
+
+
+def _dumps(obj):
+    if obj is None:
+        return None
+    try:
+        return json.dumps(obj, default=str, ensure_ascii=False)
+    except Exception:
+        return None
+
+
+def _pack(payload):
+    if COMPRESS_ENABLED and len(payload) >= COMPRESS_MIN_BYTES:
+        compressed = TAG_ZSTD + zstd.compress(payload, level=COMPRESSION_LEVEL)
+        if len(compressed) < len(payload):
+            return compressed
+    return payload
+
+
+def _delta(before, after):
+    """Field diff turning before into after, or None when after's key order can't be rebuilt from it."""
+    unset = [k for k in before if k not in after]
+    rebuilt_order = [k for k in before if k in after] + [k for k in after if k not in before]
+    if rebuilt_order != list(after):
+        return None
+    changed = {
+        k: v for k, v in after.items()
+        if k not in before or _dumps(before[k]) != _dumps(v)
+    }
+    return {"set": changed, "unset": unset}
+
+
+def encode(before_obj, after_obj):
+    """(BeforeData, AfterData) column values for one entry; either may be None."""
+    before_text = _dumps(before_obj)
+    after_text = _dumps(after_obj)
+
+    after_payload = None
+    if before_text is not None and after_text is not None:
+        before = json.loads(before_text)
+        after = json.loads(after_text)
+        if isinstance(before, dict) and isinstance(after, dict):
+            delta = _delta(before, after)
+            if delta is not None:
+                after_payload = TAG_DELTA + _dumps(delta).encode("utf-8")
+    if after_payload is None and after_text is not None:
+        after_payload = after_text.encode("utf-8")
+
+    return (
+        _pack(before_text.encode("utf-8")) if before_text is not None else None,
+        _pack(after_payload) if after_payload is not None else None,
+    )
+
+
+def _unpack(raw):
+    """(is_delta, text) for a stored value."""
+    if raw is None:
+        return False, None
+    if isinstance(raw, str):
+        return False, raw
+    raw = bytes(raw)
+    if raw[:1] == TAG_ZSTD:
+        raw = zstd.decompress(raw[1:])
+    if raw[:1] == TAG_DELTA:
+        return True, raw[1:].decode("utf-8")
+    return False, raw.decode("utf-8")
+
+
+def decode(before_raw, after_raw):
+    """(before JSON text, after JSON text) exactly as the old full-snapshot columns held them."""
+    _, before_text = _unpack(before_raw)
+    is_delta, after_text = _unpack(after_raw)
+    if is_delta:
+        delta = json.loads(after_text)
+        unset = set(delta.get("unset") or [])
+        after = {k: v for k, v in json.loads(before_text).items() if k not in unset}
+        after.update(delta.get("set") or {})
+        after_text = _dumps(after)
+    return before_text, after_text
@@ -0,0 +1,89 @@
+import atexit
+import os
+import queue
+import threading
+import traceback
+
+ASYNC_ENABLED = os.getenv("CHANGE_LOG_ASYNC", "FALSE").upper() == "TRUE"
+FLUSH_INTERVAL_SECONDS = float(os.getenv("CHANGE_LOG_FLUSH_INTERVAL", "1.0"))
+MAX_BATCH_ROWS = int(os.getenv("CHANGE_LOG_MAX_BATCH", "1000"))
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class ChangeLogWriter:
+    """
+    Background thread that takes flushed ChangeLog buffers off the request or
+    job thread and writes them in batches. Rows that arrive while a write is
+    in flight are merged into the next INSERT.
+    """
+
+    def __init__(self, interval=FLUSH_INTERVAL_SECONDS, max_batch=MAX_BATCH_ROWS):
+        self.interval = interval
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="change-log-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def submit(self, rows):
+        if self._stopped.is_set():
+            self._write(rows)
+            return
+        self._queue.put(rows)
+
+    def stop(self):
+        """Stop the thread and write anything still queued."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._thread.join(timeout=10)
+        self._drain()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                rows = self._queue.get(timeout=self.interval)
+            except queue.Empty:
+                continue
+            batch = list(rows)
+            while len(batch) < self.max_batch:
+                try:
+                    batch.extend(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.extend(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    @staticmethod
+    def _write(rows):
+        from classes.change_log import ChangeLog
+        try:
+            ChangeLog._write_rows(rows)
+        except Exception:
+            traceback.print_exc()
+
+
+def get_writer():
+    """The shared writer when CHANGE_LOG_ASYNC=TRUE, otherwise None (flush inline)."""
+    global _writer
+    if not ASYNC_ENABLED:
+        return None
+    with _writer_lock:
+        if _writer is None:
+            _writer = ChangeLogWriter().start()
+    return _writer
@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+
+
+def year_range(year):
+    """Half-open [Jan 1, Jan 1 of next year) for a calendar year."""
+    year = int(year)
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def season_range(start, end):
+    """
+    Half-open range for an inclusive season window given as dates or
+    YYYY-MM-DD strings. Raises ValueError on a bad or reversed window.
+    """
+    start = start if isinstance(start, date) else date.fromisoformat(str(start).strip())
+    end = end if isinstance(end, date) else date.fromisoformat(str(end).strip())
+    if end < start:
+        raise ValueError("'to' must not be before 'from'")
+    return start, end + timedelta(days=1)
+
+
+def resolve_range(year=None, start=None, end=None):
+    """
+    (start, end) half-open range from either a season window or a year,
+    or None when neither is given. A window needs both ends.
+    """
+    if start or end:
+        if not (start and end):
+            raise ValueError("Both 'from' and 'to' are required for a season window")
+        return season_range(start, end)
+    if year:
+        return year_range(year)
+    return None
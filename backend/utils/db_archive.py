@@ -0,0 +1,237 @@
+'''
+Docstring for db_archive
+
+Parallel dump archive. Every table is dumped on its own connection into its
+own zstd frame, and restore loads the frames in parallel, so a full backup
+or restore takes about as long as the largest table instead of the sum of
+all of them.
+
+Layout of an archive file:
+  MAGIC (8 bytes) | manifest length (4 bytes, big endian) | manifest JSON |
+  one zstd frame of INSERT statements per table, back to back
+
+The manifest lists each table's CREATE TABLE (with secondary indexes and
+foreign keys split out), the ALTER TABLE statements that add them back, and
+the offset/length of its frame relative to the end of the manifest. Restore
+creates bare tables, loads data with foreign key and unique checks off, then
+builds indexes and finally foreign keys.
+
+Tables are dumped on separate connections, so the archive is not a single
+point-in-time snapshot across tables; take it while the site is quiet.
+'''
+
+import json
+import os
+import re
+import shutil
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from compression import zstd
+from database import fetch_one, get_conn
+from utils.sql_dump import get_tables, table_inserts
+from utils.sql_statements import iter_statement_batches
+
+MAGIC = b"CWAARCH1"
+FORMAT_VERSION = 1
+
+ARCHIVE_WORKERS = int(os.getenv("ARCHIVE_WORKERS", "4"))
+COMPRESSION_LEVEL = 9
+READ_CHUNK_BYTES = 1024 * 1024
+
+_INDEX_LINE = re.compile(r"^(UNIQUE |FULLTEXT |SPATIAL )?KEY ")
+_AUTO_INCREMENT_COLUMN = re.compile(r"^`([^`]+)` .*\bAUTO_INCREMENT\b")
+
+
+def is_archive(path):
+    with open(path, "rb") as stream:
+        return stream.read(len(MAGIC)) == MAGIC
+
+
+def split_create_table(table_name, create_sql):
+    """
+    (bare CREATE TABLE, [index ALTERs], [foreign key ALTERs]) for one
+    SHOW CREATE TABLE result. The primary key stays in the CREATE, as does
+    any index over an AUTO_INCREMENT column (MySQL requires one to exist).
+    """
+    head, _, rest = create_sql.partition("(\n")
+    body, _, tail = rest.rpartition("\n)")
+    lines = [line.strip().rstrip(",") for line in body.split("\n") if line.strip()]
+
+    auto_increment = None
+    for line in lines:
+        m = _AUTO_INCREMENT_COLUMN.match(line)
+        if m:
+            auto_increment = f"`{m.group(1)}`"
+
+    kept, indexes, foreign_keys = [], [], []
+    for line in lines:
+        if line.startswith("CONSTRAINT "):
+            foreign_keys.append(line)
+        elif _INDEX_LINE.match(line) and not (auto_increment and auto_increment in line):
+            indexes.append(line)
+        else:
+            kept.append(line)
+
+    bare = head + "(\n  " + ",\n  ".join(kept) + "\n)" + tail
+    table = f"`{table_name}`"
+    index_sql = [f"ALTER TABLE {table} " + ", ".join(f"ADD {d}" for d in indexes)] if indexes else []
+    fk_sql = [f"ALTER TABLE {table} " + ", ".join(f"ADD {d}" for d in foreign_keys)] if foreign_keys else []
+    return bare, index_sql, fk_sql
+
+
+def _dump_table(table_name, directory):
+    """Write one table's INSERTs as a single zstd frame; returns its manifest entry."""
+    create_sql = fetch_one(f"SHOW CREATE TABLE `{table_name}`")["Create Table"]
+    create, indexes, foreign_keys = split_create_table(table_name, create_sql)
+
+    path = os.path.join(directory, f"{table_name}.zst")
+    compressor = zstd.ZstdCompressor(level=COMPRESSION_LEVEL)
+    with open(path, "wb") as out:
+        for statement in table_inserts(table_name):
+            out.write(compressor.compress(statement.encode("utf-8")))
+        out.write(compressor.flush())
+
+    return {
+        "name": table_name,
+        "create": create,
+        "indexes": indexes,
+        "foreignKeys": foreign_keys,
+        "path": path,
+        "length": os.path.getsize(path),
+    }
+
+
+def write_archive(out, workers=ARCHIVE_WORKERS, progress=None):
+    """
+    Dump every table in parallel and write the archive to the binary file
+    object out. Returns the manifest.
+    """
+    tables = get_tables()
+    directory = tempfile.mkdtemp(prefix="dump-")
+    try:
+        entries = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dump") as pool:
+            futures = [pool.submit(_dump_table, name, directory) for name in tables]
+            for done, future in enumerate(as_completed(futures), 1):
+                entry = future.result()
+                entries[entry["name"]] = entry
+                if progress:
+                    progress(done, len(tables), f"Dumped {entry['name']}")
+
+        offset = 0
+        manifest_tables = []
+        for name in tables:
+            entry = entries[name]
+            manifest_tables.append({
+                "name": name,
+                "create": entry["create"],
+                "indexes": entry["indexes"],
+                "foreignKeys": entry["foreignKeys"],
+                "offset": offset,
+                "length": entry["length"],
+            })
+            offset += entry["length"]
+
+        manifest = {
+            "version": FORMAT_VERSION,
+            "createdAt": datetime.now().isoformat(timespec="seconds"),
+            "tables": manifest_tables,
+        }
+        encoded = json.dumps(manifest).encode("utf-8")
+        out.write(MAGIC)
+        out.write(struct.pack(">I", len(encoded)))
+        out.write(encoded)
+        for name in tables:
+            with open(entries[name]["path"], "rb") as frame:
+                shutil.copyfileobj(frame, out, READ_CHUNK_BYTES)
+        return manifest
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def read_manifest(stream):
+    """(manifest, data_start) from an open archive file."""
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a database archive")
+    (length,) = struct.unpack(">I", stream.read(4))
+    manifest = json.loads(stream.read(length).decode("utf-8"))
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive version {manifest.get('version')}")
+    return manifest, len(MAGIC) + 4 + length
+
+
+def _frame_chunks(path, start, length):
+    decompressor = zstd.ZstdDecompressor()
+    with open(path, "rb") as stream:
+        stream.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = stream.read(min(READ_CHUNK_BYTES, remaining))
+            if not chunk:
+                raise ValueError("Archive is truncated")
+            remaining -= len(chunk)
+            yield decompressor.decompress(chunk)
+
+
+def _run_statements(statement_batches):
+    """Run statements on one connection with FK/unique checks off, committing at the end."""
+    with get_conn() as conn:
+        conn.autocommit = False
+        cur = conn.cursor()
+        try:
+            cur.execute("SET FOREIGN_KEY_CHECKS=0")
+            cur.execute("SET UNIQUE_CHECKS=0")
+            for statements in statement_batches:
+                for statement in statements:
+                    cur.execute(statement)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.autocommit = True
+
+
+def restore_archive(path, workers=ARCHIVE_WORKERS, progress=None):
+    """
+    Recreate every table in the archive: bare tables first, then data and
+    then indexes in parallel (one table per connection), then foreign keys.
+    """
+    with open(path, "rb") as stream:
+        manifest, data_start = read_manifest(stream)
+    tables = manifest["tables"]
+    total = sum(t["length"] for t in tables)
+
+    _run_statements([
+        [f"DROP TABLE IF EXISTS `{t['name']}`" for t in tables],
+        [t["create"] for t in tables],
+    ])
+
+    loaded = 0
+    if progress:
+        progress(0, total, "Loading tables")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="restore") as pool:
+        futures = {
+            pool.submit(
+                _run_statements,
+                iter_statement_batches(_frame_chunks(path, data_start + t["offset"], t["length"])),
+            ): t
+            for t in tables
+        }
+        for future in as_completed(futures):
+            future.result()
+            loaded += futures[future]["length"]
+            if progress:
+                progress(loaded, total, f"Loaded {futures[future]['name']}")
+
+        if progress:
+            progress(loaded, total, "Building indexes", force=True)
+        index_futures = [pool.submit(_run_statements, [t["indexes"]]) for t in tables if t["indexes"]]
+        for future in as_completed(index_futures):
+            future.result()
+
+    _run_statements([t["foreignKeys"] for t in tables if t["foreignKeys"]])
+    return {"bytes": os.path.getsize(path), "tables": len(tables)}
@@ -0,0 +1,94 @@
+import atexit
+import os
+import threading
+import time
+import traceback
+
+POLL_INTERVAL_SECONDS = float(os.getenv("EMAIL_POLL_INTERVAL", "5.0"))
+BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+PURGE_INTERVAL_SECONDS = 3600
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+class EmailDispatcher:
+    """
+    Background thread that sends EmailOutbox rows. It wakes up every
+    interval, or straight away when notify() is called after an enqueue,
+    and keeps claiming batches until nothing is due.
+    """
+
+    def __init__(self, transport=None, interval=POLL_INTERVAL_SECONDS, batch_size=BATCH_SIZE):
+        from utils.email_transport import get_transport
+        self.transport = transport or get_transport()
+        self.interval = interval
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._last_purge = 0.0
+        self._thread = threading.Thread(target=self._loop, name="email-dispatcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=10)
+
+    def dispatch_once(self):
+        """Send one claimed batch; returns how many emails were claimed."""
+        from classes.email_outbox import EmailOutbox
+
+        emails = EmailOutbox.claim_batch(self.batch_size)
+        if not emails:
+            return 0
+        try:
+            errors = self.transport.send([e.to_message() for e in emails])
+        except Exception as e:
+            errors = [e] * len(emails)
+        EmailOutbox.mark_sent([email.id for email, error in zip(emails, errors) if error is None])
+        for email, error in zip(emails, errors):
+            if error is not None:
+                print(f"Email {email.id} to {email.to_email} failed (attempt {email.attempts}): {error}")
+                email.mark_failed(error)
+        return len(emails)
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while not self._stopped.is_set() and self.dispatch_once() >= self.batch_size:
+                    pass
+                self._purge()
+            except Exception:
+                traceback.print_exc()
+
+    def _purge(self):
+        from classes.email_outbox import EmailOutbox
+
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        EmailOutbox.purge_sent()
+
+
+def get_dispatcher():
+    """The shared dispatcher, started on first use; None when EMAIL_DISPATCHER=FALSE."""
+    global _dispatcher
+    if os.getenv("EMAIL_DISPATCHER", "TRUE").upper() != "TRUE":
+        return None
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = EmailDispatcher().start()
+    return _dispatcher
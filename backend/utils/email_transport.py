@@ -0,0 +1,89 @@
+'''
+Docstring for email_transport
+
+Where queued emails actually go. EMAIL_TRANSPORT picks one:
+  resend   (default) the Resend API; emails without attachments go through
+           its batch endpoint, up to RESEND_BATCH_SIZE per call
+  local    nothing leaves the machine: messages are kept in LocalTransport.sent
+           and, with EMAIL_LOCAL_DIR set, written there as JSON files; for
+           development and tests
+A transport's send(messages) returns one error (or None on success) per
+message, in order.
+'''
+
+import json
+import os
+import threading
+import time
+import resend
+
+RESEND_BATCH_SIZE = 100
+# Per HTTP call; a claimed batch has EmailOutbox.CLAIM_SECONDS before another dispatcher may retake it.
+RESEND_TIMEOUT_SECONDS = int(os.getenv("RESEND_TIMEOUT_SECONDS", "10"))
+
+
+class ResendTransport:
+
+    def __init__(self, timeout=RESEND_TIMEOUT_SECONDS):
+        # the SDK's default client waits 30s per call
+        resend.default_http_client = resend.RequestsClient(timeout=timeout)
+
+    def send(self, messages):
+        resend.api_key = os.getenv("RESEND_API_KEY")
+        sender = os.getenv("FROM_EMAIL")
+        errors = [None] * len(messages)
+
+        plain = [i for i, m in enumerate(messages) if not m.get("attachments")]
+        # the batch endpoint takes no attachments, so those go one by one
+        with_attachments = [i for i, m in enumerate(messages) if m.get("attachments")]
+
+        for start in range(0, len(plain), RESEND_BATCH_SIZE):
+            chunk = plain[start:start + RESEND_BATCH_SIZE]
+            try:
+                resend.Batch.send([self._params(sender, messages[i]) for i in chunk])
+            except Exception as e:
+                for i in chunk:
+                    errors[i] = e
+        for i in with_attachments:
+            try:
+                resend.Emails.send(self._params(sender, messages[i]))
+            except Exception as e:
+                errors[i] = e
+        return errors
+
+    @staticmethod
+    def _params(sender, message):
+        params = {
+            "from": sender,
+            "to": message["to"],
+            "subject": message["subject"],
+            "html": message["html"],
+        }
+        if message.get("attachments"):
+            params["attachments"] = message["attachments"]
+        return params
+
+
+class LocalTransport:
+    sent = []
+    _lock = threading.Lock()
+
+    def __init__(self, directory=None):
+        self.directory = directory if directory is not None else os.getenv("EMAIL_LOCAL_DIR")
+
+    def send(self, messages):
+        with self._lock:
+            self.sent.extend(messages)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            for i, message in enumerate(messages):
+                path = os.path.join(self.directory, f"{time.time_ns()}-{i}.json")
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(message, f, ensure_ascii=False, indent=2)
+        return [None] * len(messages)
+
+
+def get_transport():
+    if os.getenv("EMAIL_TRANSPORT", "resend").lower() == "local":
+        return LocalTransport()
+    return ResendTransport()
@@ -1,31 +1,47 @@
+import functools
+import hashlib
+import os
+import tempfile
+import threading
 from io import BytesIO
 
 from reportlab.pdfgen import canvas
 from pypdf import PdfReader, PdfWriter
 from reportlab.lib.colors import HexColor
 
+TEMPLATE_PATH = os.getenv("CERTIFICATE_TEMPLATE", "certificate_template.pdf")
+# Rendered certificates are kept here when set; unset means no disk cache.
+CACHE_DIR = os.getenv("CERTIFICATE_CACHE_DIR")
 
-def generate_title_pdf(dog, title):
+# PdfReader reads its stream lazily, so the shared template is used by one thread at a time.
+_template_lock = threading.Lock()
+
+
+@functools.cache
+def _template():
+    """(template page, width, height, content hash), parsed once per process."""
+    with open(TEMPLATE_PATH, "rb") as f:
+        data = f.read()
+    page = PdfReader(BytesIO(data)).pages[0]
+    return (
+        page,
+        float(page.mediabox.width),
+        float(page.mediabox.height),
+        hashlib.sha256(data).hexdigest(),
+    )
+
+
+def _title_display(title, descriptions):
     from classes.title_type import TitleType
-    
-    template_pdf = PdfReader("certificate_template.pdf")
-    template_page = template_pdf.pages[0]
 
-    width = float(template_page.mediabox.width)
-    height = float(template_page.mediabox.height)
+    if title not in descriptions:
+        title_info = TitleType.find_by_identifier(title)
+        descriptions[title] = title_info.title_description if title_info else None
+    description = descriptions[title]
+    return f"{description} ({title})" if description else title
 
-    overlay_buffer = BytesIO()
-    c = canvas.Canvas(overlay_buffer, pagesize=(width, height))
-    
-    #db_titles = DogTitle.list_for_dog(dog.cwa_number)
-    #other_titles = [t.title for t in db_titles if t.title != title]
-    #title_str = " ".join(other_titles) if other_titles else ""
-    
-    title_info = TitleType.find_by_identifier(title)
-    title_display = f"{title_info.title_description} ({title})" if title_info and title_info.title_description else title
-    
-    display_name = f"{dog.registered_name}".strip()
-    
+
+def _draw_overlay(c, width, height, display_name, title_display):
     text_width = c.stringWidth(display_name, "Helvetica-Bold", 20)
     c.setFont("Helvetica-Bold", 20)
     c.setFillColor(HexColor("#2c455e"))
@@ -37,27 +53,92 @@ def generate_title_pdf(dog, title):
         x,
         y + 38,
         x + text_width,
-       y + 38 
+       y + 38
     )
-    
+
     title_text_width = c.stringWidth(title_display, "Helvetica", 16)
     c.setFont("Helvetica", 16)
     c.setFillColor(HexColor("#2c455e"))
     c.drawString((width - title_text_width) / 2, y - 40, title_display)
     c.showPage()
-    c.save()    
-    overlay_buffer.seek(0)
 
-    overlay_pdf = PdfReader(overlay_buffer)
-    overlay_page = overlay_pdf.pages[0]
 
-    template_page.merge_page(overlay_page)
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.pdf") if CACHE_DIR else None
+
+
+def _read_cached(key):
+    path = _cache_path(key)
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
 
-    output_buffer = BytesIO()
 
-    writer = PdfWriter()
-    writer.add_page(template_page)
+def _write_cached(key, pdf_bytes):
+    path = _cache_path(key)
+    if not path:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Certificate cache write failed: {e}")
 
-    writer.write(output_buffer)
-    output_buffer.seek(0)
-    return output_buffer.read()
\ No newline at end of file
+
+def render_title_certificates(awards):
+    """
+    Certificate PDF bytes for each (dog, title) in awards, in order. Every
+    overlay is drawn on one reportlab canvas and parsed once, and each
+    certificate is cut from that against the cached template. With
+    CERTIFICATE_CACHE_DIR set, certificates are reused from disk, keyed by
+    dog, title, registered name, title description and template.
+    """
+    awards = list(awards)
+    template_page, width, height, template_hash = _template()
+    descriptions = {}
+
+    keys = []
+    texts = []
+    for dog, title in awards:
+        display_name = f"{dog.registered_name}".strip()
+        title_display = _title_display(title, descriptions)
+        key_source = "\x1f".join([dog.cwa_number or "", title, display_name, title_display, template_hash])
+        keys.append(hashlib.sha256(key_source.encode("utf-8")).hexdigest())
+        texts.append((display_name, title_display))
+
+    results = [_read_cached(key) for key in keys]
+    missing = [i for i, pdf in enumerate(results) if pdf is None]
+    if not missing:
+        return results
+
+    overlay_buffer = BytesIO()
+    c = canvas.Canvas(overlay_buffer, pagesize=(width, height))
+    for i in missing:
+        _draw_overlay(c, width, height, *texts[i])
+    c.save()
+    overlay_buffer.seek(0)
+    overlay_pages = PdfReader(overlay_buffer).pages
+
+    for overlay_page, i in zip(overlay_pages, missing):
+        writer = PdfWriter()
+        with _template_lock:
+            # add_page copies the template page into the writer, so the shared one stays clean
+            page = writer.add_page(template_page)
+        page.merge_page(overlay_page)
+
+        output_buffer = BytesIO()
+        writer.write(output_buffer)
+        results[i] = output_buffer.getvalue()
+        _write_cached(keys[i], results[i])
+    return results
+
+
+def generate_title_pdf(dog, title):
+    return render_title_certificates([(dog, title)])[0]
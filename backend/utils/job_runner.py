@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from classes.change_log import ChangeLog
+from classes.dog_search_index import DogSearchIndex
+from classes.job import Job
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("JOB_PROGRESS_INTERVAL", "1.0"))
+HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+
+_executor = None
+_active_ids = set()
+_active_lock = threading.Lock()
+_heartbeat_thread = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+    return _executor
+
+
+class JobProgress:
+    """
+    Callable handed to job targets. Writes to the Job row are throttled so a
+    tight import loop does not turn into one UPDATE per row.
+    """
+
+    def __init__(self, job, interval=PROGRESS_INTERVAL_SECONDS):
+        self.job = job
+        self.interval = interval
+        self._last_write = 0.0
+
+    def __call__(self, processed=None, total=None, message=None, force=False):
+        if processed is not None:
+            self.job.processed_rows = int(processed)
+        if total is not None:
+            self.job.total_rows = int(total)
+        if message is not None:
+            self.job.message = str(message)[:255]
+
+        now = time.monotonic()
+        if not force and now - self._last_write < self.interval:
+            return
+        self._last_write = now
+        self.job.update_progress()
+
+
+def _heartbeat_loop():
+    while True:
+        time.sleep(HEARTBEAT_SECONDS)
+        with _active_lock:
+            ids = sorted(_active_ids)
+        try:
+            Job.heartbeat(ids)
+        except Exception:
+            traceback.print_exc()
+        # a worker that died after this one started leaves its jobs behind; catch them here
+        fail_stale_jobs()
+
+
+def start_job_monitor():
+    """
+    Fail jobs already stale, then start the heartbeat thread, which keeps
+    this worker's jobs fresh and fails other workers' stale ones on every
+    tick. Called at startup.
+    """
+    global _heartbeat_thread
+    fail_stale_jobs()
+    with _active_lock:
+        if _heartbeat_thread is None:
+            _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="job-heartbeat", daemon=True)
+            _heartbeat_thread.start()
+
+
+def _track(job_id):
+    """Keep job_id's heartbeat going until _untrack."""
+    with _active_lock:
+        _active_ids.add(job_id)
+
+
+def _untrack(job_id):
+    with _active_lock:
+        _active_ids.discard(job_id)
+
+
+def fail_stale_jobs():
+    """Fail jobs left QUEUED or RUNNING by a worker that is gone."""
+    try:
+        count = Job.fail_stale()
+        if count:
+            print(f"Marked {count} interrupted job(s) as failed")
+    except Exception:
+        traceback.print_exc()
+
+
+def _run(app, job, target, args, kwargs, cleanup):
+    with app.app_context():
+        progress = JobProgress(job)
+        try:
+            job.mark_running()
+            with ChangeLog.buffered(), DogSearchIndex.deferred():
+                result = target(*args, progress=progress, **kwargs)
+            job.mark_succeeded(result)
+        except Exception as e:
+            traceback.print_exc()
+            try:
+                job.mark_failed(e)
+            except Exception:
+                traceback.print_exc()
+        finally:
+            _untrack(job.id)
+            if cleanup:
+                try:
+                    cleanup()
+                except Exception:
+                    traceback.print_exc()
+
+
+def submit_job(job_type, target, *args, created_by=None, cleanup=None, **kwargs):
+    """
+    Create a Job row and run target(*args, progress=..., **kwargs) on the
+    worker pool. The target's return value is stored as the job result.
+    cleanup, if given, always runs after the target finishes.
+    """
+    job = Job.create(job_type, created_by=created_by)
+    _track(job.id)
+    app = current_app._get_current_object()
+    get_executor().submit(_run, app, job, target, args, kwargs, cleanup)
+    return job
@@ -0,0 +1,77 @@
+'''
+Docstring for keyset
+
+Keyset (cursor) pagination for the search endpoints. A page is fetched with
+"rows after the last row of the previous page" in the active sort order
+instead of OFFSET, so page 500 costs the same as page 1 when an index
+matches the sort.
+
+An ordering is a list of (column expression, "ASC" | "DESC") pairs whose
+last column is unique, so every row has a distinct position. The cursor
+handed to clients is an opaque url-safe token holding the sort name and the
+last row's values for those columns. Sort columns must be NOT NULL.
+'''
+
+import base64
+import binascii
+import json
+
+KEY_PREFIX = "_k"
+
+
+def order_by(columns):
+    return "ORDER BY " + ", ".join(f"{expr} {direction}" for expr, direction in columns)
+
+
+def key_select(columns):
+    """Select list exposing the sort values as _k0, _k1, ... for building the next cursor."""
+    return ", ".join(f"{expr} AS {KEY_PREFIX}{i}" for i, (expr, _) in enumerate(columns))
+
+
+def after(columns, values):
+    """
+    (predicate, params) matching rows strictly after values in the given
+    ordering, expanded as (a > x) OR (a = x AND b > y) OR ... so mixed
+    directions work.
+    """
+    clauses = []
+    params = []
+    for i, (expr, direction) in enumerate(columns):
+        op = "<" if direction == "DESC" else ">"
+        parts = [f"{columns[j][0]} = %s" for j in range(i)] + [f"{expr} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params += list(values[:i + 1])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def encode_cursor(sort, values):
+    raw = json.dumps({"s": sort, "k": list(values)}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort, columns):
+    """Key values from a cursor; ValueError if it is malformed or was made for another sort."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(data, dict) or data.get("s") != sort:
+        raise ValueError("Cursor does not match the requested sort")
+    values = data.get("k")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def split_page(rows, limit, sort, columns):
+    """
+    Trim rows fetched with LIMIT limit + 1 back to limit; returns
+    (rows, next cursor or None when this is the last page).
+    """
+    rows = list(rows or [])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort, [last[f"{KEY_PREFIX}{i}"] for i in range(len(columns))])
@@ -0,0 +1,186 @@
+'''
+Docstring for query_stats
+
+In-process query profile. database.py reports every statement here with its
+duration and row count; statements are grouped by a normalized fingerprint
+(literals, placeholders and IN/VALUES lists collapsed) so the same query
+issued once per dog or per meet shows up as one entry with a high count.
+Numbers are per worker process and reset on restart or via reset().
+
+RequestQueries counts the same statements for the current Flask request
+only, for the Server-Timing header and the per-request budget warnings.
+'''
+
+import os
+import re
+import threading
+import traceback
+
+from flask import g, has_request_context, request
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "1.0"))
+
+# Per-request warnings: more statements than QUERY_BUDGET, or one fingerprint
+# issued more than QUERY_REPEAT_LIMIT times. 0 turns a check off.
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "100"))
+QUERY_REPEAT_LIMIT = int(os.getenv("QUERY_REPEAT_LIMIT", "20"))
+
+# Upper bounds (ms) of the duration histogram buckets; the last one is open.
+BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+# Distinct fingerprints kept before new ones are folded into one entry.
+MAX_FINGERPRINTS = 2000
+OVERFLOW_FINGERPRINT = "<other>"
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER = re.compile(r"(?<![\w`])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Normalized form of a statement: values become ?, value lists (...)."""
+    text = _STRING.sub("?", sql)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(...)", text)
+    text = _ROWS.sub(r"\1", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def _endpoint():
+    if not has_request_context():
+        return "<background>"
+    return request.endpoint or request.path
+
+
+class _Entry:
+
+    __slots__ = ("calls", "total", "max", "rows", "buckets", "endpoints")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.endpoints = {}
+
+    def add(self, elapsed, rows, endpoint):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.rows += rows or 0
+        ms = elapsed * 1000
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.endpoints[endpoint] = self.endpoints.get(endpoint, 0) + 1
+
+    def to_dict(self, sql):
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        top_endpoints = sorted(self.endpoints.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        return {
+            "fingerprint": sql,
+            "calls": self.calls,
+            "totalMs": round(self.total * 1000, 2),
+            "avgMs": round(self.total * 1000 / self.calls, 2) if self.calls else 0,
+            "maxMs": round(self.max * 1000, 2),
+            "rows": self.rows,
+            "histogram": dict(zip(labels, self.buckets)),
+            "endpoints": [{"endpoint": e, "calls": c} for e, c in top_endpoints],
+        }
+
+
+class QueryStats:
+
+    _lock = threading.Lock()
+    _entries = {}
+
+    @classmethod
+    def record(cls, sql, elapsed, rows=None):
+        """Add one executed statement to the profile; logs it if slow."""
+        key = fingerprint(sql)
+        endpoint = _endpoint()
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                if len(cls._entries) >= MAX_FINGERPRINTS:
+                    key = OVERFLOW_FINGERPRINT
+                    entry = cls._entries.get(key)
+                if entry is None:
+                    entry = cls._entries[key] = _Entry()
+            entry.add(elapsed, rows, endpoint)
+
+        if has_request_context():
+            counter = g.get("request_queries")
+            if counter is not None:
+                counter.add(key, elapsed)
+
+        if elapsed > SLOW_QUERY_SECONDS:
+            print(f"[SLOW QUERY] {elapsed:.2f}s {endpoint} - {key[:200]}")
+            traceback.print_stack(limit=8)
+
+    @classmethod
+    def top(cls, sort="total", limit=50):
+        """Entries ordered by total time ("total"), call count ("calls") or worst case ("max")."""
+        field = {"total": "total", "calls": "calls", "max": "max"}.get(sort, "total")
+        with cls._lock:
+            ranked = sorted(cls._entries.items(), key=lambda kv: getattr(kv[1], field), reverse=True)
+            return [entry.to_dict(sql) for sql, entry in ranked[:limit]]
+
+    @classmethod
+    def summary(cls):
+        with cls._lock:
+            return {
+                "fingerprints": len(cls._entries),
+                "calls": sum(e.calls for e in cls._entries.values()),
+                "totalMs": round(sum(e.total for e in cls._entries.values()) * 1000, 2),
+            }
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+
+class RequestQueries:
+    """Statements issued while handling one request; lives on flask.g."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.by_fingerprint = {}
+
+    @classmethod
+    def start(cls):
+        g.request_queries = cls()
+
+    @classmethod
+    def current(cls):
+        return g.get("request_queries")
+
+    def add(self, key, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.by_fingerprint[key] = self.by_fingerprint.get(key, 0) + 1
+
+    def server_timing(self):
+        return f'db;dur={self.total * 1000:.1f};desc="{self.count} queries"'
+
+    def warnings(self, budget=None, repeat_limit=None):
+        """Budget problems for this request, as log lines; empty if within budget."""
+        budget = QUERY_BUDGET if budget is None else budget
+        repeat_limit = QUERY_REPEAT_LIMIT if repeat_limit is None else repeat_limit
+        found = []
+        if budget and self.count > budget:
+            found.append(f"{self.count} queries ({self.total * 1000:.1f}ms), budget is {budget}")
+        if repeat_limit:
+            for key, calls in sorted(self.by_fingerprint.items(), key=lambda kv: kv[1], reverse=True):
+                if calls <= repeat_limit:
+                    break
+                found.append(f"repeated {calls}x: {key[:200]}")
+        return found
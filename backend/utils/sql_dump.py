@@ -0,0 +1,60 @@
+'''
+Docstring for sql_dump
+
+Building blocks shared by the plain SQL dump and the parallel archive:
+which tables are dumped, value quoting, and streaming a table's rows as
+extended INSERT statements.
+'''
+
+import os
+from database import fetch_all, stream_rows
+
+# Tables describing the running instance rather than club data; never dumped
+# (restoring a queued email would send it again).
+TRANSIENT_TABLES = {"Job", "EmailOutbox"}
+
+# Dump batching: rows pulled per round trip, and the size each extended
+# INSERT is kept under (well below MySQL's default max_allowed_packet).
+DUMP_FETCH_ROWS = 1000
+INSERT_MAX_BYTES = 1024 * 1024
+
+
+def escape(val):
+    if val is None:
+        return "NULL"
+    if isinstance(val, (int, float)):
+        return str(val)
+    if isinstance(val, (bytes, bytearray)):
+        return "X'" + bytes(val).hex() + "'" if val else "''"
+    return "'" + str(val).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def get_tables():
+    db_name = os.getenv("DB_NAME", "cwa_db")
+    key = f"Tables_in_{db_name}"
+    tables = fetch_all("SHOW TABLES")
+    return [row[key] for row in tables if row[key] not in TRANSIENT_TABLES]
+
+
+def table_inserts(table_name, max_bytes=INSERT_MAX_BYTES):
+    """
+    Stream a table's rows as extended INSERT statements of at most roughly
+    max_bytes each (a single oversized row still gets its own statement).
+    """
+    prefix = None
+    values = []
+    size = 0
+    for columns, rows in stream_rows(f"SELECT * FROM `{table_name}`", batch_size=DUMP_FETCH_ROWS):
+        if prefix is None:
+            column_list = ", ".join(f"`{col}`" for col in columns)
+            prefix = f"INSERT INTO `{table_name}` ({column_list}) VALUES\n"
+        for row in rows:
+            tuple_sql = "(" + ", ".join(escape(val) for val in row) + ")"
+            if values and size + len(tuple_sql) > max_bytes:
+                yield prefix + ",\n".join(values) + ";\n"
+                values = []
+                size = 0
+            values.append(tuple_sql)
+            size += len(tuple_sql) + 2
+    if values:
+        yield prefix + ",\n".join(values) + ";\n"
@@ -0,0 +1,158 @@
+'''
+Docstring for sql_statements
+
+Incremental splitter for SQL dump files. Works on raw bytes so multi-byte
+UTF-8 characters split across read chunks are only decoded once a whole
+statement is known, and keeps only the unfinished statement in memory.
+
+A ';' ends a statement only outside quotes and comments. Quoted strings
+honour backslash escapes and doubled quotes; backtick identifiers honour
+doubled backticks. "-- " and "#" line comments and /* */ block comments
+are dropped; /*! ... */ version comments are executable, so they are kept.
+'''
+
+import re
+
+# Everything in unquoted text that can change state. A lone trailing '-' or
+# '/' may start a comment once the next chunk arrives.
+_NORMAL = re.compile(rb"[;'\"`#]|--|/\*|[-/]\Z")
+_QUOTE_END = {
+    ord("'"): re.compile(rb"[\\']"),
+    ord('"'): re.compile(rb'[\\"]'),
+    ord("`"): re.compile(rb"`"),
+}
+_WHITESPACE = b" \t\r\n"
+
+_LINE_COMMENT = "line"
+_BLOCK_COMMENT = "block"
+_VERSION_COMMENT = "version"
+
+
+class StatementSplitter:
+    """feed() byte chunks in, get complete statements (str, without ';') back."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._stmt = bytearray()
+        self._state = None
+
+    def feed(self, chunk):
+        buf = self._buf
+        buf += chunk
+        found = []
+        i = seg = 0
+        size = len(buf)
+
+        while i < size:
+            state = self._state
+
+            if state is None:
+                m = _NORMAL.search(buf, i)
+                if not m:
+                    i = size
+                    break
+                j, end = m.start(), m.end()
+                tok = buf[j]
+                if tok == 0x3B:  # ;
+                    self._stmt += buf[seg:j]
+                    self._emit(found)
+                    i = seg = end
+                elif tok in _QUOTE_END:
+                    self._state = tok
+                    i = end
+                elif tok == 0x23:  # #
+                    self._stmt += buf[seg:j]
+                    self._state = _LINE_COMMENT
+                    i = end
+                elif end == size:
+                    # '-', '/', '--' or '/*' at the end: need the next byte.
+                    i = j
+                    break
+                elif tok == 0x2D:  # -
+                    if buf[end] in _WHITESPACE:
+                        self._stmt += buf[seg:j]
+                        self._state = _LINE_COMMENT
+                    i = end
+                elif buf[end] == 0x21:  # /*!
+                    self._state = _VERSION_COMMENT
+                    i = end
+                else:
+                    self._stmt += buf[seg:j] + b" "
+                    self._state = _BLOCK_COMMENT
+                    i = end
+
+            elif state == _LINE_COMMENT:
+                k = buf.find(b"\n", i)
+                if k < 0:
+                    i = seg = size
+                    break
+                self._state = None
+                i = seg = k
+
+            elif state in (_BLOCK_COMMENT, _VERSION_COMMENT):
+                k = buf.find(b"*/", i)
+                if k < 0:
+                    # Keep a trailing '*' in case '/' starts the next chunk.
+                    i = max(i, size - 1)
+                    if state == _BLOCK_COMMENT:
+                        seg = i
+                    break
+                self._state = None
+                i = k + 2
+                if state == _BLOCK_COMMENT:
+                    seg = i
+
+            else:
+                m = _QUOTE_END[state].search(buf, i)
+                if not m:
+                    i = size
+                    break
+                end = m.end()
+                if end == size:
+                    # Escape or possible doubled quote at the end: need the next byte.
+                    i = m.start()
+                    break
+                if buf[m.start()] == 0x5C:  # backslash escapes the next byte
+                    i = end + 1
+                elif buf[end] == state:
+                    i = end + 1
+                else:
+                    self._state = None
+                    i = end
+
+        if self._state not in (_LINE_COMMENT, _BLOCK_COMMENT):
+            self._stmt += buf[seg:i]
+        del buf[:i]
+        return found
+
+    def close(self):
+        """Statements left once input ends (a final one need not end in ';')."""
+        # feed() holds back a closing quote to check for a doubled one; at
+        # the end of input there is nothing to double it, so it closes.
+        if self._state in _QUOTE_END and self._buf != bytes([self._state]):
+            raise ValueError("SQL input ends inside a quoted value")
+        found = []
+        if self._state not in (_LINE_COMMENT, _BLOCK_COMMENT):
+            self._stmt += self._buf
+        self._buf = bytearray()
+        self._state = None
+        self._emit(found)
+        return found
+
+    def _emit(self, found):
+        statement = self._stmt.decode("utf-8").strip()
+        self._stmt = bytearray()
+        if statement:
+            found.append(statement)
+
+
+def iter_statement_batches(chunks):
+    """Yield lists of complete statements, one list per input chunk that finished any."""
+    splitter = StatementSplitter()
+    for chunk in chunks:
+        batch = splitter.feed(chunk)
+        if batch:
+            yield batch
+    batch = splitter.close()
+    if batch:
+        yield batch
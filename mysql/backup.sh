@@ -1,23 +1,19 @@
 TIMESTAMP=$(date +"%Y-%m-%d_%H-%M-%S")
 BACKUP_DIR="/backups"
 BACKUP_THRESHOLD=$((10 * 1024 * 1024 * 1024)) # 10 GB
-BACKUP_FILE="$BACKUP_DIR/cwa_db_$TIMESTAMP.sql.zst"
+BASE_WEEKDAY=7 # Sunday: full base dump, other nights: increments on top of it
 
 echo "Starting backup at $TIMESTAMP"
 
-mysqldump \
-  -h 127.0.0.1 \
-  -u root \
-  -p${MYSQL_ROOT_PASSWORD} \
-  $MYSQL_DATABASE | zstd -10 > "$BACKUP_FILE"
+if [ "$(date +%u)" -eq "$BASE_WEEKDAY" ] || [ "$1" = "base" ]; then
+  python3 /incremental_backup.py base
+else
+  python3 /incremental_backup.py incremental
+fi
 
 if [ $? -eq 0 ]; then
-  echo "Backup completed successfully: $BACKUP_FILE"
-  while [ "$(du -sb "$BACKUP_DIR" | awk '{print $1}')" -gt "$BACKUP_THRESHOLD" ]; do
-      OLDEST_FILE=$(find "$BACKUP_DIR" -type f -printf '%T+ %p\n' | sort | head -n 1 | awk '{print $2}')
-      echo "Backup Size Exceeded, Removing $OLDEST_FILE"
-      rm -f "$OLDEST_FILE"
-  done
+  # whole chains only: an increment without its base cannot be restored
+  BACKUP_DIR="$BACKUP_DIR" python3 /incremental_backup.py prune "$BACKUP_THRESHOLD"
 else
   echo "Backup failed"
   exit 1
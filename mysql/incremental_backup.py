@@ -0,0 +1,428 @@
+'''
+Incremental backups for the club database.
+
+A chain is one full base dump plus nightly increments that only hold what
+changed since the previous checkpoint:
+  - tables with a primary key and a LastEditedAt column: rows edited since
+    the last checkpoint (REPLACE INTO), plus the table's current primary
+    keys so rows deleted in the meantime are removed on restore
+  - ChangeLog and ChangeLogArchive (append-only): rows with a higher ID
+    (ArchiveID) than at the last checkpoint, and rows older than the current
+    minimum are dropped
+  - everything else (small or derived tables, and Dog, whose stat columns
+    are rewritten in bulk without touching LastEditedAt): dumped in full
+Each checkpoint overlaps the previous one by CHECKPOINT_OVERLAP_MINUTES so a
+transaction still in flight at backup time is picked up next time; replaying
+a row twice is harmless.
+
+Usage (from backup.sh):
+  incremental_backup.py base                  full mysqldump, starts a new chain
+  incremental_backup.py incremental           increment on the newest chain
+  incremental_backup.py restore [CHAIN] [--until FILE]
+                                              replay a chain (default newest)
+  incremental_backup.py prune MAX_BYTES       delete whole chains, oldest
+                                              first, until BACKUP_DIR fits
+
+Chains are described by cwa_db_<timestamp>.chain.json next to the dumps.
+Take a new base after applying a schema migration: increments only carry
+rows, so a table the base does not have cannot be replayed.
+This script requires the env variables MYSQL_ROOT_PASSWORD and MYSQL_DATABASE.
+'''
+import argparse
+import glob
+import io
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+import mysql.connector
+
+BACKUP_DIR = os.getenv("BACKUP_DIR", "/backups")
+DB_HOST = os.getenv("MYSQL_HOST", "127.0.0.1")
+ZSTD_LEVEL = "-10"
+CHECKPOINT_OVERLAP_MINUTES = 60
+
+# Never backed up incrementally: describes the running instance, not club data.
+SKIP_TABLES = {"Job", "EmailOutbox"}
+# Tracked by LastEditedAt elsewhere, but bulk stat updates bypass it here.
+FULL_TABLES = {"Dog"}
+# Append-only by an ever-growing ID. Archiving moves rows from ChangeLog to
+# ChangeLogArchive, which the MIN(ID) trim and ArchiveID append pick up.
+APPEND_TABLES = {"ChangeLog": "ID", "ChangeLogArchive": "ArchiveID"}
+# IDs are handed out before commit, so re-read a few below the last mark.
+APPEND_OVERLAP_ROWS = 1000
+
+INSERT_MAX_BYTES = 1024 * 1024
+FETCH_ROWS = 1000
+
+
+def get_connection():
+    return mysql.connector.connect(
+        host=DB_HOST,
+        user="root",
+        password=os.environ["MYSQL_ROOT_PASSWORD"],
+        database=os.environ["MYSQL_DATABASE"],
+        autocommit=True,
+    )
+
+
+def escape(val):
+    if val is None:
+        return "NULL"
+    if isinstance(val, bool):
+        return "1" if val else "0"
+    if isinstance(val, (int, float, Decimal)):
+        return str(val)
+    if isinstance(val, (bytes, bytearray)):
+        return "X'" + bytes(val).hex() + "'" if val else "''"
+    if isinstance(val, set):
+        val = ",".join(sorted(val))
+    return "'" + str(val).replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def quote(name):
+    return f"`{name}`"
+
+
+def table_layout(cursor, db_name):
+    """{table: (primary key columns, column names)} for every base table."""
+    cursor.execute(
+        """
+        SELECT c.TABLE_NAME, c.COLUMN_NAME, k.ORDINAL_POSITION AS pk_position
+        FROM information_schema.COLUMNS c
+        JOIN information_schema.TABLES t
+          ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+        LEFT JOIN information_schema.KEY_COLUMN_USAGE k
+          ON k.TABLE_SCHEMA = c.TABLE_SCHEMA AND k.TABLE_NAME = c.TABLE_NAME
+         AND k.COLUMN_NAME = c.COLUMN_NAME AND k.CONSTRAINT_NAME = 'PRIMARY'
+        WHERE c.TABLE_SCHEMA = %s AND t.TABLE_TYPE = 'BASE TABLE'
+        ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+        """,
+        (db_name,),
+    )
+    layout = {}
+    for row in cursor.fetchall():
+        keys, columns = layout.setdefault(row["TABLE_NAME"], ([], []))
+        columns.append(row["COLUMN_NAME"])
+        if row["pk_position"]:
+            keys.append((row["pk_position"], row["COLUMN_NAME"]))
+    return {t: ([c for _, c in sorted(keys)], columns) for t, (keys, columns) in layout.items()}
+
+
+def checkpoint(cursor):
+    cursor.execute("SELECT NOW() AS now")
+    now = cursor.fetchone()["now"]
+    marks = {}
+    for table, column in APPEND_TABLES.items():
+        cursor.execute("SHOW TABLES LIKE %s", (table,))
+        if not cursor.fetchall():
+            continue
+        cursor.execute(f"SELECT COALESCE(MAX({quote(column)}), 0) AS mark FROM {quote(table)}")
+        marks[table] = int(cursor.fetchone()["mark"])
+    return {"at": now.isoformat(sep=" "), "marks": marks}
+
+
+def value_rows(conn, sql, params=()):
+    """Yield each row of a query as a "(v1, v2, ...)" SQL tuple, streaming."""
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            for row in rows:
+                yield "(" + ", ".join(escape(v) for v in row) + ")"
+    finally:
+        cur.close()
+
+
+def write_batched(out, prefix, tuples):
+    """Write tuples as statements prefix + "(..),(..);" of bounded size. Returns the row count."""
+    batch, size, count = [], 0, 0
+    for t in tuples:
+        if batch and size + len(t) > INSERT_MAX_BYTES:
+            out.write(prefix + ",\n".join(batch) + ";\n")
+            batch, size = [], 0
+        batch.append(t)
+        size += len(t) + 2
+        count += 1
+    if batch:
+        out.write(prefix + ",\n".join(batch) + ";\n")
+    return count
+
+
+def write_increment(conn, out, since, previous_marks):
+    """Write the SQL for everything changed since the previous checkpoint. Returns {table: rows}."""
+    db_name = os.environ["MYSQL_DATABASE"]
+    cursor = conn.cursor(dictionary=True)
+    layout = table_layout(cursor, db_name)
+    cursor.close()
+
+    out.write("SET FOREIGN_KEY_CHECKS=0;\nSET UNIQUE_CHECKS=0;\n\n")
+    written = {}
+    for table, (keys, columns) in sorted(layout.items()):
+        if table in SKIP_TABLES:
+            continue
+        column_list = ", ".join(quote(c) for c in columns)
+        select = f"SELECT {column_list} FROM {quote(table)}"
+        replace = f"REPLACE INTO {quote(table)} ({column_list}) VALUES\n"
+        out.write(f"-- {table}\n")
+
+        if table in APPEND_TABLES:
+            mark_column = quote(APPEND_TABLES[table])
+            mark = max(previous_marks.get(table, 0) - APPEND_OVERLAP_ROWS, 0)
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(f"SELECT MIN({mark_column}) AS low FROM {quote(table)}")
+            low = cursor.fetchone()["low"]
+            cursor.close()
+            if low is None:
+                out.write(f"DELETE FROM {quote(table)};\n")
+            else:
+                out.write(f"DELETE FROM {quote(table)} WHERE {mark_column} < {int(low)};\n")
+            written[table] = write_batched(
+                out, replace, value_rows(conn, f"{select} WHERE {mark_column} > %s", (mark,))
+            )
+
+        elif keys and "LastEditedAt" in columns and table not in FULL_TABLES:
+            written[table] = write_batched(
+                out, replace, value_rows(conn, f"{select} WHERE `LastEditedAt` >= %s", (since,))
+            )
+            keep = quote(f"_keep_{table}")
+            key_list = ", ".join(quote(k) for k in keys)
+            join = " AND ".join(f"k.{quote(k)} = t.{quote(k)}" for k in keys)
+            out.write(f"DROP TEMPORARY TABLE IF EXISTS {keep};\n")
+            out.write(f"CREATE TEMPORARY TABLE {keep} AS SELECT {key_list} FROM {quote(table)} LIMIT 0;\n")
+            out.write(f"ALTER TABLE {keep} ADD PRIMARY KEY ({key_list});\n")
+            write_batched(
+                out,
+                f"INSERT INTO {keep} ({key_list}) VALUES\n",
+                value_rows(conn, f"SELECT {key_list} FROM {quote(table)}"),
+            )
+            out.write(
+                f"DELETE t FROM {quote(table)} t LEFT JOIN {keep} k ON {join} "
+                f"WHERE k.{quote(keys[0])} IS NULL;\n"
+            )
+            out.write(f"DROP TEMPORARY TABLE {keep};\n")
+
+        else:
+            out.write(f"DELETE FROM {quote(table)};\n")
+            written[table] = write_batched(out, replace, value_rows(conn, select))
+
+        out.write("\n")
+
+    out.write("SET UNIQUE_CHECKS=1;\nSET FOREIGN_KEY_CHECKS=1;\n")
+    return written
+
+
+def compressed_writer(path):
+    """(process, text stream) for `zstd > path`; closing the stream ends the input."""
+    with open(path, "wb") as out:
+        proc = subprocess.Popen(["zstd", ZSTD_LEVEL, "-q", "-c"], stdin=subprocess.PIPE, stdout=out)
+    return proc, io.TextIOWrapper(proc.stdin, encoding="utf-8")
+
+
+def chain_files():
+    return sorted(glob.glob(os.path.join(BACKUP_DIR, "cwa_db_*.chain.json")))
+
+
+def load_chain(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_chain(path, chain):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(chain, f, indent=2)
+    os.replace(tmp, path)
+
+
+def chain_members(path):
+    """Every file a chain needs: its json, base dump and increments."""
+    chain = load_chain(path)
+    directory = os.path.dirname(path)
+    return [path, os.path.join(directory, chain["base"])] + [
+        os.path.join(directory, increment["file"]) for increment in chain["increments"]
+    ]
+
+
+def backup_size():
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(BACKUP_DIR)
+        for name in names
+    )
+
+
+def prune(max_bytes):
+    """
+    Free space by deleting the oldest chains as a whole, since an increment
+    is useless without the base and increments before it. Files no chain
+    refers to (dumps from before chains existed) go first. The newest chain
+    is never deleted.
+    """
+    chains = chain_files()
+    referenced = {os.path.abspath(f) for path in chains for f in chain_members(path)}
+    orphans = sorted(
+        (f for f in glob.glob(os.path.join(BACKUP_DIR, "*"))
+         if os.path.isfile(f) and os.path.abspath(f) not in referenced),
+        key=os.path.getmtime,
+    )
+    for path in orphans:
+        if backup_size() <= max_bytes:
+            return
+        print(f"Backup Size Exceeded, Removing {path}")
+        os.remove(path)
+
+    while len(chains) > 1 and backup_size() > max_bytes:
+        oldest = chains.pop(0)
+        print(f"Backup Size Exceeded, Removing chain {oldest}")
+        # the json goes first, so an interrupted prune never leaves a listed chain without its files
+        for path in chain_members(oldest):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    if backup_size() > max_bytes:
+        print("Backup Size Exceeded, but only the newest chain is left")
+
+
+def take_base():
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    base_file = os.path.join(BACKUP_DIR, f"cwa_db_{timestamp}.sql.zst")
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # Taken before the dump starts: anything changed during it is replayed next time.
+        mark = checkpoint(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+    with open(base_file, "wb") as out:
+        dump = subprocess.Popen(
+            ["mysqldump", "-h", DB_HOST, "-u", "root", f"-p{os.environ['MYSQL_ROOT_PASSWORD']}",
+             "--single-transaction", os.environ["MYSQL_DATABASE"]],
+            stdout=subprocess.PIPE,
+        )
+        compress = subprocess.Popen(["zstd", ZSTD_LEVEL, "-q", "-c"], stdin=dump.stdout, stdout=out)
+        dump.stdout.close()
+        if compress.wait() != 0 or dump.wait() != 0:
+            os.remove(base_file)
+            raise RuntimeError("mysqldump failed")
+
+    chain = {"base": os.path.basename(base_file), "checkpoint": mark, "increments": []}
+    save_chain(os.path.join(BACKUP_DIR, f"cwa_db_{timestamp}.chain.json"), chain)
+    print(f"Base backup completed successfully: {base_file}")
+
+
+def take_increment():
+    chains = chain_files()
+    if not chains:
+        print("No base backup yet, taking one")
+        take_base()
+        return
+
+    chain_path = chains[-1]
+    chain = load_chain(chain_path)
+    previous = chain["increments"][-1]["checkpoint"] if chain["increments"] else chain["checkpoint"]
+    since = datetime.fromisoformat(previous["at"]) - timedelta(minutes=CHECKPOINT_OVERLAP_MINUTES)
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    inc_file = os.path.join(BACKUP_DIR, f"cwa_db_{timestamp}.inc.sql.zst")
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        mark = checkpoint(cursor)
+        cursor.close()
+
+        proc, text = compressed_writer(inc_file)
+        try:
+            written = write_increment(conn, text, since, previous["marks"])
+        finally:
+            text.close()
+        if proc.wait() != 0:
+            os.remove(inc_file)
+            raise RuntimeError("zstd failed")
+    finally:
+        conn.close()
+
+    chain["increments"].append({
+        "file": os.path.basename(inc_file),
+        "checkpoint": mark,
+        "rows": written,
+    })
+    save_chain(chain_path, chain)
+    print(f"Incremental backup completed successfully: {inc_file} ({sum(written.values())} rows)")
+
+
+def replay(path):
+    """Pipe one zstd-compressed SQL file into the mysql client."""
+    print(f"Replaying {path}")
+    unzip = subprocess.Popen(["zstd", "-d", "-q", "-c", path], stdout=subprocess.PIPE)
+    client = subprocess.Popen(
+        ["mysql", "-h", DB_HOST, "-u", "root", f"-p{os.environ['MYSQL_ROOT_PASSWORD']}",
+         os.environ["MYSQL_DATABASE"]],
+        stdin=unzip.stdout,
+    )
+    unzip.stdout.close()
+    if client.wait() != 0 or unzip.wait() != 0:
+        raise RuntimeError(f"Replaying {path} failed")
+
+
+def restore(chain_path=None, until=None):
+    chain_path = chain_path or (chain_files() or [None])[-1]
+    if not chain_path:
+        raise RuntimeError(f"No backup chain found in {BACKUP_DIR}")
+    chain = load_chain(chain_path)
+    directory = os.path.dirname(os.path.abspath(chain_path))
+
+    replay(os.path.join(directory, chain["base"]))
+    for increment in chain["increments"]:
+        replay(os.path.join(directory, increment["file"]))
+        if until and increment["file"] == os.path.basename(until):
+            break
+    print("Restore completed successfully")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental database backups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("base", help="take a full dump and start a new chain")
+    sub.add_parser("incremental", help="back up changes since the newest checkpoint")
+    restore_parser = sub.add_parser("restore", help="replay a chain into the database")
+    restore_parser.add_argument("chain", nargs="?", help="chain .json file (default: newest)")
+    restore_parser.add_argument("--until", help="stop after this increment file")
+    prune_parser = sub.add_parser("prune", help="delete the oldest chains until the backups fit")
+    prune_parser.add_argument("max_bytes", type=int)
+    args = parser.parse_args()
+
+    if args.command == "prune":
+        prune(args.max_bytes)
+        return
+
+    for name in ("MYSQL_ROOT_PASSWORD", "MYSQL_DATABASE"):
+        if not os.getenv(name):
+            print(f"ERROR: Missing {name} environment variable")
+            sys.exit(1)
+
+    try:
+        if args.command == "base":
+            take_base()
+        elif args.command == "incremental":
+            take_increment()
+        else:
+            restore(args.chain, args.until)
+    except Exception as e:
+        print(f"Backup failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
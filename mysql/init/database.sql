@@ -175,10 +175,27 @@ CREATE TABLE `ChangeLog` (
     `ChangedBy` INT,
     `ChangedAt` TIMESTAMP NOT NULL,
     `Source` VARCHAR(32),
-    `BeforeData` TEXT,
-    `AfterData` TEXT
+    `BeforeData` BLOB,
+    `AfterData` BLOB
 );
 
+-- ChangeLog entries older than CHANGE_LOG_RETENTION_MONTHS, moved here by
+-- ChangeLog.archive(). ID is the original ChangeLog ID; ArchiveID only grows,
+-- so incremental backups can append new archive rows by it.
+CREATE TABLE `ChangeLogArchive` (
+    `ArchiveID` BIGINT PRIMARY KEY AUTO_INCREMENT,
+    `ID` INT NOT NULL UNIQUE,
+    `ChangedTable` VARCHAR(50) NOT NULL,
+    `RecordPK` VARCHAR(300) NOT NULL,
+    `Operation` VARCHAR(10) NOT NULL,
+    `ChangedBy` INT,
+    `ChangedAt` TIMESTAMP NOT NULL,
+    `Source` VARCHAR(32),
+    `BeforeData` BLOB,
+    `AfterData` BLOB,
+    `ArchivedAt` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ROW_FORMAT=COMPRESSED;
+
 CREATE TABLE PasswordResetToken (
     TokenID INT AUTO_INCREMENT PRIMARY KEY,
     PersonID INT NOT NULL,
@@ -202,12 +219,69 @@ CREATE TABLE RegistrationInvite (
     FOREIGN KEY (CreatedBy) REFERENCES Person(ID) ON DELETE CASCADE
 );
 
+CREATE TABLE Job (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    JobType VARCHAR(50) NOT NULL,
+    Status VARCHAR(20) NOT NULL DEFAULT 'QUEUED',
+    ProcessedRows INT NOT NULL DEFAULT 0,
+    TotalRows INT NULL,
+    Message VARCHAR(255) NULL,
+    Result LONGTEXT NULL,
+    Error TEXT NULL,
+    CreatedBy INT NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    StartedAt DATETIME NULL,
+    FinishedAt DATETIME NULL,
+    UpdatedAt DATETIME NULL,
+    FOREIGN KEY (CreatedBy) REFERENCES Person(ID) ON DELETE SET NULL
+);
+
+-- Outbound emails; see backend/classes/email_outbox.py
+CREATE TABLE EmailOutbox (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    ToEmail VARCHAR(255) NOT NULL,
+    Subject VARCHAR(255) NOT NULL,
+    Html TEXT NOT NULL,
+    Attachments MEDIUMTEXT NULL,
+    Status VARCHAR(10) NOT NULL DEFAULT 'PENDING',
+    Attempts INT NOT NULL DEFAULT 0,
+    NextAttemptAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    LastError TEXT NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    SentAt DATETIME NULL
+);
+
+CREATE TABLE MeetHighCombinedWinner (
+    MeetNumber VARCHAR(20) NOT NULL,
+    Basis VARCHAR(16) NOT NULL,
+    CWANumber VARCHAR(10) NOT NULL,
+    PRIMARY KEY (MeetNumber, Basis, CWANumber)
+);
+
+CREATE TABLE YTDStandings (
+    Year SMALLINT NOT NULL,
+    StatType VARCHAR(20) NOT NULL,
+    CWANumber VARCHAR(10) NOT NULL,
+    Value DECIMAL(10,2) NOT NULL,
+    Ranking INT NOT NULL,
+    PRIMARY KEY (Year, StatType, CWANumber)
+);
+
+CREATE TABLE DogSearchToken (
+    Token VARCHAR(64) NOT NULL,
+    CWANumber VARCHAR(10) NOT NULL,
+    Field VARCHAR(10) NOT NULL,
+    Weight TINYINT NOT NULL,
+    PRIMARY KEY (Token, CWANumber, Field)
+);
+
 -- =========================
 -- INDEXES
 -- =========================
 
 -- High-frequency query filters on large tables
-CREATE INDEX idx_meetresults_cwanumber ON MeetResults(CWANumber);
+-- (CWANumber, MeetNumber) lets per-dog date-range queries join Meet from the index alone
+CREATE INDEX idx_meetresults_cwanumber_meet ON MeetResults(CWANumber, MeetNumber);
 CREATE INDEX idx_raceresults_cwanumber ON RaceResults(CWANumber);
 CREATE INDEX idx_raceresults_meetnumber ON RaceResults(MeetNumber);
 
@@ -221,10 +295,19 @@ CREATE INDEX idx_dogowner_cwanumber ON DogOwner(CWAID);
 CREATE INDEX idx_dogowner_personid ON DogOwner(PersonID);
 CREATE INDEX idx_person_email ON Person(EmailAddress);
 CREATE INDEX idx_person_role ON Person(SystemRole);
+CREATE INDEX idx_dogsearchtoken_cwanumber ON DogSearchToken(CWANumber);
+
+-- Keyset pagination: one index per search sort, ending in a unique column
+CREATE INDEX idx_dog_name_cwanumber ON Dog(RegisteredName, CWANumber);
+CREATE INDEX idx_dog_birthdate_cwanumber ON Dog(Birthdate, CWANumber);
+CREATE INDEX idx_person_name ON Person(LastName, FirstName);
+CREATE INDEX idx_meet_location_number ON Meet(Location, MeetNumber);
+CREATE INDEX idx_meet_club_number ON Meet(ClubAbbreviation, MeetNumber);
 
 -- Meet filtering
 CREATE INDEX idx_meet_club_date_location ON Meet(ClubAbbreviation, MeetDate, Location);
-CREATE INDEX idx_meetdate ON Meet(MeetDate);
+-- Range scans on MeetDate (MeetDate >= start AND MeetDate < end) that hand MeetNumber to the join
+CREATE INDEX idx_meet_date_number ON Meet(MeetDate, MeetNumber);
 CREATE INDEX idx_meet_completed ON Meet(Completed);
 
 -- HC wins and placement calculations
@@ -232,11 +315,23 @@ CREATE INDEX idx_meetresults_placement ON MeetResults(MeetPlacement);
 CREATE INDEX idx_meetresults_meet_placement_conf ON MeetResults(MeetNumber, MeetPlacement, ConformationPlacement);
 CREATE INDEX idx_raceresults_placement ON RaceResults(MeetNumber, CWANumber, Placement);
 
+-- Standings pages
+CREATE INDEX idx_meethcwinner_cwanumber ON MeetHighCombinedWinner(CWANumber, Basis);
+CREATE INDEX idx_ytdstandings_ranking ON YTDStandings(Year, StatType, Ranking);
+
 -- Audit and auth
-CREATE INDEX idx_changelog_changedby ON ChangeLog(ChangedBy);
-CREATE INDEX idx_changelog_changedat ON ChangeLog(ChangedAt DESC);
+-- ChangeLog filters; every index ends in ChangedAt (and implicitly ID) so
+-- each filtered page is read newest first straight from the index
+CREATE INDEX idx_changelog_changedby_changedat ON ChangeLog(ChangedBy, ChangedAt);
+CREATE INDEX idx_changelog_changedat ON ChangeLog(ChangedAt);
+CREATE INDEX idx_changelog_table_pk_changedat ON ChangeLog(ChangedTable, RecordPK, ChangedAt);
+CREATE INDEX idx_changelogarchive_changedat ON ChangeLogArchive(ChangedAt, ID);
+CREATE INDEX idx_changelogarchive_changedby ON ChangeLogArchive(ChangedBy, ChangedAt, ID);
+CREATE INDEX idx_changelogarchive_table_pk ON ChangeLogArchive(ChangedTable, RecordPK, ChangedAt, ID);
 CREATE INDEX idx_passwordreset_token ON PasswordResetToken(Token, Used, ExpiresAt);
 CREATE INDEX idx_reginvite_token ON RegistrationInvite(Token, Used, ExpiresAt);
+CREATE INDEX idx_job_status ON Job(Status, CreatedAt);
+CREATE INDEX idx_emailoutbox_due ON EmailOutbox(Status, NextAttemptAt);
 
 -- =========================
 -- FOREIGN KEYS
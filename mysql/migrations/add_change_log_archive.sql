@@ -0,0 +1,28 @@
+-- /api/change_log/get is now filtered and paged newest first by
+-- (ChangedAt, ID). A descending ChangedAt index stores the implicit ID
+-- ascending, which does not match that order, so it becomes ascending and
+-- is read backwards. The ChangedBy index grows ChangedAt and is created
+-- before the old one is dropped, so fk_ChangeLog_ChangedBy always has an index.
+CREATE INDEX idx_changelog_changedby_changedat ON ChangeLog(ChangedBy, ChangedAt);
+DROP INDEX idx_changelog_changedby ON ChangeLog;
+DROP INDEX idx_changelog_changedat ON ChangeLog;
+CREATE INDEX idx_changelog_changedat ON ChangeLog(ChangedAt);
+CREATE INDEX idx_changelog_table_pk_changedat ON ChangeLog(ChangedTable, RecordPK, ChangedAt);
+
+-- Old entries move here (POST /api/change_log/archive) so ChangeLog stays small.
+CREATE TABLE `ChangeLogArchive` (
+    `ArchiveID` BIGINT PRIMARY KEY AUTO_INCREMENT,
+    `ID` INT NOT NULL UNIQUE,
+    `ChangedTable` VARCHAR(50) NOT NULL,
+    `RecordPK` VARCHAR(300) NOT NULL,
+    `Operation` VARCHAR(10) NOT NULL,
+    `ChangedBy` INT,
+    `ChangedAt` TIMESTAMP NOT NULL,
+    `Source` VARCHAR(32),
+    `BeforeData` TEXT,
+    `AfterData` TEXT,
+    `ArchivedAt` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ROW_FORMAT=COMPRESSED;
+CREATE INDEX idx_changelogarchive_changedat ON ChangeLogArchive(ChangedAt, ID);
+CREATE INDEX idx_changelogarchive_changedby ON ChangeLogArchive(ChangedBy, ChangedAt, ID);
+CREATE INDEX idx_changelogarchive_table_pk ON ChangeLogArchive(ChangedTable, RecordPK, ChangedAt, ID);
@@ -0,0 +1,10 @@
+-- Filled on the next backend start (DogSearchIndex.ensure_built) or by "Reload All Stats".
+CREATE TABLE IF NOT EXISTS DogSearchToken (
+    Token VARCHAR(64) NOT NULL,
+    CWANumber VARCHAR(10) NOT NULL,
+    Field VARCHAR(10) NOT NULL,
+    Weight TINYINT NOT NULL,
+    PRIMARY KEY (Token, CWANumber, Field)
+);
+
+CREATE INDEX idx_dogsearchtoken_cwanumber ON DogSearchToken(CWANumber);
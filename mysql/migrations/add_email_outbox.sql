@@ -0,0 +1,17 @@
+-- Emails are queued here and sent by a background dispatcher instead of
+-- inside request handlers and title syncs.
+CREATE TABLE EmailOutbox (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    ToEmail VARCHAR(255) NOT NULL,
+    Subject VARCHAR(255) NOT NULL,
+    Html TEXT NOT NULL,
+    Attachments MEDIUMTEXT NULL,
+    Status VARCHAR(10) NOT NULL DEFAULT 'PENDING',
+    Attempts INT NOT NULL DEFAULT 0,
+    NextAttemptAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    LastError TEXT NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    SentAt DATETIME NULL
+);
+-- Dispatchers claim Status IN ('PENDING', 'SENDING') AND NextAttemptAt <= NOW()
+CREATE INDEX idx_emailoutbox_due ON EmailOutbox(Status, NextAttemptAt);
@@ -0,0 +1,18 @@
+CREATE TABLE IF NOT EXISTS Job (
+    ID INT AUTO_INCREMENT PRIMARY KEY,
+    JobType VARCHAR(50) NOT NULL,
+    Status VARCHAR(20) NOT NULL DEFAULT 'QUEUED',
+    ProcessedRows INT NOT NULL DEFAULT 0,
+    TotalRows INT NULL,
+    Message VARCHAR(255) NULL,
+    Result LONGTEXT NULL,
+    Error TEXT NULL,
+    CreatedBy INT NULL,
+    CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    StartedAt DATETIME NULL,
+    FinishedAt DATETIME NULL,
+    UpdatedAt DATETIME NULL,
+    FOREIGN KEY (CreatedBy) REFERENCES Person(ID) ON DELETE SET NULL
+);
+
+CREATE INDEX idx_job_status ON Job(Status, CreatedAt);
@@ -0,0 +1,10 @@
+-- The search endpoints page with "WHERE (sort key) > (last row's key)" instead
+-- of OFFSET. Each index below matches one sort order and ends in a unique
+-- column, so the next page is a range scan that starts where the last one
+-- stopped. Person's clustered ID is implicitly the last column of its index.
+-- Meet date sorts already use idx_meet_date_number.
+CREATE INDEX idx_dog_name_cwanumber ON Dog(RegisteredName, CWANumber);
+CREATE INDEX idx_dog_birthdate_cwanumber ON Dog(Birthdate, CWANumber);
+CREATE INDEX idx_person_name ON Person(LastName, FirstName);
+CREATE INDEX idx_meet_location_number ON Meet(Location, MeetNumber);
+CREATE INDEX idx_meet_club_number ON Meet(ClubAbbreviation, MeetNumber);
@@ -0,0 +1,10 @@
+-- Populate after applying: as an admin, GET /api/dog/reload_all_stats, then
+-- poll GET /api/jobs/<jobId> until the job's status is SUCCEEDED.
+CREATE TABLE IF NOT EXISTS MeetHighCombinedWinner (
+    MeetNumber VARCHAR(20) NOT NULL,
+    Basis VARCHAR(16) NOT NULL,
+    CWANumber VARCHAR(10) NOT NULL,
+    PRIMARY KEY (MeetNumber, Basis, CWANumber)
+);
+
+CREATE INDEX idx_meethcwinner_cwanumber ON MeetHighCombinedWinner(CWANumber, Basis);
@@ -0,0 +1,12 @@
+-- Populate after applying: as an admin, GET /api/dog/reload_all_stats, then
+-- poll GET /api/jobs/<jobId> until the job's status is SUCCEEDED.
+CREATE TABLE IF NOT EXISTS YTDStandings (
+    Year SMALLINT NOT NULL,
+    StatType VARCHAR(20) NOT NULL,
+    CWANumber VARCHAR(10) NOT NULL,
+    Value DECIMAL(10,2) NOT NULL,
+    Ranking INT NOT NULL,
+    PRIMARY KEY (Year, StatType, CWANumber)
+);
+
+CREATE INDEX idx_ytdstandings_ranking ON YTDStandings(Year, StatType, Ranking);
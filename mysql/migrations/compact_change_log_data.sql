@@ -0,0 +1,9 @@
+-- ChangeLog snapshots are now stored by utils/change_log_codec.py: the full
+-- before snapshot, an after diff, either zstd-compressed, which is binary.
+-- Rows written earlier are plain JSON text and are still read as such.
+ALTER TABLE ChangeLog
+    MODIFY `BeforeData` BLOB,
+    MODIFY `AfterData` BLOB;
+ALTER TABLE ChangeLogArchive
+    MODIFY `BeforeData` BLOB,
+    MODIFY `AfterData` BLOB;
@@ -0,0 +1,9 @@
+-- Year and season filters use MeetDate >= start AND MeetDate < end, which
+-- range-scans this index and gets MeetNumber for the join without a row lookup.
+CREATE INDEX idx_meet_date_number ON Meet(MeetDate, MeetNumber);
+DROP INDEX idx_meetdate ON Meet;
+
+-- Per-dog queries filtered by date join Meet straight from this index.
+-- Created before the old one is dropped so fk_MeetResults_Dog always has an index.
+CREATE INDEX idx_meetresults_cwanumber_meet ON MeetResults(CWANumber, MeetNumber);
+DROP INDEX idx_meetresults_cwanumber ON MeetResults;
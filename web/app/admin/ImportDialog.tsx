@@ -19,6 +19,7 @@ import {
 
 import { Close } from "@mui/icons-material"
 import Button from "../components/ui/buttons/Button";
+import { waitForJob } from "@/lib/jobs/waitForJob";
 
 type RowError = { row: number; pk?: string; error: string };
 
@@ -36,7 +37,7 @@ type ImportReport = {
 };
 
 type ApiResponse =
-  | { ok: true; report: ImportReport }
+  | { ok: true; jobId: number }
   | { ok: false; error: string };
 
 const TYPE_OPTIONS = [
@@ -57,6 +58,7 @@ export default function ImportCSV({ onSuccess, onFail, onCancel }: { onSuccess:
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [report, setReport] = useState<ImportReport | null>(null);
+  const [progress, setProgress] = useState<string | null>(null);
 
   const canSubmit = useMemo(() => !!file && !loading, [file, loading]);
 
@@ -93,7 +95,15 @@ export default function ImportCSV({ onSuccess, onFail, onCancel }: { onSuccess:
         return;
       }
 
-      setReport(data.report);
+      const job = await waitForJob<ImportReport>(data.jobId, (j) => {
+        setProgress(j.totalRows ? `${j.processedRows} / ${j.totalRows} rows${j.message ? ` - ${j.message}` : ""}` : j.message);
+      });
+      if (job.status === "FAILED" || !job.result) {
+        setError(job.error || "Import failed.");
+        return;
+      }
+
+      setReport(job.result);
     } catch (e: unknown) {
       if (e instanceof Error) {
         onFail(e.message)
@@ -102,6 +112,7 @@ export default function ImportCSV({ onSuccess, onFail, onCancel }: { onSuccess:
       }
     } finally {
       setLoading(false);
+      setProgress(null);
       onSuccess("Data Imported Sucessfully")
     }
   };
@@ -180,6 +191,11 @@ export default function ImportCSV({ onSuccess, onFail, onCancel }: { onSuccess:
             {loading ? "Importing..." : "Upload & Import"}
           </Button>
           {loading && <CircularProgress size={20} sx={{ ml: 2 }} />}
+          {loading && progress && (
+            <Typography variant="body2" sx={{ mt: 1 }}>
+              {progress}
+            </Typography>
+          )}
         </Box>
 
         {error && <Alert severity="error">{error}</Alert>}
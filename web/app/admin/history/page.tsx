@@ -102,6 +102,8 @@ export default function ChangeLogManager() {
   const [page, setPage] = useState(0);
   const [rowsPerPage, setRowsPerPage] = useState(10);
   const [selectedLog, setSelectedLog] = useState<ChangeLog | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchLogs = async () => {
     try {
@@ -111,6 +113,7 @@ export default function ChangeLogManager() {
 
       if (response.data.ok) {
         setLogs(response.data.data || []);
+        setNextCursor(response.data.nextCursor ?? null);
       } else {
         setError(response.data.error || "Failed to load change logs");
       }
@@ -122,6 +125,28 @@ export default function ChangeLogManager() {
     }
   };
 
+  const fetchMoreLogs = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await axios.get("/api/change_log/get", {
+        params: { cursor: nextCursor },
+      });
+
+      if (response.data.ok) {
+        setLogs((prev) => [...prev, ...(response.data.data || [])]);
+        setNextCursor(response.data.nextCursor ?? null);
+      } else {
+        setError(response.data.error || "Failed to load change logs");
+      }
+    } catch (err) {
+      console.error(err);
+      setError("Failed to load change logs");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchLogs();
   }, []);
@@ -237,6 +262,18 @@ export default function ChangeLogManager() {
                     }}
                     rowsPerPageOptions={[5, 10, 25, 50]}
                   />
+
+                  {nextCursor && (
+                    <Box display="flex" justifyContent="center" pt={2}>
+                      <SecondaryButton
+                        type="button"
+                        onClick={fetchMoreLogs}
+                        disabled={loadingMore}
+                      >
+                        {loadingMore ? "Loading..." : "Load older changes"}
+                      </SecondaryButton>
+                    </Box>
+                  )}
                 </>
               )}
             </Paper>
@@ -8,6 +8,7 @@ import { Alert, Dialog, Paper, Snackbar, Typography } from "@mui/material";
 import axios from "axios";
 import ImportCsvPage from "./ImportDialog";
 import AdminGuard from "@/lib/auth/adminGuard";
+import { waitForJob } from "@/lib/jobs/waitForJob";
 import Button from "@/app/components/ui/buttons/Button"
 
 const panelStyle = {
@@ -74,7 +75,13 @@ export default function Admin() {
         }
       });
       const d = await r.data
-      openSnackbar(d.ok ? "Restore complete" : d.error || "Failed", d.error);
+      if (!d.ok) {
+        openSnackbar(d.error || "Failed", true);
+        return;
+      }
+      openSnackbar("Restore started", false);
+      const job = await waitForJob(d.jobId);
+      openSnackbar(job.status === "SUCCEEDED" ? "Restore complete" : job.error || "Restore failed", job.status !== "SUCCEEDED");
     } catch (e: unknown) {
       if (e instanceof Error) {
         openSnackbar("Error: " + e.message, true);
@@ -0,0 +1,41 @@
+import axios from 'axios';
+
+export type JobStatus = 'QUEUED' | 'RUNNING' | 'SUCCEEDED' | 'FAILED';
+
+export type Job<T = unknown> = {
+  id: number;
+  jobType: string;
+  status: JobStatus;
+  processedRows: number;
+  totalRows: number | null;
+  message: string | null;
+  result: T | null;
+  error: string | null;
+};
+
+// Backstop only: the server fails a job whose worker stops sending heartbeats.
+const DEFAULT_TIMEOUT_MS = 60 * 60 * 1000;
+
+export async function waitForJob<T = unknown>(
+  jobId: number,
+  onProgress?: (job: Job<T>) => void,
+  intervalMs = 1000,
+  timeoutMs = DEFAULT_TIMEOUT_MS,
+): Promise<Job<T>> {
+  const deadline = Date.now() + timeoutMs;
+  for (;;) {
+    const res = await axios.get(`/api/jobs/${jobId}`, { validateStatus: () => true });
+    if (res.status >= 400 || !res.data?.ok) {
+      throw new Error(res.data?.error || `Could not read job ${jobId} (HTTP ${res.status})`);
+    }
+    const job: Job<T> = res.data.data;
+    onProgress?.(job);
+    if (job.status === 'SUCCEEDED' || job.status === 'FAILED') {
+      return job;
+    }
+    if (Date.now() >= deadline) {
+      throw new Error(`Timed out waiting for job ${jobId}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}